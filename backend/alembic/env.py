@@ -11,7 +11,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from app.config import settings
 from app.database import Base
-from app.models import User, NatalChart, Subscription, HoroscopeCache
+from app.models import User, NatalChart, Subscription, HoroscopeCache, InterpretationJob, InterpretationFragment
 
 # this is the Alembic Config object
 config = context.config
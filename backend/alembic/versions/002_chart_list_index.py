@@ -0,0 +1,24 @@
+"""Index for keyset pagination of chart lists
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves WHERE user_id = ? ORDER BY created_at DESC, id DESC with an index scan
+    op.create_index('ix_natal_charts_user_created', 'natal_charts', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_natal_charts_user_created', table_name='natal_charts')
@@ -0,0 +1,25 @@
+"""Store natal charts as packed binary records
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # New charts are written to chart_packed only; existing rows keep their
+    # chart_data JSON and are decoded from it on read.
+    op.add_column('natal_charts', sa.Column('chart_packed', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('natal_charts', 'chart_packed')
@@ -0,0 +1,25 @@
+"""Stop storing chart SVGs in natal_charts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Wheels are rendered on demand by GET /charts/{id}/svg; every stored
+    # value so far is the old placeholder
+    op.execute("UPDATE natal_charts SET svg_chart = NULL WHERE svg_chart IS NOT NULL")
+
+
+def downgrade() -> None:
+    # The placeholder carried no data, nothing to restore
+    pass
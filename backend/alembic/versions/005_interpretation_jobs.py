@@ -0,0 +1,48 @@
+"""Background LLM interpretation jobs
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    status_enum = postgresql.ENUM('PENDING', 'RUNNING', 'DONE', 'FAILED', name='interpretationstatus', create_type=True)
+    status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'interpretation_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('feature_hash', sa.String(length=64), nullable=False),
+        sa.Column('features', postgresql.JSONB(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='interpretationstatus', create_type=False), nullable=False),
+        sa.Column('result_text', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_interpretation_jobs_feature_hash', 'interpretation_jobs', ['feature_hash'], unique=True)
+    op.create_index('ix_interpretation_jobs_status', 'interpretation_jobs', ['status'])
+
+    op.add_column('natal_charts', sa.Column('interpretation_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_natal_charts_interpretation_hash', 'natal_charts', ['interpretation_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_natal_charts_interpretation_hash', table_name='natal_charts')
+    op.drop_column('natal_charts', 'interpretation_hash')
+    op.drop_table('interpretation_jobs')
+    postgresql.ENUM(name='interpretationstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""Store the birth instant in UTC
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('natal_charts', sa.Column('birth_utc', sa.DateTime(timezone=True), nullable=True))
+    # Existing charts were computed through pytz with is_dst=None, which
+    # rejected times at a DST change, so every stored local time maps to
+    # exactly one instant and PostgreSQL's own conversion gives it.
+    op.execute(
+        "UPDATE natal_charts "
+        "SET birth_utc = (birth_date::date + birth_time::time) AT TIME ZONE birth_timezone "
+        "WHERE birth_utc IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('natal_charts', 'birth_utc')
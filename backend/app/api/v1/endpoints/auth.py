@@ -5,15 +5,26 @@ from ....database import get_db
 from ....models.user import User, SubscriptionTier
 from ....schemas.user import UserCreate, UserLogin, Token, UserResponse
 from ....utils.security import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     get_current_user
 )
+from ....services.password_hasher import password_hasher, HasherSaturatedError
 
 router = APIRouter()
 
 
+async def _hash_job(coro):
+    """Await a password hashing job, mapping a full queue to 429."""
+    try:
+        return await coro
+    except HasherSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, please retry",
+            headers={"Retry-After": "1"}
+        )
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
@@ -30,7 +41,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Create new user
     new_user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await _hash_job(password_hasher.hash(user_data.password)),
         full_name=user_data.full_name,
         subscription_tier=SubscriptionTier.FREE,
         is_active=True,
@@ -63,7 +74,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await _hash_job(password_hasher.verify(credentials.password, user.hashed_password)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
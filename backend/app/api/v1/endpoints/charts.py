@@ -1,71 +1,173 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import base64
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import load_only
+from typing import Any, Callable, List, Optional, Tuple
 from uuid import UUID
-from ....database import get_db
+from ....config import settings
+from ....database import get_db, get_read_db, async_session_maker, read_session_maker
 from ....models.user import User, SubscriptionTier
 from ....models.natal_chart import NatalChart
-from ....schemas.natal_chart import NatalChartCreate, NatalChartResponse
-from ....utils.security import get_current_user, require_premium
-from ....services.astro_calculator import AstroCalculatorService
+from ....models.interpretation import InterpretationStatus
+from ....schemas.natal_chart import NatalChartCreate, NatalChartResponse, NatalChartSummary
+from ....utils.security import get_current_user, require_paid, require_premium, rate_limit, acquire_rate_limit
+from ....services.astro_calculator import AstroCalculatorService, chart_cache, chart_cache_key
 from ....services.interpretation_engine import InterpretationEngine
+from ....services.interpretation_jobs import InterpretationJobService
+from ....services.chart_import import ChartImportService
+from ....services.places import resolve_birth_place, PlaceResolutionError
+from ....services.birth_time import birth_instant, BirthTimeError
+from ....services.chart_export import ChartExportService, FORMATS as EXPORT_FORMATS
+from ....services.rate_limiter import rate_limiter
+from ....services.synastry_engine import SynastryEngine
+from ....services.quota_service import QuotaService, QuotaExceededError
+from ....services.chart_model import CompactChart, stored_chart
+from ....services.chart_svg import RENDERER_VERSION
+from ....utils.cache import LRUCache
+from ....utils.http import not_modified, precompress, choose_encoding, json_bytes, json_response
+from ....utils.metrics import stage
+from ....workers.interpretation_worker import interpretation_worker
+from ....services.chart_executor import (
+    chart_executor,
+    ExecutorSaturatedError,
+    ExecutorUnavailableError
+)
 
 router = APIRouter()
 
+# Longest transit scan served interactively
+MAX_TRANSIT_RANGE_DAYS = 5 * 366
+
+# Columns the chart list may return; the chart itself, interpretation_text
+# and svg_chart are only served by GET /charts/{chart_id}
+SUMMARY_COLUMNS = (
+    "name", "birth_date", "birth_time", "birth_timezone", "birth_latitude",
+    "birth_longitude", "birth_city", "birth_country", "is_primary", "created_at"
+)
+# Summary field -> chart point whose sign it reports
+SUMMARY_SIGNS = {
+    "sun_sign": "sun",
+    "moon_sign": "moon",
+    "ascendant_sign": "ascendant",
+}
+SUMMARY_FIELDS = SUMMARY_COLUMNS + tuple(SUMMARY_SIGNS)
+
+# ETag -> rendered wheel in every Content-Encoding
+svg_cache = LRUCache(settings.CHART_SVG_CACHE_SIZE, name="chart_svg")
+
+# Packed chart -> chart_data JSON
+chart_json_cache = LRUCache(settings.CHART_JSON_CACHE_SIZE, name="chart_json")
+
+
+async def _run_chart_job(fn: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run a calculation in the chart executor, mapping pool errors to HTTP errors."""
+    try:
+        return await chart_executor.run(fn, **kwargs)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Сервер перегружен расчетами карт. Попробуйте позже.",
+            headers={"Retry-After": "5"}
+        )
+    except (ExecutorUnavailableError, asyncio.TimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис расчета карт временно недоступен. Попробуйте позже.",
+            headers={"Retry-After": "10"}
+        )
+
+
+async def _check_chart_quota(check) -> None:
+    try:
+        await check
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Free tier allows only {e.limit} natal chart. Upgrade to create more."
+        )
+
 
 @router.post("", response_model=NatalChartResponse, status_code=status.HTTP_201_CREATED)
 async def create_natal_chart(
     chart_data: NatalChartCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(rate_limit("chart_create")),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new natal chart."""
     try:
-        # Check tier limits
-        if current_user.subscription_tier == SubscriptionTier.FREE:
-            # Count existing charts
-            result = await db.execute(
-                select(NatalChart).where(NatalChart.user_id == current_user.id)
-            )
-            existing_charts = result.scalars().all()
+        # Check tier limits before computing anything (enforced again at insert)
+        await _check_chart_quota(QuotaService.check(db, current_user, "natal_charts"))
 
-            if len(existing_charts) >= 1:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Free tier allows only 1 natal chart. Upgrade to create more."
-                )
+        # Coordinates / timezone from place_id or the local place index
+        try:
+            chart_data = resolve_birth_place(chart_data)
+        except PlaceResolutionError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Не удалось определить место рождения: {str(e)}"
+            )
 
-        # Generate chart using astro calculator
+        # Local birth time -> UTC, once; everything below uses the instant
         try:
-            calculated_data = AstroCalculatorService.generate_natal_chart(
-                birth_date=chart_data.birth_date,
-                birth_time=chart_data.birth_time,
-                birth_latitude=chart_data.birth_latitude,
-                birth_longitude=chart_data.birth_longitude,
-                birth_city=chart_data.birth_city,
-                birth_timezone=chart_data.birth_timezone
+            birth_utc = birth_instant(
+                chart_data.birth_date, chart_data.birth_time, chart_data.birth_timezone, chart_data.dst
+            ).utc
+        except BirthTimeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Некорректное время рождения: {str(e)}"
             )
+
+        # Reuse a chart already computed for the same birth moment
+        cache_key = chart_cache_key(
+            birth_utc=birth_utc,
+            birth_latitude=chart_data.birth_latitude,
+            birth_longitude=chart_data.birth_longitude
+        )
+
+        # Generate chart using astro calculator (in a worker process)
+        try:
+            calculated = await chart_cache.get(cache_key)
+            if calculated is None:
+                calculated = await _run_chart_job(
+                    AstroCalculatorService.generate_natal_chart,
+                    birth_date=chart_data.birth_date,
+                    birth_time=chart_data.birth_time,
+                    birth_latitude=chart_data.birth_latitude,
+                    birth_longitude=chart_data.birth_longitude,
+                    birth_city=chart_data.birth_city,
+                    birth_timezone=chart_data.birth_timezone,
+                    birth_utc=birth_utc
+                )
+                await chart_cache.set(cache_key, calculated)
         except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Ошибка расчета карты: {str(e)}"
             )
 
-        # Generate interpretation
-        use_llm = current_user.subscription_tier != SubscriptionTier.FREE
+        # Template interpretation now; paid tiers get the LLM text from a background job
         try:
-            interpretation = InterpretationEngine.interpret_natal_chart(
-                chart_data=calculated_data,
-                use_llm=use_llm,
-                user_tier=current_user.subscription_tier.value
-            )
+            with stage("interpretation"):
+                interpretation = InterpretationEngine.interpret_natal_chart(calculated)
         except Exception as e:
             # Fallback to basic interpretation if error
             interpretation = f"Натальная карта создана. Интерпретация будет доступна позже."
 
-        # Generate SVG (placeholder for now)
-        svg_chart = AstroCalculatorService.generate_chart_svg(calculated_data)
+        job = None
+        if current_user.subscription_tier != SubscriptionTier.FREE:
+            job = await InterpretationJobService.enqueue(
+                db, calculated, current_user.subscription_tier.value.lower()
+            )
+            if job.status == InterpretationStatus.DONE:
+                # Same chart features were interpreted before
+                interpretation = job.result_text
 
         # Create chart record
         new_chart = NatalChart(
@@ -74,21 +176,28 @@ async def create_natal_chart(
             birth_date=chart_data.birth_date,
             birth_time=chart_data.birth_time,
             birth_timezone=chart_data.birth_timezone,
+            birth_utc=birth_utc,
             birth_latitude=chart_data.birth_latitude,
             birth_longitude=chart_data.birth_longitude,
             birth_city=chart_data.birth_city,
             birth_country=chart_data.birth_country,
-            chart_data=calculated_data,
+            chart_packed=calculated.pack(),
             interpretation_text=interpretation,
-            svg_chart=svg_chart,
+            interpretation_hash=job.feature_hash if job else None,
+            # Rendered on demand by GET /charts/{chart_id}/svg
+            svg_chart=None,
             is_primary=chart_data.is_primary
         )
 
+        await _check_chart_quota(QuotaService.reserve(db, current_user, "natal_charts"))
         db.add(new_chart)
         await db.commit()
         await db.refresh(new_chart)
+        QuotaService.invalidate(current_user.id, "natal_charts")
+        if job is not None and job.status != InterpretationStatus.DONE:
+            interpretation_worker.notify()
 
-        return NatalChartResponse.model_validate(new_chart)
+        return json_response(_chart_body(new_chart, calculated), status_code=status.HTTP_201_CREATED)
 
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -103,27 +212,206 @@ async def create_natal_chart(
         )
 
 
-@router.get("", response_model=List[NatalChartResponse])
+@router.post("/import")
+async def import_natal_charts(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Upload format, defaults to the Content-Type"),
+    current_user: User = Depends(require_paid),
+    _: User = Depends(rate_limit("chart_import")),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import charts from an NDJSON or CSV upload (paid tiers).
+
+    NDJSON: one NatalChartCreate object per line. CSV: a header row with
+    NatalChartCreate field names, then one chart per row. The body is read
+    incrementally and stored in batches, so rows reported as created are
+    committed even if a later part of the upload is rejected.
+
+    Responds with NDJSON: ``{"row", "status": "created", "id"}`` or
+    ``{"row", "status": "error", "errors"}`` per row, then a summary line
+    with ``status`` ("done" or "aborted"), ``created`` and ``failed``.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    # The report is sent once the upload has been consumed: Starlette
+    # listens for disconnects on the request while a response streams,
+    # which would take the body chunks away from the importer
+    report = []
+    summary = {}
+    async for entry in ChartImportService.run(db, current_user, request.stream(), format):
+        report.append(json.dumps(entry, ensure_ascii=False))
+        summary = entry
+
+    QuotaService.invalidate(current_user.id, "natal_charts")
+    if summary.get("interpretations_queued"):
+        interpretation_worker.notify()
+
+    return Response(content="\n".join(report) + "\n", media_type="application/x-ndjson")
+
+
+@router.get("/export")
+async def export_natal_charts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|zip)$"),
+    after: Optional[UUID] = Query(None, description="Id of the last chart already received, to resume"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Export all of the user's charts, oldest first.
+
+    ndjson: one full chart record per line (birth data, chart_data,
+    interpretation_text). csv: birth data and main signs. zip: a JSON and
+    an SVG wheel per chart. The response is streamed; to resume an
+    interrupted download, pass the id of the last chart received as
+    ``after``. For ndjson and csv (sent without the header row) append the
+    result to the partial file; for zip the result is a separate archive
+    with the remaining charts.
+    """
+    resume = None
+    if after is not None:
+        resume = await ChartExportService.resume_point(db, current_user.id, after)
+        if resume is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chart not found"
+            )
+
+    # Dependencies are closed before the body is sent, so the stream holds
+    # its own rate-limit slot and replica session
+    lease = await acquire_rate_limit("chart_export", current_user)
+    user_id = current_user.id
+
+    async def body():
+        async with rate_limiter.hold(lease), read_session_maker() as export_db:
+            async for chunk in ChartExportService.stream(export_db, user_id, format, resume):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"charts-{datetime.now(timezone.utc):%Y%m%d}.{extension}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+def _chart_body(chart: NatalChart, compact: Optional[CompactChart] = None) -> bytes:
+    """
+    NatalChartResponse JSON of a chart row.
+
+    The chart_data document only depends on the packed chart, so its JSON
+    is cached per packed chart and spliced into the encoded row fields.
+    """
+    chart_json = chart_json_cache.get(chart.chart_packed) if chart.chart_packed else None
+    if chart_json is None:
+        compact = compact or stored_chart(chart.chart_packed, chart.chart_data)
+        chart_json = json_bytes(compact.to_dict()) if compact else b"null"
+        if chart.chart_packed:
+            chart_json_cache.set(chart.chart_packed, chart_json)
+
+    response = NatalChartResponse.model_validate(chart)
+    response.chart_data = None
+    # Quotes inside string values are escaped, so only the field itself matches
+    return response.model_dump_json().encode("utf-8").replace(b'"chart_data":null', b'"chart_data":' + chart_json, 1)
+
+
+def _encode_cursor(chart: NatalChart) -> str:
+    raw = json.dumps([chart.created_at.isoformat(), str(chart.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, chart_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(chart_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(SUMMARY_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+    unknown = [f for f in requested if f not in SUMMARY_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: id, {', '.join(SUMMARY_FIELDS)}"
+        )
+    return requested
+
+
+@router.get("", response_model=List[NatalChartSummary], response_model_exclude_unset=True)
 async def get_user_charts(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated summary fields (id is always included), defaults to all"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all charts for the current user."""
-    result = await db.execute(
-        select(NatalChart)
+    """
+    List the current user's charts, newest first.
+
+    Returns summaries only. When more charts exist, the X-Next-Cursor
+    response header holds the cursor for the next page.
+    """
+    requested = _parse_fields(fields)
+
+    # id and created_at are always loaded for the keyset cursor
+    columns = [getattr(NatalChart, name) for name in SUMMARY_COLUMNS if name in requested]
+    signs = [name for name in SUMMARY_SIGNS if name in requested]
+    if signs:
+        # The packed chart is a few hundred bytes; legacy rows only have the
+        # JSON document, so read just the signs out of it with JSONB paths
+        columns.append(NatalChart.chart_packed)
+    legacy_signs = [
+        NatalChart.chart_data[("planets", SUMMARY_SIGNS[name], "sign")].astext.label(name)
+        for name in signs
+    ]
+
+    query = (
+        select(NatalChart, *legacy_signs)
+        .options(load_only(NatalChart.id, NatalChart.created_at, *columns))
         .where(NatalChart.user_id == current_user.id)
-        .order_by(NatalChart.created_at.desc())
+        .order_by(NatalChart.created_at.desc(), NatalChart.id.desc())
+        .limit(limit + 1)
     )
-    charts = result.scalars().all()
+    if cursor:
+        query = query.where(tuple_(NatalChart.created_at, NatalChart.id) < _decode_cursor(cursor))
+
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1][0])
 
-    return [NatalChartResponse.model_validate(chart) for chart in charts]
+    summaries = []
+    for row in rows:
+        chart = row[0]
+        values = {name: getattr(chart, name) for name in SUMMARY_COLUMNS if name in requested}
+        packed = CompactChart.unpack(chart.chart_packed) if signs and chart.chart_packed else None
+        for name in signs:
+            values[name] = packed.sign(SUMMARY_SIGNS[name]) if packed else getattr(row, name)
+        summaries.append(NatalChartSummary(id=chart.id, **values))
+    return summaries
 
 
 @router.get("/{chart_id}", response_model=NatalChartResponse)
 async def get_chart(
     chart_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific chart by ID."""
     result = await db.execute(
@@ -140,7 +428,158 @@ async def get_chart(
             detail="Chart not found"
         )
 
-    return NatalChartResponse.model_validate(chart)
+    return json_response(_chart_body(chart))
+
+
+@router.get("/{chart_id}/svg", response_class=Response)
+async def get_chart_svg(
+    chart_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Chart wheel as SVG.
+
+    The ETag is derived from the chart itself, so unchanged charts are
+    answered with 304 before rendering; rendered wheels are kept gzip and
+    brotli compressed per worker.
+    """
+    result = await db.execute(
+        select(NatalChart.chart_packed, NatalChart.chart_data).where(
+            NatalChart.id == chart_id,
+            NatalChart.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+    chart = stored_chart(row.chart_packed, row.chart_data) if row else None
+
+    if not chart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chart not found"
+        )
+
+    digest = hashlib.sha256(chart.pack()).hexdigest()[:32]
+    etag = f'"svg{RENDERER_VERSION}-{digest}"'
+    headers = {"Cache-Control": settings.CHART_SVG_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    unchanged = not_modified(request, etag, headers)
+    if unchanged:
+        return unchanged
+
+    variants = svg_cache.get(etag)
+    if variants is None:
+        # Under a millisecond: cheaper inline than a round trip to the process pool
+        with stage("svg"):
+            svg = AstroCalculatorService.generate_chart_svg(chart)
+        variants = precompress(svg.encode("utf-8"))
+        svg_cache.set(etag, variants)
+
+    encoding = choose_encoding(request, variants)
+    headers["ETag"] = etag
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=variants[encoding], media_type="image/svg+xml", headers=headers)
+
+
+async def _interpretation_state(db: AsyncSession, chart_id: UUID, user_id: UUID) -> Optional[dict]:
+    """Current interpretation of a chart: status, text and (while generating) the partial LLM text."""
+    result = await db.execute(
+        select(NatalChart.interpretation_text, NatalChart.interpretation_hash).where(
+            NatalChart.id == chart_id,
+            NatalChart.user_id == user_id
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    state = {"status": "done", "interpretation_text": row.interpretation_text, "partial_text": None}
+    job = await InterpretationJobService.get(db, row.interpretation_hash) if row.interpretation_hash else None
+    if job is not None and job.status != InterpretationStatus.DONE:
+        state["status"] = job.status.value
+        if job.status == InterpretationStatus.RUNNING:
+            state["partial_text"] = job.result_text or ""
+    elif job is not None and job.result_text:
+        # The job may have finished after this chart's row was read
+        state["interpretation_text"] = job.result_text
+    return state
+
+
+@router.get("/{chart_id}/interpretation")
+async def get_chart_interpretation(
+    chart_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Interpretation status for polling.
+
+    status is "pending" or "running" while the LLM interpretation is being
+    generated (interpretation_text is the template until then), "done" or
+    "failed" (the template stays).
+    """
+    state = await _interpretation_state(db, chart_id, current_user.id)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chart not found"
+        )
+    return state
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/{chart_id}/interpretation/stream")
+async def stream_chart_interpretation(
+    chart_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Interpretation as server-sent events.
+
+    Emits "delta" events with newly generated text, "reset" when a retried
+    generation starts over, and finally "done" (full text) or "failed".
+    """
+    if await _interpretation_state(db, chart_id, current_user.id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chart not found"
+        )
+    user_id = current_user.id
+
+    async def events():
+        sent = ""
+        while not await request.is_disconnected():
+            # Short session per poll: the request's session would hold a connection for the whole stream
+            async with async_session_maker() as poll_db:
+                state = await _interpretation_state(poll_db, chart_id, user_id)
+            if state is None or state["status"] == "failed":
+                yield _sse("failed", {"interpretation_text": state["interpretation_text"] if state else None})
+                return
+            if state["status"] == "done":
+                yield _sse("done", {"interpretation_text": state["interpretation_text"]})
+                return
+
+            partial = state["partial_text"] or ""
+            if not partial.startswith(sent):
+                sent = ""
+                yield _sse("reset", {})
+            if len(partial) > len(sent):
+                yield _sse("delta", {"text": partial[len(sent):]})
+                sent = partial
+            await asyncio.sleep(settings.INTERPRETATION_STREAM_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.delete("/{chart_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -166,6 +605,7 @@ async def delete_chart(
 
     await db.delete(chart)
     await db.commit()
+    QuotaService.invalidate(current_user.id, "natal_charts")
 
     return None
 
@@ -173,24 +613,111 @@ async def delete_chart(
 @router.post("/{chart_id}/transits")
 async def get_transits(
     chart_id: UUID,
+    start: Optional[datetime] = Query(None, description="Start of the range (UTC), defaults to now"),
+    end: Optional[datetime] = Query(None, description="End of the range (UTC), defaults to start + 1 day"),
+    include_moon: bool = Query(False, description="Include Moon transits"),
     current_user: User = Depends(require_premium),
+    _: User = Depends(rate_limit("transits")),
     db: AsyncSession = Depends(get_db)
 ):
     """Calculate transits for a chart (Premium feature)."""
+    if start is None:
+        start = datetime.utcnow()
+    elif start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+
+    if end is not None:
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end must be after start"
+            )
+        if end - start > timedelta(days=MAX_TRANSIT_RANGE_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Transit range is limited to {MAX_TRANSIT_RANGE_DAYS} days"
+            )
+
     result = await db.execute(
-        select(NatalChart).where(
+        select(NatalChart.chart_packed, NatalChart.chart_data).where(
             NatalChart.id == chart_id,
             NatalChart.user_id == current_user.id
         )
     )
-    chart = result.scalar_one_or_none()
+    row = result.one_or_none()
+    natal_chart = stored_chart(row.chart_packed, row.chart_data) if row else None
 
-    if not chart:
+    if not natal_chart:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chart not found"
+        )
+
+    transits = await _run_chart_job(
+        AstroCalculatorService.calculate_transits,
+        natal_chart=natal_chart,
+        transit_date=start,
+        end_date=end,
+        include_moon=include_moon
+    )
+
+    return json_response(json_bytes(transits))
+
+
+@router.get("/{chart_id}/synastry/{other_chart_id}")
+async def get_synastry(
+    chart_id: UUID,
+    other_chart_id: UUID,
+    current_user: User = Depends(require_paid),
+    _: User = Depends(rate_limit("synastry")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Calculate compatibility between two of the user's charts (Paid feature)."""
+    result = await db.execute(
+        select(NatalChart.id, NatalChart.chart_packed, NatalChart.chart_data).where(
+            NatalChart.id.in_([chart_id, other_chart_id]),
+            NatalChart.user_id == current_user.id
+        )
+    )
+    charts = {row.id: stored_chart(row.chart_packed, row.chart_data) for row in result}
+
+    if not charts.get(chart_id) or not charts.get(other_chart_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chart not found"
+        )
+
+    return json_response(json_bytes(AstroCalculatorService.calculate_synastry(charts[chart_id], charts[other_chart_id])))
+
+
+@router.get("/{chart_id}/matches")
+async def get_best_matches(
+    chart_id: UUID,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(require_paid),
+    _: User = Depends(rate_limit("matches")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Rank the user's other charts by compatibility with this one (Paid feature)."""
+    result = await db.execute(
+        select(NatalChart.id, NatalChart.name, NatalChart.chart_packed, NatalChart.chart_data).where(
+            NatalChart.user_id == current_user.id
+        )
+    )
+    rows = result.all()
+
+    names = {row.id: row.name for row in rows}
+    charts = {row.id: stored_chart(row.chart_packed, row.chart_data) for row in rows}
+    chart = charts.get(chart_id)
+    if chart is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chart not found"
         )
 
-    transits = AstroCalculatorService.calculate_transits(chart.chart_data)
+    candidates = [(id_, other) for id_, other in charts.items() if id_ != chart_id and other is not None]
+    matches = SynastryEngine.best_matches(chart, candidates, limit=limit)
 
-    return transits
+    return json_response(json_bytes([{**match, "name": names[match["id"]]} for match in matches]))
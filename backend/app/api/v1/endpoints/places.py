@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from ....models.user import User
+from ....schemas.place import PlaceResponse, TimezoneResponse
+from ....utils.security import get_current_user
+from ....utils.http import json_bytes, json_response
+from ....services.places import PlaceIndex, get_index
+
+router = APIRouter()
+
+# The index only changes on redeploy
+PLACES_CACHE_CONTROL = "private, max-age=86400"
+
+
+def _place_index() -> PlaceIndex:
+    index = get_index()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Place search is not configured"
+        )
+    return index
+
+
+@router.get("/search", response_model=List[PlaceResponse])
+async def search_places(
+    q: str = Query(..., min_length=1, max_length=100, description="Beginning of a city name, any supported language"),
+    limit: int = Query(10, ge=1, le=20),
+    country: Optional[str] = Query(None, pattern="^[A-Za-z]{2}$", description="ISO country code"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    City autocomplete from the local place index.
+
+    Prefix matches come first, most populous first, followed by close
+    misspellings. Pass the id of the chosen place as place_id when
+    creating a chart.
+    """
+    places = _place_index().search(q, limit=limit, country=country)
+    return json_response(
+        json_bytes([place._asdict() for place in places]),
+        headers={"Cache-Control": PLACES_CACHE_CONTROL}
+    )
+
+
+@router.get("/timezone", response_model=TimezoneResponse)
+async def get_timezone(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    current_user: User = Depends(get_current_user)
+):
+    """IANA timezone at a point; ``approximate`` when no timezone boundary covers it."""
+    index = _place_index()
+    timezone = index.polygon_timezone(lat, lon)
+    approximate = timezone is None
+    if approximate:
+        timezone = index.timezone_at(lat, lon)
+    return json_response(
+        json_bytes({"latitude": lat, "longitude": lon, "timezone": timezone, "approximate": approximate}),
+        headers={"Cache-Control": PLACES_CACHE_CONTROL}
+    )
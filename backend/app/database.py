@@ -1,13 +1,41 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Any, Dict
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from .config import settings
 
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Async engine with the pool and statement cache configured in settings."""
+    if settings.DATABASE_PGBOUNCER:
+        # PgBouncer in transaction mode hands each transaction a different
+        # server connection, so prepared statements cannot be cached and
+        # their names must be unique across clients
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {"prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE}
+
+    return create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read-only queries go to the replica when one is configured
+read_engine = _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -16,6 +44,12 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False
 )
 
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -31,3 +65,35 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """
+    Session on the read replica (the primary if none is configured).
+
+    For read-only endpoints; replicas lag, so a chart created a moment ago
+    may not be listed yet.
+    """
+    async with read_session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection pool usage per engine, for metrics."""
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    stats = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        }
+    return stats
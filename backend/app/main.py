@@ -1,12 +1,46 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
+from .database import engine, read_engine
+from .utils.metrics import METRICS_ENABLED, MetricsMiddleware, instrument_engine, metrics_payload
+from .utils.http import DefaultJSONResponse
 from .api.v1 import api_router
+from .services.chart_executor import chart_executor
+from .services.password_hasher import password_hasher
+from .services.places import get_index as load_place_index
+from .workers.horoscope_pregenerator import horoscope_scheduler
+from .workers.interpretation_worker import interpretation_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    chart_executor.start()
+    password_hasher.start()
+    # Load the place index now rather than on the first search
+    await asyncio.to_thread(load_place_index)
+    if settings.HOROSCOPE_PREGENERATE_ENABLED:
+        horoscope_scheduler.start()
+    if settings.INTERPRETATION_WORKER_ENABLED:
+        interpretation_worker.start()
+    yield
+    await horoscope_scheduler.stop()
+    await interpretation_worker.stop()
+    # Let in-flight chart jobs finish before the worker exits
+    await asyncio.to_thread(chart_executor.shutdown)
+    password_hasher.shutdown()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse
 )
 
 # CORS middleware
@@ -18,6 +52,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency and database use per route, exposed on /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -34,3 +74,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = metrics_payload()
+    return Response(content=body, headers={"Content-Type": content_type})
@@ -2,5 +2,6 @@ from .user import User
 from .natal_chart import NatalChart
 from .subscription import Subscription
 from .horoscope import HoroscopeCache
+from .interpretation import InterpretationJob, InterpretationFragment
 
-__all__ = ["User", "NatalChart", "Subscription", "HoroscopeCache"]
+__all__ = ["User", "NatalChart", "Subscription", "HoroscopeCache", "InterpretationJob", "InterpretationFragment"]
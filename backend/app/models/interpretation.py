@@ -0,0 +1,49 @@
+from sqlalchemy import Column, String, DateTime, Enum, Text, Integer
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+import enum
+from ..database import Base
+
+
+class InterpretationStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class InterpretationJob(Base):
+    """
+    One LLM interpretation generation.
+
+    Jobs are keyed by a hash of the chart features the prompt uses, so every
+    chart with the same placements (and tier) shares one generation.
+    """
+    __tablename__ = "interpretation_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    feature_hash = Column(String(64), nullable=False, unique=True, index=True)
+    features = Column(JSONB, nullable=False)  # Prompt input (placements, tier)
+
+    status = Column(Enum(InterpretationStatus), default=InterpretationStatus.PENDING, nullable=False, index=True)
+    result_text = Column(Text, nullable=True)  # Partial while running, final when done
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Retry back-off
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class InterpretationFragment(Base):
+    """
+    Generated text for one chart placement (planet in sign and house, angle,
+    aspect), shared by every interpretation containing it.
+    """
+    __tablename__ = "interpretation_fragments"
+
+    # "<source>:<fragment>", e.g. "llm1-premium:planet:sun:Ari:5"
+    key = Column(String(160), primary_key=True)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Float, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Float, ForeignKey, Text, Index, LargeBinary
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -8,6 +8,10 @@ from ..database import Base
 
 class NatalChart(Base):
     __tablename__ = "natal_charts"
+    __table_args__ = (
+        # Keyset pagination of a user's charts (newest first)
+        Index("ix_natal_charts_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -18,14 +22,17 @@ class NatalChart(Base):
     birth_date = Column(DateTime(timezone=False), nullable=False)
     birth_time = Column(String, nullable=False)  # HH:MM format
     birth_timezone = Column(String, nullable=False)  # e.g., "Europe/Moscow"
+    birth_utc = Column(DateTime(timezone=True), nullable=True)  # Birth instant in UTC, resolved once at creation
     birth_latitude = Column(Float, nullable=False)
     birth_longitude = Column(Float, nullable=False)
     birth_city = Column(String, nullable=False)
     birth_country = Column(String, nullable=False)
 
     # Calculated data
-    chart_data = Column(JSONB, nullable=True)  # Full chart data (planets, houses, aspects)
+    chart_packed = Column(LargeBinary, nullable=True)  # CompactChart.pack() (planets, houses, aspects)
+    chart_data = Column(JSONB, nullable=True)  # Legacy JSON chart, only set on rows created before chart_packed
     interpretation_text = Column(Text, nullable=True)  # Generated interpretation
+    interpretation_hash = Column(String(64), nullable=True, index=True)  # InterpretationJob.feature_hash, if LLM-generated
     svg_chart = Column(Text, nullable=True)  # SVG representation
 
     is_primary = Column(Boolean, default=False, nullable=False)  # User's main chart
@@ -1,6 +1,7 @@
 from .user import UserCreate, UserLogin, UserResponse, Token
 from .natal_chart import NatalChartCreate, NatalChartResponse
 from .horoscope import HoroscopeResponse
+from .place import PlaceResponse, TimezoneResponse
 
 __all__ = [
     "UserCreate",
@@ -10,4 +11,6 @@ __all__ = [
     "NatalChartCreate",
     "NatalChartResponse",
     "HoroscopeResponse",
+    "PlaceResponse",
+    "TimezoneResponse",
 ]
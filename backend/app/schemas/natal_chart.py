@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Dict, Any, Literal
 from datetime import datetime, date, time
 from uuid import UUID
 
@@ -8,13 +8,24 @@ class NatalChartCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     birth_date: date
     birth_time: str = Field(..., pattern=r"^\d{2}:\d{2}$")  # HH:MM format
-    birth_timezone: str
-    birth_latitude: float = Field(..., ge=-90, le=90)
-    birth_longitude: float = Field(..., ge=-180, le=180)
+    # GeoNames id from GET /places/search; fills in coordinates and timezone
+    place_id: Optional[int] = None
+    birth_timezone: Optional[str] = None  # Resolved from the coordinates when omitted
+    # Which offset to use for a time at a clock change: a repeated time
+    # (clocks set back) or a skipped one (set forward) is rejected without it
+    dst: Optional[Literal["earlier", "later"]] = None
+    birth_latitude: Optional[float] = Field(None, ge=-90, le=90)
+    birth_longitude: Optional[float] = Field(None, ge=-180, le=180)
     birth_city: str
     birth_country: str
     is_primary: bool = False
 
+    @model_validator(mode="after")
+    def check_location(self) -> "NatalChartCreate":
+        if self.place_id is None and (self.birth_latitude is None or self.birth_longitude is None):
+            raise ValueError("birth_latitude and birth_longitude are required without place_id")
+        return self
+
 
 class NatalChartResponse(BaseModel):
     id: UUID
@@ -23,6 +34,7 @@ class NatalChartResponse(BaseModel):
     birth_date: datetime
     birth_time: str
     birth_timezone: str
+    birth_utc: Optional[datetime] = None
     birth_latitude: float
     birth_longitude: float
     birth_city: str
@@ -36,3 +48,24 @@ class NatalChartResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class NatalChartSummary(BaseModel):
+    """List view of a chart; heavy fields are only served by GET /charts/{chart_id}."""
+    id: UUID
+    name: Optional[str] = None
+    birth_date: Optional[datetime] = None
+    birth_time: Optional[str] = None
+    birth_timezone: Optional[str] = None
+    birth_latitude: Optional[float] = None
+    birth_longitude: Optional[float] = None
+    birth_city: Optional[str] = None
+    birth_country: Optional[str] = None
+    sun_sign: Optional[str] = None
+    moon_sign: Optional[str] = None
+    ascendant_sign: Optional[str] = None
+    is_primary: Optional[bool] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
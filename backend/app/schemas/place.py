@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class PlaceResponse(BaseModel):
+    id: int  # GeoNames id, accepted as place_id by POST /charts
+    name: str
+    matched_name: str  # The (alternate) name the query matched, e.g. "Москва"
+    country_code: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+
+
+class TimezoneResponse(BaseModel):
+    latitude: float
+    longitude: float
+    timezone: str
+    # Not from a timezone boundary: the nearest city's zone or a nominal
+    # Etc/GMT zone (no DST). Chart creation does not accept these.
+    approximate: bool
@@ -1,6 +1,20 @@
-from typing import Dict, Any, Optional
-from datetime import datetime, date
+from array import array
+from typing import Dict, Any, List, Optional, Union
+from datetime import datetime, date, timedelta, timezone
+import hashlib
+import json
 import logging
+import math
+import time
+from ..config import settings
+from ..utils.cache import LRUCache, OptionalRedis
+from .ephemeris import EphemerisEngine, EphemerisBatch, BODIES
+from .transit_engine import TransitEngine, DEFAULT_TRANSITING
+from .synastry_engine import SynastryEngine
+from .chart_model import CompactChart, POINTS, aspect_record, house_number
+from ..utils.metrics import stage
+from .chart_svg import render_chart_svg
+from .birth_time import birth_instant
 
 try:
     from kerykeion import AstrologicalSubject
@@ -12,31 +26,24 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the output of generate_natal_chart changes, so cached charts
+# computed by older code are never served again.
+CALCULATOR_VERSION = "2"
+
+# Calculation settings that affect the result (kerykeion uses Placidus houses)
+HOUSE_SYSTEM = "P"
+ZODIAC_TYPE = "Tropic"
+
+# ~11 m at the equator; finer differences do not change the chart
+COORDINATE_PRECISION = 4
+
 
 class AstroCalculatorService:
     """Service for astrological calculations using kerykeion."""
 
-    @staticmethod
-    def _get_planet_data(subject, planet_name: str) -> Dict[str, Any]:
-        """Extract planet data from subject."""
-        try:
-            planet = getattr(subject, planet_name)
-            return {
-                "sign": planet.get("sign", "Unknown"),
-                "position": planet.get("position", 0.0),
-                "house": planet.get("house", "Unknown"),
-                "retrograde": planet.get("retrograde", False),
-                "abs_pos": planet.get("abs_pos", 0.0)
-            }
-        except Exception as e:
-            logger.error(f"Error extracting {planet_name}: {str(e)}")
-            return {
-                "sign": "Unknown",
-                "position": 0.0,
-                "house": "Unknown",
-                "retrograde": False,
-                "abs_pos": 0.0
-            }
+    # Chart point -> kerykeion subject attribute
+    SUBJECT_POINTS = {body: body for body in BODIES}
+    SUBJECT_POINTS["north_node"] = "mean_node"
 
     @staticmethod
     def generate_natal_chart(
@@ -45,115 +52,107 @@ class AstroCalculatorService:
         birth_latitude: float,
         birth_longitude: float,
         birth_city: str,
-        birth_timezone: str
-    ) -> Dict[str, Any]:
+        birth_timezone: str,
+        birth_utc: Optional[datetime] = None
+    ) -> CompactChart:
         """
         Generate a complete natal chart.
 
-        Returns a dict with planets, houses, and aspects.
+        ``birth_utc`` is the birth instant from services/birth_time.py; it is
+        resolved here when not given (raising for a time at a DST change).
+        Returns a CompactChart with planets, houses, and aspects.
         """
         if not KERYKEION_AVAILABLE:
             # Return mock data for testing
             return AstroCalculatorService._generate_mock_chart(birth_date, birth_time)
 
+        if birth_utc is None:
+            birth_utc = birth_instant(birth_date, birth_time, birth_timezone).utc
+
         try:
             # Parse birth time
             hour, minute = map(int, birth_time.split(":"))
 
             # Create astrological subject
-            subject = AstrologicalSubject(
-                name="Subject",
-                year=birth_date.year,
-                month=birth_date.month,
-                day=birth_date.day,
-                hour=hour,
-                minute=minute,
-                city=birth_city,
-                nation="",  # kerykeion handles this differently
-                lat=birth_latitude,
-                lng=birth_longitude,
-                tz_str=birth_timezone
-            )
+            with stage("subject"):
+                subject = AstrologicalSubject(
+                    name="Subject",
+                    year=birth_date.year,
+                    month=birth_date.month,
+                    day=birth_date.day,
+                    hour=hour,
+                    minute=minute,
+                    city=birth_city,
+                    nation="",  # kerykeion handles this differently
+                    lat=birth_latitude,
+                    lng=birth_longitude,
+                    tz_str=birth_timezone,
+                    # Already resolved: kerykeion would localize with pytz again
+                    utc_datetime=birth_utc,
+                    zodiac_type=ZODIAC_TYPE,
+                    # Coordinates and timezone are always given: never query GeoNames
+                    online=False
+                )
 
-            # Extract planets data
-            planets = {
-                "sun": AstroCalculatorService._get_planet_data(subject, "sun"),
-                "moon": AstroCalculatorService._get_planet_data(subject, "moon"),
-                "mercury": AstroCalculatorService._get_planet_data(subject, "mercury"),
-                "venus": AstroCalculatorService._get_planet_data(subject, "venus"),
-                "mars": AstroCalculatorService._get_planet_data(subject, "mars"),
-                "jupiter": AstroCalculatorService._get_planet_data(subject, "jupiter"),
-                "saturn": AstroCalculatorService._get_planet_data(subject, "saturn"),
-                "uranus": AstroCalculatorService._get_planet_data(subject, "uranus"),
-                "neptune": AstroCalculatorService._get_planet_data(subject, "neptune"),
-                "pluto": AstroCalculatorService._get_planet_data(subject, "pluto"),
-                "north_node": AstroCalculatorService._get_planet_data(subject, "mean_node"),
-                "ascendant": {
-                    "sign": subject.first_house.get("sign", "Unknown"),
-                    "position": subject.first_house.get("position", 0.0),
-                    "abs_pos": subject.first_house.get("abs_pos", 0.0)
-                },
-                "midheaven": {
-                    "sign": subject.tenth_house.get("sign", "Unknown"),
-                    "position": subject.tenth_house.get("position", 0.0),
-                    "abs_pos": subject.tenth_house.get("abs_pos", 0.0)
-                }
-            }
-
-            # Extract houses data
-            houses = []
-            house_names = ["first", "second", "third", "fourth", "fifth", "sixth",
-                          "seventh", "eighth", "ninth", "tenth", "eleventh", "twelfth"]
-
-            for i, house_name in enumerate(house_names, 1):
-                try:
-                    house_attr = f"{house_name}_house"
-                    house_data = getattr(subject, house_attr, {})
-                    houses.append({
-                        "house": i,
-                        "sign": house_data.get("sign", "Unknown"),
-                        "position": house_data.get("position", 0.0),
-                        "abs_pos": house_data.get("abs_pos", 0.0)
-                    })
-                except Exception as e:
-                    logger.error(f"Error extracting house {i}: {str(e)}")
-                    houses.append({
-                        "house": i,
-                        "sign": "Unknown",
-                        "position": 0.0,
-                        "abs_pos": 0.0
-                    })
+            # Bodies, then ascendant (1st house cusp) and midheaven (10th house cusp)
+            with stage("planets"):
+                longitudes = array("d", [math.nan] * len(POINTS))
+                houses = bytearray(len(BODIES))
+                retrograde = 0
+                for i, body in enumerate(BODIES):
+                    try:
+                        planet = getattr(subject, AstroCalculatorService.SUBJECT_POINTS[body])
+                        longitudes[i] = float(planet.get("abs_pos", math.nan))
+                        houses[i] = house_number(planet.get("house", 0))
+                        if planet.get("retrograde", False):
+                            retrograde |= 1 << i
+                    except Exception as e:
+                        logger.error(f"Error extracting {body}: {str(e)}")
+
+                house_names = ["first", "second", "third", "fourth", "fifth", "sixth",
+                              "seventh", "eighth", "ninth", "tenth", "eleventh", "twelfth"]
+                cusps = array("d", [math.nan] * 12)
+                for i, house_name in enumerate(house_names):
+                    try:
+                        cusps[i] = float(getattr(subject, f"{house_name}_house")["abs_pos"])
+                    except Exception as e:
+                        logger.error(f"Error extracting house {i + 1}: {str(e)}")
+                longitudes[POINTS.index("ascendant")] = cusps[0]
+                longitudes[POINTS.index("midheaven")] = cusps[9]
 
             # Get aspects
-            aspects = []
-            try:
-                if hasattr(subject, 'aspects_list') and subject.aspects_list:
-                    for aspect in subject.aspects_list:
-                        aspects.append({
-                            "planet1": aspect.get("p1_name", "Unknown"),
-                            "planet2": aspect.get("p2_name", "Unknown"),
-                            "aspect": aspect.get("aspect", "Unknown"),
-                            "orb": aspect.get("orbit", 0.0),
-                            "applying": aspect.get("aid", 0) < 0
-                        })
-            except Exception as e:
-                logger.error(f"Error extracting aspects: {str(e)}")
+            with stage("aspects"):
+                aspects = []
+                try:
+                    if hasattr(subject, 'aspects_list') and subject.aspects_list:
+                        for aspect in subject.aspects_list:
+                            aspects.append(aspect_record(
+                                aspect.get("p1_name", "Unknown"),
+                                aspect.get("p2_name", "Unknown"),
+                                aspect.get("aspect", "Unknown"),
+                                aspect.get("orbit", 0.0),
+                                aspect.get("aid", 0) < 0
+                            ))
+                except Exception as e:
+                    logger.error(f"Error extracting aspects: {str(e)}")
 
-            return {
-                "planets": planets,
-                "houses": houses,
-                "aspects": aspects,
-                "calculation_date": datetime.utcnow().isoformat()
-            }
+            return CompactChart(
+                longitudes=longitudes,
+                cusps=cusps,
+                houses=bytes(houses),
+                retrograde=retrograde,
+                aspects=aspects,
+                calculated_at=time.time()
+            )
 
         except Exception as e:
             logger.error(f"Error generating natal chart: {str(e)}")
             raise ValueError(f"Failed to generate natal chart: {str(e)}")
 
     @staticmethod
-    def _generate_mock_chart(birth_date: date, birth_time: str) -> Dict[str, Any]:
+    def _generate_mock_chart(birth_date: date, birth_time: str) -> CompactChart:
         """Generate mock chart data for testing when kerykeion is not available."""
-        return {
+        return CompactChart.from_dict({
             "planets": {
                 "sun": {"sign": "Leo", "position": 15.5, "house": "5", "retrograde": False, "abs_pos": 135.5},
                 "moon": {"sign": "Cancer", "position": 23.2, "house": "4", "retrograde": False, "abs_pos": 113.2},
@@ -179,58 +178,191 @@ class AstroCalculatorService:
             ],
             "calculation_date": datetime.utcnow().isoformat(),
             "mock": True
-        }
+        })
+
+    @staticmethod
+    def generate_natal_charts(records: List[Dict[str, Any]]) -> List[Union[CompactChart, str]]:
+        """
+        Generate several natal charts in one executor job.
+
+        ``records`` hold generate_natal_chart keyword arguments. Returns the
+        chart or the error message for each record, in order, so one bad
+        record does not fail the others.
+        """
+        results: List[Union[CompactChart, str]] = []
+        for record in records:
+            try:
+                results.append(AstroCalculatorService.generate_natal_chart(**record))
+            except ValueError as e:
+                results.append(str(e))
+        return results
 
     @staticmethod
     def calculate_transits(
-        natal_chart_data: Dict[str, Any],
-        transit_date: Optional[datetime] = None
+        natal_chart: CompactChart,
+        transit_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        include_moon: bool = False
     ) -> Dict[str, Any]:
         """
-        Calculate current transits against a natal chart.
+        Calculate transits against a natal chart.
 
-        Returns active transits with tight orbs.
+        Returns aspects active at ``transit_date`` plus every transit window
+        (ingress, exact hits, egress) between ``transit_date`` and ``end_date``
+        (one day if not given). Naive datetimes are UTC.
         """
         if transit_date is None:
             transit_date = datetime.utcnow()
+        if end_date is None:
+            end_date = transit_date + timedelta(days=1)
 
-        # This is a simplified implementation
-        # In production, you would calculate actual transiting planet positions
-        # and compare them to natal positions
+        transiting = DEFAULT_TRANSITING + (("moon",) if include_moon else ())
 
         return {
             "transit_date": transit_date.isoformat(),
-            "active_transits": [],
-            "message": "Transit calculation requires full implementation"
+            "end_date": end_date.isoformat(),
+            "active_transits": TransitEngine.active_transits(
+                natal_chart, transit_date, transiting=transiting
+            ),
+            "transits": TransitEngine.find_transits(
+                natal_chart, transit_date, end_date, transiting=transiting
+            )
         }
 
     @staticmethod
     def calculate_synastry(
-        chart1_data: Dict[str, Any],
-        chart2_data: Dict[str, Any]
+        chart1: CompactChart,
+        chart2: CompactChart
     ) -> Dict[str, Any]:
         """
         Calculate synastry (compatibility) between two charts.
 
-        Returns inter-chart aspects and compatibility score.
+        Returns inter-chart aspects, element/modality balance and compatibility score.
         """
-        # This is a simplified implementation
-        # In production, you would calculate inter-chart aspects
-        # and generate a compatibility score
-
-        return {
-            "compatibility_score": 0,
-            "inter_aspects": [],
-            "element_balance": {},
-            "message": "Synastry calculation requires full implementation"
-        }
+        return SynastryEngine.calculate(chart1, chart2)
 
     @staticmethod
-    def generate_chart_svg(chart_data: Dict[str, Any]) -> str:
+    def calculate_positions_batch(
+        timestamps,
+        latitudes=None,
+        longitudes=None,
+        bodies=BODIES
+    ) -> EphemerisBatch:
         """
-        Generate SVG representation of the natal chart.
+        Planet positions for many instants in one call.
 
-        This is a placeholder - kerykeion has built-in chart generation.
+        Returns arrays of longitudes, speeds and retrograde flags with one row
+        per timestamp instead of building an AstrologicalSubject per instant.
         """
-        # In production, use kerykeion's MakeSvgInstance or custom SVG generation
-        return "<svg><!-- Chart SVG placeholder --></svg>"
+        return EphemerisEngine.compute_for_datetimes(
+            timestamps,
+            bodies=bodies,
+            latitudes=latitudes,
+            longitudes=longitudes
+        )
+
+    @staticmethod
+    def generate_chart_svg(chart: CompactChart) -> str:
+        """Generate the SVG chart wheel of a natal chart."""
+        return render_chart_svg(chart)
+
+
+def chart_cache_key(
+    birth_utc: datetime,
+    birth_latitude: float,
+    birth_longitude: float
+) -> str:
+    """
+    Build a content-addressed cache key for a natal chart.
+
+    Birth data is keyed by its UTC instant (services/birth_time.py) and
+    rounded coordinates, so equivalent inputs share one entry.
+    """
+    canonical = json.dumps({
+        "utc": birth_utc.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M"),
+        "lat": round(birth_latitude, COORDINATE_PRECISION),
+        "lng": round(birth_longitude, COORDINATE_PRECISION),
+        "houses": HOUSE_SYSTEM,
+        "zodiac": ZODIAC_TYPE,
+        "version": CALCULATOR_VERSION
+    }, sort_keys=True, separators=(",", ":"))
+
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"chart:v{CALCULATOR_VERSION}:{digest}"
+
+
+class ChartCache:
+    """
+    Two-tier cache for computed natal charts.
+
+    An in-process LRU answers repeated requests within a worker; Redis shares
+    results between workers and survives restarts. Redis failures are logged
+    and treated as misses so chart creation never depends on Redis.
+    """
+
+    def __init__(self, maxsize: int = 1024, redis_url: Optional[str] = None, redis_ttl: int = 0):
+        self._local = LRUCache(maxsize)
+        self._redis = OptionalRedis(redis_url, name="chart cache")
+        self._redis_ttl = redis_ttl or None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, key: Optional[str]) -> Optional[CompactChart]:
+        """Return the cached chart for ``key`` or None."""
+        if key is None:
+            return None
+
+        chart = self._local.get(key)
+        if chart is not None:
+            self.local_hits += 1
+            return chart
+
+        client = self._redis.client()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+            except Exception as e:
+                self._redis.failed(e)
+                raw = None
+            if raw is not None:
+                chart = CompactChart.unpack(raw)
+                self._local.set(key, chart)
+                self.redis_hits += 1
+                return chart
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: Optional[str], chart: CompactChart) -> None:
+        """Store a computed chart. Mock charts are never cached."""
+        if key is None or chart.mock:
+            return
+
+        self._local.set(key, chart)
+
+        client = self._redis.client()
+        if client is not None:
+            try:
+                await client.set(key, chart.pack(), ex=self._redis_ttl)
+            except Exception as e:
+                self._redis.failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "version": CALCULATOR_VERSION,
+            "local_size": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.local_hits + self.redis_hits) / lookups if lookups else 0.0
+        }
+
+
+chart_cache = ChartCache(
+    maxsize=settings.CHART_CACHE_SIZE,
+    redis_url=settings.REDIS_URL if settings.CHART_CACHE_REDIS else None,
+    redis_ttl=settings.CHART_CACHE_REDIS_TTL
+)
@@ -0,0 +1,122 @@
+"""
+Birth time normalization: (date, local HH:MM, IANA zone) -> UTC instant.
+
+Charts store the resolved instant in natal_charts.birth_utc, so the
+conversion happens once at creation; the calculator, cache keys and any
+later recalculation use the stored instant instead of resolving the zone
+again.
+
+Wall-clock times that occur twice (clocks set back) or never (clocks set
+forward, or a zone changing its standard offset) are rejected unless the
+caller says which offset to use: ``dst="earlier"`` reads the time with the
+offset in effect before the change, ``dst="later"`` with the one after it.
+For a repeated time these are its first and second occurrence.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import logging
+
+from ..config import settings
+from ..utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DST_CHOICES = ("earlier", "later")
+
+# Zone name -> ZoneInfo. ZoneInfo parses a zone's transition table when it
+# is constructed and only keeps a handful of zones strongly referenced, so
+# every zone seen is kept here for the life of the process.
+_zones: Dict[str, ZoneInfo] = {}
+
+# (date, time, zone, dst) -> BirthInstant
+_instants = LRUCache(settings.BIRTH_TIME_CACHE_SIZE, name="birth_time")
+
+
+class BirthTimeError(ValueError):
+    """Raised when a birth time cannot be converted to UTC."""
+
+
+class AmbiguousBirthTimeError(BirthTimeError):
+    """The local time occurred twice; ``dst`` must pick one."""
+
+
+class NonexistentBirthTimeError(BirthTimeError):
+    """The local time was skipped by a clock change; ``dst`` must pick an offset."""
+
+
+class BirthInstant(NamedTuple):
+    utc: datetime  # Aware, UTC
+    utc_offset: timedelta  # Offset of the local time that was used
+    kind: str  # "regular", "ambiguous" or "nonexistent"
+
+
+def zone_info(name: str) -> ZoneInfo:
+    """ZoneInfo for an IANA zone name, kept for the life of the process."""
+    zone = _zones.get(name)
+    if zone is None:
+        try:
+            zone = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise BirthTimeError(f"Unknown timezone {name!r}")
+        _zones[name] = zone
+    return zone
+
+
+def _format_offset(offset: timedelta) -> str:
+    minutes = int(offset.total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    return f"UTC{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+
+def _resolve(birth_date: date, birth_time: str, zone_name: str, dst: Optional[str]) -> BirthInstant:
+    try:
+        hour, minute = map(int, birth_time.split(":"))
+        naive = datetime(birth_date.year, birth_date.month, birth_date.day, hour, minute)
+    except ValueError:
+        raise BirthTimeError(f"Invalid birth time {birth_time!r}")
+    zone = zone_info(zone_name)
+
+    # PEP 495: fold=0 uses the offset before a transition, fold=1 the one after
+    before = naive.replace(tzinfo=zone, fold=0)
+    after = naive.replace(tzinfo=zone, fold=1)
+    offset_before, offset_after = before.utcoffset(), after.utcoffset()
+    if offset_before == offset_after:
+        return BirthInstant(before.astimezone(timezone.utc), offset_before, "regular")
+
+    # Clocks set back repeat the hour (offset shrinks); set forward skip it
+    kind = "ambiguous" if offset_before > offset_after else "nonexistent"
+    if dst is None:
+        options = (
+            f"dst=earlier ({_format_offset(offset_before)}) or dst=later ({_format_offset(offset_after)})"
+        )
+        if kind == "ambiguous":
+            raise AmbiguousBirthTimeError(
+                f"{birth_date} {birth_time} occurred twice in {zone_name} (clocks were set back); "
+                f"choose {options}"
+            )
+        raise NonexistentBirthTimeError(
+            f"{birth_date} {birth_time} did not exist in {zone_name} (clocks were set forward); "
+            f"choose {options}"
+        )
+    if dst not in DST_CHOICES:
+        raise BirthTimeError(f"dst must be one of {', '.join(DST_CHOICES)}")
+
+    local = before if dst == "earlier" else after
+    return BirthInstant(local.astimezone(timezone.utc), local.utcoffset(), kind)
+
+
+def birth_instant(birth_date: date, birth_time: str, zone_name: str, dst: Optional[str] = None) -> BirthInstant:
+    """
+    UTC instant of a local birth time, resolving DST explicitly.
+
+    Raises AmbiguousBirthTimeError / NonexistentBirthTimeError for times
+    at a clock change when ``dst`` is not given, BirthTimeError for an
+    unknown zone or malformed time.
+    """
+    key = (birth_date, birth_time, zone_name, dst)
+    instant = _instants.get(key)
+    if instant is None:
+        instant = _resolve(birth_date, birth_time, zone_name, dst)
+        _instants.set(key, instant)
+    return instant
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+from ..config import settings
+from ..utils.metrics import call_collecting_stages, record_stage, observe_chart_job
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when too many chart jobs are already queued."""
+
+
+class ExecutorUnavailableError(Exception):
+    """Raised when the chart executor is not running."""
+
+
+class ChartExecutor:
+    """
+    Process pool for CPU-bound chart computations.
+
+    Keeps kerykeion / Swiss Ephemeris work off the event loop. The number of
+    submitted-but-unfinished jobs is capped by ``max_pending``; once the cap is
+    reached new jobs are rejected immediately instead of piling up behind the
+    workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: int = 32,
+        timeout: float = 10.0
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._restart_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs submitted to the pool and not yet finished."""
+        return self._pending
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self._pool is not None:
+            return
+
+        # "spawn" avoids forking a process that already runs an event loop
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(
+            f"Chart executor started (workers={self._pool._max_workers}, "
+            f"max_pending={self.max_pending}, timeout={self.timeout}s)"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and drain the pool."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+            logger.info("Chart executor stopped")
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """
+        Replace ``broken`` with a fresh pool, unless that already happened.
+
+        Every job of a broken pool fails at once; only the first failure
+        restarts it, so later ones cannot tear down the replacement and
+        cancel the jobs just submitted to it.
+        """
+        with self._restart_lock:
+            if self._pool is not broken:
+                return
+            self.shutdown(wait=False)
+            self.start()
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in a worker process.
+
+        ``fn`` and its arguments must be picklable (module-level functions or
+        static methods). Raises ExecutorSaturatedError when the queue is full,
+        ExecutorUnavailableError when the pool is down and asyncio.TimeoutError
+        when the job exceeds ``timeout`` seconds.
+        """
+        if self._pool is None:
+            raise ExecutorUnavailableError("Chart executor is not running")
+
+        if self._pending >= self.max_pending:
+            raise ExecutorSaturatedError(
+                f"Chart executor queue is full ({self._pending} pending jobs)"
+            )
+
+        loop = asyncio.get_running_loop()
+
+        started = time.perf_counter()
+        pool = self._pool
+        try:
+            future = pool.submit(partial(call_collecting_stages, fn, args, kwargs))
+        except BrokenProcessPool:
+            logger.error("Chart executor pool is broken, restarting")
+            self._restart(pool)
+            raise ExecutorUnavailableError("Chart executor was restarted")
+
+        # The slot is held until the worker actually finishes, even if the
+        # caller times out, so a backlog of slow jobs keeps rejecting new ones.
+        self._pending += 1
+
+        def _on_done(_):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._release)
+
+        future.add_done_callback(_on_done)
+
+        try:
+            result, stages = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            logger.warning(f"Chart job {getattr(fn, '__qualname__', fn)} timed out after {self.timeout}s")
+            raise
+        except BrokenProcessPool:
+            logger.error("Chart worker died, restarting executor")
+            self._restart(pool)
+            raise ExecutorUnavailableError("Chart worker process crashed")
+
+        for name, seconds in stages:
+            record_stage(name, seconds)
+        observe_chart_job(getattr(fn, "__name__", "job"), time.perf_counter() - started)
+        return result
+
+
+chart_executor = ChartExecutor(
+    max_workers=settings.CHART_EXECUTOR_WORKERS or None,
+    max_pending=settings.CHART_EXECUTOR_MAX_PENDING,
+    timeout=settings.CHART_EXECUTOR_TIMEOUT
+)
@@ -0,0 +1,184 @@
+"""
+Streaming export of a user's charts as NDJSON, CSV or a zip bundle.
+
+Rows are read through a server-side cursor CHART_EXPORT_BATCH_SIZE at a
+time and encoded batch by batch, so memory stays constant however many
+charts a user has. Charts are exported oldest first; passing the id of
+the last chart received as ``after`` resumes an interrupted download. A
+resumed NDJSON or CSV export (the CSV without its header row) can be
+appended to the partial file; a resumed zip is a separate archive holding
+the remaining charts, since a truncated archive cannot be extended.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+import csv
+import io
+import json
+import zipfile
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.natal_chart import NatalChart
+from .chart_model import stored_chart
+from .chart_svg import render_chart_svg
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "zip": ("application/zip", "zip"),
+}
+
+# Birth data columns, in CSV column order
+EXPORT_COLUMNS = (
+    "id", "name", "birth_date", "birth_time", "birth_timezone", "birth_utc", "birth_latitude",
+    "birth_longitude", "birth_city", "birth_country", "is_primary", "created_at"
+)
+# CSV columns derived from the chart
+CSV_SIGNS = {
+    "sun_sign": "sun",
+    "moon_sign": "moon",
+    "ascendant_sign": "ascendant",
+}
+
+
+class _Buffer:
+    """Write-only sink for zipfile; the archive is drained after every entry."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+class ChartExportService:
+    """Encodes a user's charts batch by batch for streaming responses."""
+
+    @staticmethod
+    async def resume_point(db: AsyncSession, user_id: UUID, after: UUID) -> Optional[Tuple[datetime, UUID]]:
+        """Keyset position of chart ``after``, or None if the user has no such chart."""
+        result = await db.execute(
+            select(NatalChart.created_at, NatalChart.id).where(
+                NatalChart.id == after,
+                NatalChart.user_id == user_id
+            )
+        )
+        row = result.one_or_none()
+        return (row.created_at, row.id) if row else None
+
+    @staticmethod
+    async def batches(
+        db: AsyncSession,
+        user_id: UUID,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> AsyncIterator[List[Any]]:
+        """The user's charts oldest first, in batches from a server-side cursor."""
+        query = (
+            select(
+                *(getattr(NatalChart, name) for name in EXPORT_COLUMNS),
+                NatalChart.chart_packed,
+                NatalChart.chart_data,
+                NatalChart.interpretation_text
+            )
+            .where(NatalChart.user_id == user_id)
+            .order_by(NatalChart.created_at, NatalChart.id)
+            .execution_options(yield_per=max(1, settings.CHART_EXPORT_BATCH_SIZE))
+        )
+        if after is not None:
+            query = query.where(tuple_(NatalChart.created_at, NatalChart.id) > after)
+
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    def record(row: Any) -> Dict[str, Any]:
+        """Full export record of a chart: birth data, chart JSON and interpretation."""
+        chart = stored_chart(row.chart_packed, row.chart_data)
+        record = {name: _value(getattr(row, name)) for name in EXPORT_COLUMNS}
+        record["chart_data"] = chart.to_dict() if chart else None
+        record["interpretation_text"] = row.interpretation_text
+        return record
+
+    @staticmethod
+    def ndjson(rows: List[Any]) -> bytes:
+        return "".join(
+            json.dumps(ChartExportService.record(row), ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+    @staticmethod
+    def csv_header() -> bytes:
+        out = io.StringIO()
+        csv.writer(out).writerow(EXPORT_COLUMNS + tuple(CSV_SIGNS))
+        return out.getvalue().encode("utf-8")
+
+    @staticmethod
+    def csv(rows: List[Any]) -> bytes:
+        """Birth data and the main signs; the full chart is in the NDJSON and zip exports."""
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row in rows:
+            chart = stored_chart(row.chart_packed, row.chart_data)
+            writer.writerow(
+                [_value(getattr(row, name)) for name in EXPORT_COLUMNS]
+                + [chart.sign(point) if chart else None for point in CSV_SIGNS.values()]
+            )
+        return out.getvalue().encode("utf-8")
+
+    @staticmethod
+    def zip_entries(archive: zipfile.ZipFile, buffer: _Buffer, rows: List[Any]) -> Iterator[bytes]:
+        """Add charts/{id}.json and charts/{id}.svg per chart, yielding the archive bytes written."""
+        for row in rows:
+            record = ChartExportService.record(row)
+            archive.writestr(
+                f"charts/{record['id']}.json",
+                json.dumps(record, ensure_ascii=False, indent=2)
+            )
+            chart = stored_chart(row.chart_packed, row.chart_data)
+            if chart is not None:
+                archive.writestr(f"charts/{record['id']}.svg", render_chart_svg(chart))
+            yield buffer.drain()
+
+    @staticmethod
+    async def stream(
+        db: AsyncSession,
+        user_id: UUID,
+        fmt: str,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> AsyncIterator[bytes]:
+        """Encoded export, one chunk per batch (per chart for zip); CSV has no header when resuming."""
+        if fmt == "csv" and after is None:
+            yield ChartExportService.csv_header()
+        if fmt != "zip":
+            encode = ChartExportService.csv if fmt == "csv" else ChartExportService.ndjson
+            async for rows in ChartExportService.batches(db, user_id, after):
+                yield encode(rows)
+            return
+
+        # An unseekable sink makes zipfile write data descriptors instead
+        # of seeking back to patch each local header
+        buffer = _Buffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            async for rows in ChartExportService.batches(db, user_id, after):
+                for chunk in ChartExportService.zip_entries(archive, buffer, rows):
+                    yield chunk
+        yield buffer.drain()
@@ -0,0 +1,339 @@
+"""
+Bulk natal chart import from NDJSON or CSV uploads.
+
+The upload is read as a stream of lines and handled in batches of
+CHART_IMPORT_BATCH_SIZE rows: each batch is validated with NatalChartCreate,
+its charts are computed in parallel executor jobs (CHART_IMPORT_CHUNK_SIZE
+charts each, cached charts are reused), and the valid rows are written with
+one multi-row INSERT and committed. Only the current batch is held in
+memory; a failure in a later batch keeps the rows already committed.
+
+run() yields one report entry per row and a final summary.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import uuid
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.user import User, SubscriptionTier
+from ..models.natal_chart import NatalChart
+from ..models.interpretation import InterpretationStatus
+from ..schemas.natal_chart import NatalChartCreate
+from ..utils.metrics import stage
+from .astro_calculator import AstroCalculatorService, chart_cache, chart_cache_key
+from .chart_executor import chart_executor, ExecutorSaturatedError, ExecutorUnavailableError
+from .chart_model import CompactChart
+from .interpretation_engine import InterpretationEngine
+from .interpretation_jobs import InterpretationJobService
+from .places import resolve_birth_place, PlaceResolutionError
+from .birth_time import birth_instant, BirthTimeError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+# Longest accepted line (CSV: record); keeps a file without newlines from
+# being buffered whole
+MAX_LINE_BYTES = 64 * 1024
+
+# Attempts at submitting a chunk while the chart executor is saturated
+SUBMIT_ATTEMPTS = 5
+
+# Keyword arguments of AstroCalculatorService.generate_natal_chart
+CHART_ARGUMENTS = (
+    "birth_date", "birth_time", "birth_latitude", "birth_longitude", "birth_city", "birth_timezone"
+)
+
+
+class ChartImportError(Exception):
+    """Raised when the upload itself is unreadable (encoding, line length, CSV header)."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream and yield its lines without line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(buffer) > MAX_LINE_BYTES:
+                raise ChartImportError(f"Line longer than {MAX_LINE_BYTES} bytes")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ChartImportError("Upload is not valid UTF-8")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], str]]]:
+    """Yield (row number, object or parse error) for each non-empty line."""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row, "Expected a JSON object"
+            continue
+        yield row, record
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], str]]]:
+    """
+    Yield (row number, record or parse error) for each CSV record.
+
+    The first record is the header with NatalChartCreate field names.
+    Quoted fields may span lines; empty cells are treated as missing.
+    """
+    header: Optional[List[str]] = None
+    row = 0
+    pending = ""
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2:
+            if len(pending) > MAX_LINE_BYTES:
+                raise ChartImportError(f"Record longer than {MAX_LINE_BYTES} bytes")
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(record)))
+        except csv.Error as e:
+            if header is None:
+                raise ChartImportError(f"Invalid CSV header: {e}")
+            row += 1
+            yield row, f"Invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            unknown = [name for name in header if name not in NatalChartCreate.model_fields]
+            if unknown:
+                raise ChartImportError(f"Unknown CSV columns: {', '.join(unknown)}")
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+
+    if pending:
+        row += 1
+        yield row, "Unterminated quoted field"
+
+
+def validation_errors(error: ValidationError) -> List[Dict[str, str]]:
+    return [
+        {"field": ".".join(str(part) for part in e["loc"]), "message": e["msg"]}
+        for e in error.errors()
+    ]
+
+
+class ChartImportService:
+    """Validates, computes and stores uploaded charts batch by batch."""
+
+    @staticmethod
+    async def _compute_chunk(records: List[Dict[str, Any]]) -> List[Union[CompactChart, str]]:
+        for attempt in range(SUBMIT_ATTEMPTS):
+            try:
+                return await chart_executor.run(AstroCalculatorService.generate_natal_charts, records)
+            except ExecutorSaturatedError:
+                # Interactive requests keep priority; back off and retry
+                await asyncio.sleep(0.5 * 2 ** attempt)
+            except (ExecutorUnavailableError, asyncio.TimeoutError):
+                break
+        return ["Chart calculation is temporarily unavailable"] * len(records)
+
+    @staticmethod
+    async def compute(
+        charts: List[NatalChartCreate],
+        birth_utcs: List[datetime]
+    ) -> List[Union[CompactChart, str]]:
+        """
+        Charts for ``charts`` in order (or error messages), from the cache or the executor.
+
+        ``birth_utcs`` are the charts' birth instants from services/birth_time.py.
+        """
+        keys = [
+            chart_cache_key(birth_utc, chart.birth_latitude, chart.birth_longitude)
+            for chart, birth_utc in zip(charts, birth_utcs)
+        ]
+        results: List[Union[CompactChart, str, None]] = [await chart_cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        size = max(1, settings.CHART_IMPORT_CHUNK_SIZE)
+        chunks = [missing[start:start + size] for start in range(0, len(missing), size)]
+        computed = await asyncio.gather(*(
+            ChartImportService._compute_chunk([
+                {**{name: getattr(charts[i], name) for name in CHART_ARGUMENTS}, "birth_utc": birth_utcs[i]}
+                for i in chunk
+            ])
+            for chunk in chunks
+        ))
+        for chunk, chunk_results in zip(chunks, computed):
+            for i, result in zip(chunk, chunk_results):
+                results[i] = result
+                if isinstance(result, CompactChart):
+                    await chart_cache.set(keys[i], result)
+        return results
+
+    @staticmethod
+    async def _store_batch(
+        db: AsyncSession,
+        user: User,
+        batch: List[Tuple[int, NatalChartCreate, datetime]]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Compute and insert one batch; returns the report entries and whether LLM jobs were queued."""
+        report: List[Dict[str, Any]] = []
+        computed = await ChartImportService.compute(
+            [chart for _, chart, _ in batch], [birth_utc for _, _, birth_utc in batch]
+        )
+
+        tier = user.subscription_tier.value.lower()
+        jobs: Dict[str, Any] = {}
+        rows = []
+        for (row, chart_data, birth_utc), calculated in zip(batch, computed):
+            if not isinstance(calculated, CompactChart):
+                report.append({"row": row, "status": "error", "errors": [{"field": "", "message": calculated}]})
+                continue
+
+            try:
+                with stage("interpretation"):
+                    interpretation = InterpretationEngine.interpret_natal_chart(calculated)
+            except Exception:
+                interpretation = "Натальная карта создана. Интерпретация будет доступна позже."
+
+            feature_hash = None
+            if user.subscription_tier != SubscriptionTier.FREE:
+                # One job per distinct set of chart features in the batch
+                feature_hash = InterpretationEngine.feature_hash(
+                    InterpretationEngine.chart_features(calculated, tier)
+                )
+                job = jobs.get(feature_hash)
+                if job is None:
+                    job = jobs[feature_hash] = await InterpretationJobService.enqueue(db, calculated, tier)
+                if job.status == InterpretationStatus.DONE:
+                    interpretation = job.result_text
+
+            chart_id = uuid.uuid4()
+            rows.append({
+                "id": chart_id,
+                "user_id": user.id,
+                "name": chart_data.name,
+                "birth_date": chart_data.birth_date,
+                "birth_time": chart_data.birth_time,
+                "birth_timezone": chart_data.birth_timezone,
+                "birth_utc": birth_utc,
+                "birth_latitude": chart_data.birth_latitude,
+                "birth_longitude": chart_data.birth_longitude,
+                "birth_city": chart_data.birth_city,
+                "birth_country": chart_data.birth_country,
+                "chart_packed": calculated.pack(),
+                "interpretation_text": interpretation,
+                "interpretation_hash": feature_hash,
+                "svg_chart": None,
+                "is_primary": chart_data.is_primary,
+            })
+            report.append({"row": row, "status": "created", "id": str(chart_id)})
+
+        if rows:
+            await db.execute(insert(NatalChart).values(rows))
+        await db.commit()
+        queued = any(job.status != InterpretationStatus.DONE for job in jobs.values())
+        return sorted(report, key=lambda entry: entry["row"]), queued
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        user: User,
+        chunks: AsyncIterator[bytes],
+        fmt: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Import an upload, yielding a report entry per row and a final summary.
+
+        Entries are ``{"row", "status": "created", "id"}`` or ``{"row",
+        "status": "error", "errors"}``. The summary has ``"status": "done"``,
+        or ``"aborted"`` with an ``error`` if the upload could not be read
+        further; rows reported as created before that stay committed.
+        """
+        parse = parse_csv if fmt == "csv" else parse_ndjson
+        batch_size = max(1, settings.CHART_IMPORT_BATCH_SIZE)
+        totals = {"created": 0, "failed": 0}
+        queued = False
+        # Valid rows of the current batch, and rows already rejected in it
+        batch: List[Tuple[int, NatalChartCreate, datetime]] = []
+        errors: List[Dict[str, Any]] = []
+
+        async def flush() -> List[Dict[str, Any]]:
+            nonlocal queued
+            stored: List[Dict[str, Any]] = []
+            if batch:
+                stored, batch_queued = await ChartImportService._store_batch(db, user, batch)
+                queued = queued or batch_queued
+            report = sorted(errors + stored, key=lambda entry: entry["row"])
+            for entry in report:
+                totals["created" if entry["status"] == "created" else "failed"] += 1
+            batch.clear()
+            errors.clear()
+            return report
+
+        summary: Dict[str, Any] = {"status": "done"}
+        try:
+            async for row, record in parse(iter_lines(chunks)):
+                if row > settings.CHART_IMPORT_MAX_ROWS:
+                    summary = {"status": "aborted", "error": f"More than {settings.CHART_IMPORT_MAX_ROWS} rows"}
+                    break
+                if isinstance(record, str):
+                    errors.append({"row": row, "status": "error", "errors": [{"field": "", "message": record}]})
+                    continue
+                try:
+                    chart = resolve_birth_place(NatalChartCreate.model_validate(record))
+                    birth_utc = birth_instant(chart.birth_date, chart.birth_time, chart.birth_timezone, chart.dst).utc
+                    batch.append((row, chart, birth_utc))
+                except ValidationError as e:
+                    errors.append({"row": row, "status": "error", "errors": validation_errors(e)})
+                    continue
+                except PlaceResolutionError as e:
+                    errors.append({"row": row, "status": "error", "errors": [{"field": "place_id", "message": str(e)}]})
+                    continue
+                except BirthTimeError as e:
+                    errors.append({"row": row, "status": "error", "errors": [{"field": "birth_time", "message": str(e)}]})
+                    continue
+
+                if len(batch) >= batch_size:
+                    for entry in await flush():
+                        yield entry
+        except ChartImportError as e:
+            summary = {"status": "aborted", "error": str(e)}
+
+        for entry in await flush():
+            yield entry
+
+        summary.update(totals, interpretations_queued=queued)
+        logger.info(
+            f"Chart import for user {user.id}: {totals['created']} created, "
+            f"{totals['failed']} failed ({summary['status']})"
+        )
+        yield summary
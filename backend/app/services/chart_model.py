@@ -0,0 +1,244 @@
+"""
+Compact natal chart representation.
+
+A chart is a handful of numbers: 13 longitudes, 12 house cusps, the house
+of each body, retrograde flags and a short list of aspects. CompactChart
+keeps them in fixed-layout arrays instead of nested dicts with repeated
+keys; sign names and in-sign positions are derived from the longitudes on
+demand. pack() produces a ~225 byte record stored in natal_charts.chart_packed
+(the JSON document was ~3 KB), and to_dict() builds the JSON shape only
+where the API returns it.
+"""
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import struct
+
+from .ephemeris import BODIES
+
+# Fixed point order: every body, then the angles
+POINTS: Tuple[str, ...] = BODIES + ("ascendant", "midheaven")
+_POINT_INDEX = {name: i for i, name in enumerate(POINTS)}
+
+SIGNS = ("Ari", "Tau", "Gem", "Can", "Leo", "Vir", "Lib", "Sco", "Sag", "Cap", "Aqu", "Pis")
+
+HOUSE_NAMES = (
+    "First_House", "Second_House", "Third_House", "Fourth_House", "Fifth_House", "Sixth_House",
+    "Seventh_House", "Eighth_House", "Ninth_House", "Tenth_House", "Eleventh_House", "Twelfth_House",
+)
+
+# Name tables for aspect records (kerykeion spelling); anything else packs as "Unknown"
+ASPECT_NAMES = (
+    "conjunction", "semi-sextile", "semi-square", "sextile", "quintile", "square",
+    "trine", "sesquiquadrate", "biquintile", "quincunx", "opposition",
+)
+ASPECT_POINT_NAMES = (
+    "Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune",
+    "Pluto", "Mean_Node", "True_Node", "Chiron", "Ascendant", "Medium_Coeli",
+    "Descendant", "Imum_Coeli",
+)
+UNKNOWN = 255
+
+PACK_VERSION = 1
+FLAG_MOCK = 1
+# version, flags, n_aspects, calculated_at (unix seconds, NaN if unknown)
+_HEADER = struct.Struct("<BBHd")
+_BODY = struct.Struct(f"<{len(POINTS)}d12d{len(BODIES)}BH")
+# point1, point2, aspect, orb (float32, served rounded to 4 decimals), applying
+_ASPECT = struct.Struct("<BBBfB")
+
+# (point1, point2, aspect, orb, applying) with indexes into the name tables
+AspectRecord = Tuple[int, int, int, float, bool]
+
+
+def _lookup(names: Tuple[str, ...], value: Any) -> int:
+    lowered = str(value).lower()
+    for i, name in enumerate(names):
+        if name.lower() == lowered:
+            return i
+    return UNKNOWN
+
+
+def _name(names: Tuple[str, ...], index: int) -> str:
+    return names[index] if index < len(names) else "Unknown"
+
+
+def house_number(value: Any) -> int:
+    """1-12 from "Ninth_House", "9" or 9; 0 if unknown."""
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        number = int(value)
+        return number if 1 <= number <= 12 else 0
+    index = _lookup(HOUSE_NAMES, value)
+    return 0 if index == UNKNOWN else index + 1
+
+
+def aspect_record(point1: Any, point2: Any, aspect: Any, orb: Any, applying: Any) -> AspectRecord:
+    return (
+        _lookup(ASPECT_POINT_NAMES, point1),
+        _lookup(ASPECT_POINT_NAMES, point2),
+        _lookup(ASPECT_NAMES, aspect),
+        float(orb),
+        bool(applying),
+    )
+
+
+class CompactChart:
+    """Natal chart stored as fixed-layout arrays."""
+
+    __slots__ = ("longitudes", "cusps", "houses", "retrograde", "aspects", "calculated_at", "mock")
+
+    def __init__(
+        self,
+        longitudes: array,
+        cusps: array,
+        houses: bytes,
+        retrograde: int = 0,
+        aspects: Optional[List[AspectRecord]] = None,
+        calculated_at: Optional[float] = None,
+        mock: bool = False
+    ):
+        self.longitudes = longitudes  # array("d") in POINTS order, NaN if missing
+        self.cusps = cusps  # array("d") of 12 house cusp longitudes
+        self.houses = houses  # house number (1-12, 0 unknown) of each body
+        self.retrograde = retrograde  # bit i set if BODIES[i] is retrograde
+        self.aspects = aspects or []
+        self.calculated_at = calculated_at
+        self.mock = mock
+
+    # Pickle as the packed record (charts cross the process pool boundary)
+    def __reduce__(self):
+        return CompactChart.unpack, (self.pack(),)
+
+    def longitude(self, point: str) -> Optional[float]:
+        lon = self.longitudes[_POINT_INDEX[point]]
+        return None if math.isnan(lon) else lon
+
+    def sign(self, point: str) -> Optional[str]:
+        lon = self.longitude(point)
+        return None if lon is None else SIGNS[int(lon // 30.0) % 12]
+
+    def house(self, point: str) -> int:
+        return self.houses[_POINT_INDEX[point]] if point in BODIES else 0
+
+    def is_retrograde(self, point: str) -> bool:
+        return point in BODIES and bool(self.retrograde >> _POINT_INDEX[point] & 1)
+
+    @classmethod
+    def from_dict(cls, chart_data: Dict[str, Any]) -> "CompactChart":
+        """Build from the JSON document shape (legacy chart_data rows, mock charts)."""
+        planets = chart_data.get("planets", {})
+        longitudes = array("d", (float(planets.get(p, {}).get("abs_pos", math.nan)) for p in POINTS))
+        houses = bytes(house_number(planets.get(p, {}).get("house", 0)) for p in BODIES)
+        retrograde = sum(1 << i for i, p in enumerate(BODIES) if planets.get(p, {}).get("retrograde"))
+
+        cusps = array("d", [math.nan] * 12)
+        for house in chart_data.get("houses", []):
+            number = house_number(house.get("house", 0))
+            if number:
+                cusps[number - 1] = float(house.get("abs_pos", math.nan))
+
+        aspects = [
+            aspect_record(a.get("planet1"), a.get("planet2"), a.get("aspect"), a.get("orb", 0.0), a.get("applying"))
+            for a in chart_data.get("aspects", [])
+        ]
+
+        calculated_at = None
+        if chart_data.get("calculation_date"):
+            calculated_at = (datetime.fromisoformat(chart_data["calculation_date"]) - datetime(1970, 1, 1)).total_seconds()
+
+        return cls(longitudes, cusps, houses, retrograde, aspects, calculated_at, bool(chart_data.get("mock")))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The chart_data JSON document served by the API."""
+        planets = {}
+        for i, point in enumerate(POINTS):
+            lon = self.longitudes[i]
+            if math.isnan(lon):
+                continue
+            sign, position = SIGNS[int(lon // 30.0) % 12], lon % 30.0
+            if i < len(BODIES):
+                planets[point] = {
+                    "sign": sign,
+                    "position": position,
+                    "house": HOUSE_NAMES[self.houses[i] - 1] if self.houses[i] else "Unknown",
+                    "retrograde": bool(self.retrograde >> i & 1),
+                    "abs_pos": lon
+                }
+            else:
+                planets[point] = {"sign": sign, "position": position, "abs_pos": lon}
+
+        houses = [
+            {"house": i, "sign": SIGNS[int(lon // 30.0) % 12], "position": lon % 30.0, "abs_pos": lon}
+            if not math.isnan(lon)
+            else {"house": i, "sign": "Unknown", "position": 0.0, "abs_pos": 0.0}
+            for i, lon in enumerate(self.cusps, 1)
+        ]
+
+        chart_data = {
+            "planets": planets,
+            "houses": houses,
+            "aspects": [
+                {
+                    "planet1": _name(ASPECT_POINT_NAMES, p1),
+                    "planet2": _name(ASPECT_POINT_NAMES, p2),
+                    "aspect": _name(ASPECT_NAMES, aspect),
+                    "orb": round(orb, 4),
+                    "applying": applying
+                }
+                for p1, p2, aspect, orb, applying in self.aspects
+            ],
+            "calculation_date": (
+                datetime.utcfromtimestamp(round(self.calculated_at, 6)).isoformat()
+                if self.calculated_at is not None else None
+            )
+        }
+        if self.mock:
+            chart_data["mock"] = True
+        return chart_data
+
+    def pack(self) -> bytes:
+        """Fixed-layout binary record for the chart_packed column."""
+        calculated_at = math.nan if self.calculated_at is None else self.calculated_at
+        parts = [
+            _HEADER.pack(PACK_VERSION, FLAG_MOCK if self.mock else 0, len(self.aspects), calculated_at),
+            _BODY.pack(*self.longitudes, *self.cusps, *self.houses, self.retrograde),
+        ]
+        parts.extend(_ASPECT.pack(*aspect) for aspect in self.aspects)
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "CompactChart":
+        version, flags, n_aspects, calculated_at = _HEADER.unpack_from(data, 0)
+        if version != PACK_VERSION:
+            raise ValueError(f"Unsupported packed chart version {version}")
+
+        values = _BODY.unpack_from(data, _HEADER.size)
+        n_points = len(POINTS)
+        n_bodies = len(BODIES)
+        offset = _HEADER.size + _BODY.size
+
+        aspects = []
+        for _ in range(n_aspects):
+            p1, p2, aspect, orb, applying = _ASPECT.unpack_from(data, offset)
+            aspects.append((p1, p2, aspect, orb, bool(applying)))
+            offset += _ASPECT.size
+
+        return cls(
+            longitudes=array("d", values[:n_points]),
+            cusps=array("d", values[n_points:n_points + 12]),
+            houses=bytes(values[n_points + 12:n_points + 12 + n_bodies]),
+            retrograde=values[-1],
+            aspects=aspects,
+            calculated_at=None if math.isnan(calculated_at) else calculated_at,
+            mock=bool(flags & FLAG_MOCK)
+        )
+
+
+def stored_chart(chart_packed: Optional[bytes], chart_data: Optional[Dict[str, Any]]) -> Optional[CompactChart]:
+    """Chart from a natal_charts row: the packed column, or legacy JSONB for old rows."""
+    if chart_packed:
+        return CompactChart.unpack(chart_packed)
+    if chart_data:
+        return CompactChart.from_dict(chart_data)
+    return None
@@ -0,0 +1,180 @@
+"""
+Natal chart wheel rendered as SVG.
+
+The zodiac ring (sign segments, glyphs and degree ticks) is identical for
+every chart, so it is built once per process and reused; a chart only adds a
+rotation (ascendant on the left) and a small dynamic layer with house cusps,
+planets and aspect lines.
+"""
+from functools import lru_cache
+from typing import List, Tuple
+import math
+
+from .chart_model import CompactChart
+from .ephemeris import BODIES
+
+# Bump whenever the output changes; part of the SVG ETag
+RENDERER_VERSION = "1"
+
+SIZE = 600
+CENTER = SIZE / 2
+R_OUTER = 290.0  # Outer edge of the sign ring
+R_SIGNS = 250.0  # Inner edge of the sign ring, degree ticks point inwards from here
+R_PLANETS = 215.0
+R_DEGREES = 190.0
+R_HOUSES = 165.0  # Inner edge of the house number ring
+R_ASPECTS = 145.0
+
+SIGN_GLYPHS = "♈♉♊♋♌♍♎♏♐♑♒♓"
+SIGN_COLORS = ("#e85d4a", "#6a9a4b", "#d9b43f", "#4a7fb5")  # fire, earth, air, water
+TEXT_STYLE = "︎"  # Render glyphs as text, not emoji
+
+PLANET_GLYPHS = {
+    "sun": "☉", "moon": "☽", "mercury": "☿", "venus": "♀", "mars": "♂",
+    "jupiter": "♃", "saturn": "♄", "uranus": "♅", "neptune": "♆",
+    "pluto": "♇", "north_node": "☊",
+}
+
+# Angle -> (orb, stroke color, dash pattern)
+ASPECT_STYLES = {
+    0.0: (8.0, "#8e6bbf", None),
+    60.0: (4.0, "#4a7fb5", "4,3"),
+    90.0: (6.0, "#d0453a", None),
+    120.0: (6.0, "#3c8d5a", None),
+    180.0: (8.0, "#d0453a", "6,3"),
+}
+
+# Planet glyphs closer than this are spread apart around the ring
+MIN_GLYPH_SEPARATION = 7.0
+
+
+def _xy(longitude: float, radius: float, ascendant: float = 0.0) -> Tuple[float, float]:
+    """Screen coordinates of a longitude; the ascendant sits at 9 o'clock, longitude increases counterclockwise."""
+    angle = math.radians(180.0 + longitude - ascendant)
+    return CENTER + radius * math.cos(angle), CENTER - radius * math.sin(angle)
+
+
+def _line(lon: float, r1: float, r2: float, ascendant: float, attrs: str) -> str:
+    x1, y1 = _xy(lon, r1, ascendant)
+    x2, y2 = _xy(lon, r2, ascendant)
+    return f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" {attrs}/>'
+
+
+def _text(lon: float, radius: float, ascendant: float, text: str, attrs: str) -> str:
+    x, y = _xy(lon, radius, ascendant)
+    return f'<text x="{x:.1f}" y="{y:.1f}" {attrs}>{text}</text>'
+
+
+@lru_cache(maxsize=1)
+def wheel_template() -> str:
+    """The static zodiac ring for ascendant 0 (built once per process)."""
+    parts = [
+        f'<circle cx="{CENTER:g}" cy="{CENTER:g}" r="{R_OUTER:g}" fill="#fbf9ff" stroke="#3b2f5c" stroke-width="2"/>',
+        f'<circle cx="{CENTER:g}" cy="{CENTER:g}" r="{R_SIGNS:g}" fill="#ffffff" stroke="#3b2f5c" stroke-width="1.5"/>',
+    ]
+    for sign in range(12):
+        start = sign * 30.0
+        parts.append(_line(start, R_SIGNS, R_OUTER, 0.0, 'stroke="#3b2f5c" stroke-width="1"'))
+        parts.append(_text(
+            start + 15.0, (R_SIGNS + R_OUTER) / 2, 0.0, SIGN_GLYPHS[sign] + TEXT_STYLE,
+            f'class="sign" fill="{SIGN_COLORS[sign % 4]}"'
+        ))
+    for degree in range(360):
+        if degree % 30:
+            length = 8.0 if degree % 10 == 0 else 5.0 if degree % 5 == 0 else 3.0
+            parts.append(_line(float(degree), R_SIGNS - length, R_SIGNS, 0.0, 'class="tick"'))
+    return "".join(parts)
+
+
+def _spread(longitudes: List[Tuple[str, float]]) -> List[Tuple[str, float, float]]:
+    """(name, true longitude, display longitude) with crowded glyphs pushed apart."""
+    ordered = sorted(longitudes, key=lambda item: item[1])
+    display = [lon for _, lon in ordered]
+    # A few relaxation passes are enough for the 11 bodies of a chart
+    for _ in range(len(display)):
+        moved = False
+        for i in range(len(display)):
+            j = (i + 1) % len(display)
+            gap = (display[j] - display[i]) % 360.0
+            if len(display) > 1 and gap < MIN_GLYPH_SEPARATION:
+                shift = (MIN_GLYPH_SEPARATION - gap) / 2
+                display[i] -= shift
+                display[j] += shift
+                moved = True
+        if not moved:
+            break
+    return [(name, lon, shown % 360.0) for (name, lon), shown in zip(ordered, display)]
+
+
+def _aspects(bodies: List[Tuple[str, float]]) -> List[Tuple[float, float, float]]:
+    """(longitude1, longitude2, aspect angle) for major aspects between bodies."""
+    found = []
+    for i, (_, lon1) in enumerate(bodies):
+        for _, lon2 in bodies[i + 1:]:
+            separation = abs((lon1 - lon2 + 180.0) % 360.0 - 180.0)
+            for angle, (orb, _, _) in ASPECT_STYLES.items():
+                if abs(separation - angle) <= orb:
+                    found.append((lon1, lon2, angle))
+    return found
+
+
+def render_chart_svg(chart: CompactChart) -> str:
+    """SVG chart wheel: static zodiac ring plus this chart's houses, planets and aspects."""
+    ascendant = chart.longitude("ascendant") or 0.0
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SIZE} {SIZE}" width="{SIZE}" height="{SIZE}" '
+        'font-family="DejaVu Sans, Segoe UI Symbol, sans-serif">',
+        '<style>'
+        '.sign{font-size:22px;text-anchor:middle;dominant-baseline:central}'
+        '.tick{stroke:#3b2f5c;stroke-width:0.6}'
+        '.planet{font-size:20px;text-anchor:middle;dominant-baseline:central;fill:#2a2140}'
+        '.deg{font-size:10px;text-anchor:middle;dominant-baseline:central;fill:#6b5f87}'
+        '.house{font-size:11px;text-anchor:middle;dominant-baseline:central;fill:#8a80a3}'
+        '</style>',
+        # SVG rotates clockwise: this puts the ascendant's longitude at 9 o'clock
+        f'<g transform="rotate({ascendant:.3f} {CENTER:g} {CENTER:g})">{wheel_template()}</g>',
+        f'<circle cx="{CENTER:g}" cy="{CENTER:g}" r="{R_HOUSES:g}" fill="none" stroke="#c9c0dd"/>',
+        f'<circle cx="{CENTER:g}" cy="{CENTER:g}" r="{R_ASPECTS:g}" fill="none" stroke="#3b2f5c"/>',
+    ]
+
+    # House cusps and numbers
+    cusps = [lon for lon in chart.cusps if not math.isnan(lon)]
+    if len(cusps) == 12:
+        for i, lon in enumerate(cusps):
+            angle_cusp = i in (0, 3, 6, 9)
+            parts.append(_line(
+                lon, R_ASPECTS, R_SIGNS, ascendant,
+                f'stroke="#3b2f5c" stroke-width="{2 if angle_cusp else 0.8}"'
+            ))
+            width = (cusps[(i + 1) % 12] - lon) % 360.0
+            parts.append(_text(lon + width / 2, (R_ASPECTS + R_HOUSES) / 2, ascendant, str(i + 1), 'class="house"'))
+
+    for point, label in (("ascendant", "AC"), ("midheaven", "MC")):
+        lon = chart.longitude(point)
+        if lon is not None:
+            parts.append(_text(lon, R_OUTER, ascendant, label, 'class="deg" font-weight="bold" dy="-8"'))
+
+    # Aspect lines between bodies
+    bodies = [(body, chart.longitude(body)) for body in BODIES if chart.longitude(body) is not None]
+    for lon1, lon2, angle in _aspects(bodies):
+        _, color, dash = ASPECT_STYLES[angle]
+        x1, y1 = _xy(lon1, R_ASPECTS, ascendant)
+        x2, y2 = _xy(lon2, R_ASPECTS, ascendant)
+        dash_attr = f' stroke-dasharray="{dash}"' if dash else ""
+        parts.append(
+            f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+            f'stroke="{color}" stroke-width="1"{dash_attr}/>'
+        )
+
+    # Planets: a tick at the exact position, glyph and degree nudged apart if crowded
+    for body, lon, shown in _spread(bodies):
+        parts.append(_line(lon, R_SIGNS - 10.0, R_SIGNS, ascendant, 'stroke="#2a2140" stroke-width="1.5"'))
+        glyph = PLANET_GLYPHS[body] + TEXT_STYLE
+        if chart.is_retrograde(body):
+            glyph += "℞"
+        parts.append(_text(shown, R_PLANETS, ascendant, glyph, 'class="planet"'))
+        parts.append(_text(shown, R_DEGREES, ascendant, f"{int(lon % 30.0)}°", 'class="deg"'))
+
+    parts.append("</svg>")
+    return "".join(parts)
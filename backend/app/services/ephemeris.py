@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from .ephemeris_table import get_table
+
+try:
+    import swisseph as swe
+    SWISSEPH_AVAILABLE = True
+except ImportError:
+    SWISSEPH_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Chart point name -> Swiss Ephemeris body id (names match chart_data["planets"])
+BODY_IDS = {
+    "sun": 0,
+    "moon": 1,
+    "mercury": 2,
+    "venus": 3,
+    "mars": 4,
+    "jupiter": 5,
+    "saturn": 6,
+    "uranus": 7,
+    "neptune": 8,
+    "pluto": 9,
+    "north_node": 10,  # mean node, as in AstroCalculatorService
+}
+
+BODIES: Tuple[str, ...] = tuple(BODY_IDS)
+
+# Julian day of the Unix epoch
+UNIX_EPOCH_JD = 2440587.5
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+_ephe_path_set = False
+
+
+def _ensure_ephe_path() -> None:
+    """Point Swiss Ephemeris at kerykeion's bundled data files, once."""
+    global _ephe_path_set
+    if _ephe_path_set:
+        return
+    try:
+        import kerykeion
+        swe.set_ephe_path(str(Path(kerykeion.__file__).parent / "sweph"))
+    except ImportError:
+        # Without data files swisseph falls back to the Moshier ephemeris
+        logger.warning("kerykeion ephemeris files not found, using Moshier ephemeris")
+    _ephe_path_set = True
+
+
+def julian_days(timestamps: Union[Iterable[datetime], np.ndarray]) -> np.ndarray:
+    """
+    Convert timestamps to Julian days (UT).
+
+    Accepts a numpy datetime64 array or an iterable of datetimes; naive
+    datetimes are treated as UTC.
+    """
+    if isinstance(timestamps, np.ndarray) and np.issubdtype(timestamps.dtype, np.datetime64):
+        seconds = timestamps.astype("datetime64[ms]").astype(np.int64) / 1000.0
+    else:
+        seconds = np.fromiter(
+            (
+                (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+                for t in timestamps
+            ),
+            dtype=np.float64
+        )
+    return seconds / 86400.0 + UNIX_EPOCH_JD
+
+
+def datetimes_from_julian_days(jd_ut: np.ndarray) -> np.ndarray:
+    """Convert Julian days (UT) back to a datetime64[s] array."""
+    seconds = np.round((np.asarray(jd_ut, dtype=np.float64) - UNIX_EPOCH_JD) * 86400.0)
+    return seconds.astype("datetime64[s]")
+
+
+@dataclass
+class EphemerisBatch:
+    """
+    Positions of several bodies at N instants.
+
+    ``longitudes`` and ``speeds`` have shape (N, len(bodies)) and are in
+    ecliptic degrees and degrees/day. Ascendant and midheaven are only
+    present when locations were given.
+    """
+
+    jd_ut: np.ndarray
+    bodies: Tuple[str, ...]
+    longitudes: np.ndarray
+    speeds: np.ndarray
+    ascendant: Optional[np.ndarray] = None
+    midheaven: Optional[np.ndarray] = None
+
+    @property
+    def retrograde(self) -> np.ndarray:
+        return self.speeds < 0
+
+    def index(self, body: str) -> int:
+        return self.bodies.index(body)
+
+    def longitude(self, body: str) -> np.ndarray:
+        return self.longitudes[:, self.index(body)]
+
+    def speed(self, body: str) -> np.ndarray:
+        return self.speeds[:, self.index(body)]
+
+
+class EphemerisEngine:
+    """
+    Batch planetary positions.
+
+    Served from the precomputed ephemeris table when one is configured and
+    covers the request, otherwise straight from Swiss Ephemeris.
+    """
+
+    FLAGS = (swe.FLG_SWIEPH | swe.FLG_SPEED) if SWISSEPH_AVAILABLE else 0
+
+    @staticmethod
+    def compute(
+        jd_ut: ArrayLike,
+        bodies: Sequence[str] = BODIES,
+        latitudes: Optional[ArrayLike] = None,
+        longitudes: Optional[ArrayLike] = None
+    ) -> EphemerisBatch:
+        """
+        Compute positions for all ``bodies`` at every Julian day in ``jd_ut``.
+
+        ``latitudes``/``longitudes`` may be scalars or arrays of the same
+        length as ``jd_ut``; when given, Placidus ascendant and midheaven are
+        computed for each row as well.
+        """
+        jd = np.atleast_1d(np.asarray(jd_ut, dtype=np.float64))
+        bodies = tuple(bodies)
+
+        table = get_table()
+        if table is None or not table.covers(jd, bodies):
+            return EphemerisEngine.compute_swisseph(jd, bodies, latitudes, longitudes)
+
+        lon_out, speed_out = table.positions(jd, bodies)
+        batch = EphemerisBatch(jd_ut=jd, bodies=bodies, longitudes=lon_out, speeds=speed_out)
+        if latitudes is not None and longitudes is not None:
+            EphemerisEngine._add_angles(batch, latitudes, longitudes)
+        return batch
+
+    @staticmethod
+    def compute_swisseph(
+        jd_ut: ArrayLike,
+        bodies: Sequence[str] = BODIES,
+        latitudes: Optional[ArrayLike] = None,
+        longitudes: Optional[ArrayLike] = None
+    ) -> EphemerisBatch:
+        """Same as compute() but always calls Swiss Ephemeris."""
+        if not SWISSEPH_AVAILABLE:
+            raise RuntimeError("pyswisseph is not installed")
+        _ensure_ephe_path()
+
+        jd = np.atleast_1d(np.asarray(jd_ut, dtype=np.float64))
+        n = jd.shape[0]
+        bodies = tuple(bodies)
+
+        lon_out = np.empty((n, len(bodies)), dtype=np.float64)
+        speed_out = np.empty((n, len(bodies)), dtype=np.float64)
+
+        calc_ut = swe.calc_ut
+        flags = EphemerisEngine.FLAGS
+        jd_list = jd.tolist()
+
+        # Body-major order keeps Swiss Ephemeris' per-body file cache warm
+        for col, body in enumerate(bodies):
+            body_id = BODY_IDS[body]
+            values = [calc_ut(t, body_id, flags)[0] for t in jd_list]
+            arr = np.asarray(values, dtype=np.float64).reshape(n, -1)
+            lon_out[:, col] = arr[:, 0]
+            speed_out[:, col] = arr[:, 3]
+
+        batch = EphemerisBatch(jd_ut=jd, bodies=bodies, longitudes=lon_out, speeds=speed_out)
+        if latitudes is not None and longitudes is not None:
+            EphemerisEngine._add_angles(batch, latitudes, longitudes)
+        return batch
+
+    @staticmethod
+    def _add_angles(batch: EphemerisBatch, latitudes: ArrayLike, longitudes: ArrayLike) -> None:
+        """Fill in ascendant and midheaven (house cusps are location dependent, never tabulated)."""
+        if not SWISSEPH_AVAILABLE:
+            raise RuntimeError("pyswisseph is not installed")
+        _ensure_ephe_path()
+
+        n = batch.jd_ut.shape[0]
+        lats = np.broadcast_to(np.asarray(latitudes, dtype=np.float64), (n,)).tolist()
+        lngs = np.broadcast_to(np.asarray(longitudes, dtype=np.float64), (n,)).tolist()
+        angles = np.asarray(
+            [swe.houses_ex(t, lat, lng, b"P")[1][:2] for t, lat, lng in zip(batch.jd_ut.tolist(), lats, lngs)],
+            dtype=np.float64
+        ).reshape(n, 2)
+        batch.ascendant = angles[:, 0]
+        batch.midheaven = angles[:, 1]
+
+    @staticmethod
+    def compute_for_datetimes(
+        timestamps: Union[Iterable[datetime], np.ndarray],
+        bodies: Sequence[str] = BODIES,
+        latitudes: Optional[ArrayLike] = None,
+        longitudes: Optional[ArrayLike] = None
+    ) -> EphemerisBatch:
+        """Same as compute() but takes datetimes instead of Julian days."""
+        return EphemerisEngine.compute(
+            julian_days(timestamps),
+            bodies=bodies,
+            latitudes=latitudes,
+            longitudes=longitudes
+        )
@@ -0,0 +1,178 @@
+"""
+Precomputed ephemeris table.
+
+The table is a flat binary file: a fixed header, the body names, then a
+float32 array of shape (rows, bodies, 2) holding longitude and speed sampled
+every ``step`` days. It is opened with numpy.memmap in read-only mode, so all
+uvicorn workers share the same page cache and only touched pages are loaded.
+
+Build it offline with:
+
+    python -m app.services.ephemeris_table --start 1900 --end 2100 \
+        --step-hours 1 --output data/ephemeris.bin
+"""
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+import argparse
+import logging
+import struct
+import time
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NEOEPH01"
+FORMAT_VERSION = 1
+# magic, version, n_bodies, start_jd, step_days, n_rows
+HEADER = struct.Struct("<8sIIddQ")
+BODY_NAME_SIZE = 16
+DATA_ALIGNMENT = 64
+DTYPE = np.float32
+
+
+def _data_offset(n_bodies: int) -> int:
+    size = HEADER.size + n_bodies * BODY_NAME_SIZE
+    return (size + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+
+class EphemerisTable:
+    """Read-only, memory-mapped table of body longitudes and speeds."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, n_bodies, start_jd, step, n_rows = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not an ephemeris table (version {FORMAT_VERSION})")
+            names = f.read(n_bodies * BODY_NAME_SIZE)
+
+        self.bodies: Tuple[str, ...] = tuple(
+            names[i * BODY_NAME_SIZE:(i + 1) * BODY_NAME_SIZE].rstrip(b"\0").decode("ascii")
+            for i in range(n_bodies)
+        )
+        self.start_jd = start_jd
+        self.step = step
+        self.n_rows = n_rows
+        self.end_jd = start_jd + step * (n_rows - 1)
+        self._columns = {name: i for i, name in enumerate(self.bodies)}
+        self._data = np.memmap(
+            path, dtype=DTYPE, mode="r", offset=_data_offset(n_bodies), shape=(n_rows, n_bodies, 2)
+        )
+
+    def covers(self, jd_ut: np.ndarray, bodies: Sequence[str]) -> bool:
+        """True if every instant and body can be served from the table."""
+        if not all(body in self._columns for body in bodies):
+            return False
+        return bool(jd_ut.size) and jd_ut.min() >= self.start_jd and jd_ut.max() <= self.end_jd
+
+    def positions(self, jd_ut: np.ndarray, bodies: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolated longitudes and speeds, each of shape (N, len(bodies)).
+
+        Uses cubic Hermite interpolation between the two neighbouring rows,
+        with the stored speeds as tangents.
+        """
+        cols = [self._columns[body] for body in bodies]
+        pos = (np.asarray(jd_ut, dtype=np.float64) - self.start_jd) / self.step
+        i = np.clip(np.floor(pos).astype(np.int64), 0, self.n_rows - 2)
+        u = (pos - i)[:, None]
+
+        lo = self._data[i][:, cols].astype(np.float64)
+        hi = self._data[i + 1][:, cols].astype(np.float64)
+
+        p0 = lo[..., 0]
+        p1 = p0 + ((hi[..., 0] - p0 + 180.0) % 360.0 - 180.0)
+        m0 = lo[..., 1] * self.step
+        m1 = hi[..., 1] * self.step
+
+        u2 = u * u
+        u3 = u2 * u
+        lon = (2 * u3 - 3 * u2 + 1) * p0 + (u3 - 2 * u2 + u) * m0 + (-2 * u3 + 3 * u2) * p1 + (u3 - u2) * m1
+        dlon = (6 * u2 - 6 * u) * p0 + (3 * u2 - 4 * u + 1) * m0 + (-6 * u2 + 6 * u) * p1 + (3 * u2 - 2 * u) * m1
+
+        return lon % 360.0, dlon / self.step
+
+
+_table: Optional[EphemerisTable] = None
+_table_loaded = False
+
+
+def get_table() -> Optional[EphemerisTable]:
+    """The table configured by settings.EPHEMERIS_TABLE_PATH, opened once per process."""
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table_loaded = True
+        path = settings.EPHEMERIS_TABLE_PATH
+        if path:
+            try:
+                _table = EphemerisTable(path)
+                logger.info(
+                    f"Ephemeris table loaded from {path} "
+                    f"(JD {_table.start_jd:.1f}-{_table.end_jd:.1f}, step {_table.step * 24:g} h)"
+                )
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load ephemeris table {path}: {str(e)}")
+    return _table
+
+
+def build_table(
+    output: str,
+    start_jd: float,
+    end_jd: float,
+    step: float,
+    bodies: Optional[Sequence[str]] = None,
+    chunk_rows: int = 100_000
+) -> None:
+    """Compute positions with Swiss Ephemeris and write a table file."""
+    from .ephemeris import EphemerisEngine, BODIES
+
+    bodies = tuple(bodies or BODIES)
+    n_rows = int(np.floor((end_jd - start_jd) / step)) + 1
+    offset = _data_offset(len(bodies))
+
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(bodies), start_jd, step, n_rows))
+        for name in bodies:
+            f.write(name.encode("ascii").ljust(BODY_NAME_SIZE, b"\0"))
+        f.write(b"\0" * (offset - f.tell()))
+
+    data = np.memmap(output, dtype=DTYPE, mode="r+", offset=offset, shape=(n_rows, len(bodies), 2))
+
+    started = time.monotonic()
+    for col, body in enumerate(bodies):
+        for row in range(0, n_rows, chunk_rows):
+            rows = min(chunk_rows, n_rows - row)
+            jd = start_jd + step * np.arange(row, row + rows, dtype=np.float64)
+            batch = EphemerisEngine.compute_swisseph(jd, bodies=(body,))
+            data[row:row + rows, col, 0] = batch.longitudes[:, 0]
+            data[row:row + rows, col, 1] = batch.speeds[:, 0]
+        logger.info(f"{body}: done ({time.monotonic() - started:.0f}s elapsed)")
+
+    data.flush()
+    del data
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from .ephemeris import julian_days
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Build the precomputed ephemeris table")
+    parser.add_argument("--start", type=int, default=1900, help="First year")
+    parser.add_argument("--end", type=int, default=2100, help="Last year (inclusive)")
+    parser.add_argument("--step-hours", type=float, default=1.0, help="Sampling step in hours")
+    parser.add_argument("--output", required=True, help="Output file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    start_jd, end_jd = julian_days([datetime(args.start, 1, 1), datetime(args.end + 1, 1, 1)]).tolist()
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    build_table(args.output, start_jd, end_jd, args.step_hours / 24.0)
+    logger.info(f"Ephemeris table written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+import uuid
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import async_session_maker, read_session_maker
+from ..models.horoscope import HoroscopeCache, ZodiacSign, HoroscopePeriod
+from ..schemas.horoscope import HoroscopeResponse
+from ..utils.cache import TTLCache, SingleFlight
+from .interpretation_engine import InterpretationEngine
+
+logger = logging.getLogger(__name__)
+
+# (sign, date, period) -> (HoroscopeResponse JSON, etag). Horoscopes never
+# change once generated, so the body is encoded once and entries only
+# expire to bound staleness after manual edits.
+horoscope_cache = TTLCache(maxsize=settings.HOROSCOPE_CACHE_SIZE, ttl=settings.HOROSCOPE_CACHE_TTL, name="horoscope")
+_loads = SingleFlight()
+
+# Periods build_row() has a generator for; weekly and monthly horoscopes are
+# neither generated nor served yet
+GENERATED_PERIODS = (HoroscopePeriod.DAILY,)
+
+
+class HoroscopeService:
+    """Loads and generates cached horoscopes with as few round trips as possible."""
+
+    @staticmethod
+    def _day(date_param: date) -> datetime:
+        # horoscope_cache.date is a timestamp column
+        return datetime.combine(date_param, datetime.min.time())
+
+    @staticmethod
+    def period_start(date_param: date, period: HoroscopePeriod) -> date:
+        """Date a horoscope is stored under: the day, the Monday of the week or the 1st of the month."""
+        if period == HoroscopePeriod.WEEKLY:
+            return date_param - timedelta(days=date_param.weekday())
+        if period == HoroscopePeriod.MONTHLY:
+            return date_param.replace(day=1)
+        return date_param
+
+    @staticmethod
+    def build_row(sign: ZodiacSign, date_param: date, period: HoroscopePeriod) -> dict:
+        """Generate horoscope content and return it as insert values."""
+        if period not in GENERATED_PERIODS:
+            raise ValueError(f"No generator for {period.value} horoscopes")
+        horoscope_data = InterpretationEngine.generate_daily_horoscope(
+            sign=sign.value,
+            date=HoroscopeService._day(date_param),
+            use_llm=False
+        )
+        return {
+            "id": uuid.uuid4(),
+            "sign": sign,
+            "date": HoroscopeService._day(date_param),
+            "period": period,
+            "content_text": horoscope_data["content"],
+            "mood": horoscope_data.get("mood"),
+            "keywords": horoscope_data.get("keywords"),
+            "lucky_color": horoscope_data.get("lucky_color"),
+            "lucky_number": horoscope_data.get("lucky_number")
+        }
+
+    @staticmethod
+    async def fetch_many(
+        db: AsyncSession,
+        signs: Iterable[ZodiacSign],
+        date_param: date,
+        period: HoroscopePeriod
+    ) -> Dict[ZodiacSign, HoroscopeCache]:
+        """Existing horoscopes for the given signs in a single SELECT."""
+        result = await db.execute(
+            select(HoroscopeCache).where(
+                HoroscopeCache.sign.in_(list(signs)),
+                HoroscopeCache.date == HoroscopeService._day(date_param),
+                HoroscopeCache.period == period
+            )
+        )
+        return {row.sign: row for row in result.scalars()}
+
+    @staticmethod
+    async def insert_many(db: AsyncSession, rows: List[dict]) -> List[HoroscopeCache]:
+        """
+        Insert horoscopes with one multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+        Returns only the rows this statement inserted; rows that another
+        request created concurrently are skipped instead of failing on
+        uq_sign_date_period.
+        """
+        if not rows:
+            return []
+        result = await db.execute(
+            pg_insert(HoroscopeCache)
+            .values(rows)
+            # Column target matches both uq_sign_date_period and the unique
+            # index created by the initial migration
+            .on_conflict_do_nothing(index_elements=["sign", "date", "period"])
+            .returning(HoroscopeCache)
+        )
+        return list(result.scalars())
+
+    @staticmethod
+    async def get_or_create_many(
+        db: AsyncSession,
+        signs: Iterable[ZodiacSign],
+        date_param: date,
+        period: HoroscopePeriod = HoroscopePeriod.DAILY
+    ) -> Dict[ZodiacSign, HoroscopeCache]:
+        """
+        Horoscopes for all ``signs``, generating the missing ones.
+
+        One SELECT plus one INSERT when something is missing; a third SELECT
+        only happens if a concurrent request inserted some of the same rows.
+        """
+        signs = list(signs)
+        horoscopes = await HoroscopeService.fetch_many(db, signs, date_param, period)
+
+        missing = [sign for sign in signs if sign not in horoscopes]
+        if not missing:
+            return horoscopes
+
+        inserted = await HoroscopeService.insert_many(
+            db, [HoroscopeService.build_row(sign, date_param, period) for sign in missing]
+        )
+        horoscopes.update({row.sign: row for row in inserted})
+
+        lost_race = [sign for sign in missing if sign not in horoscopes]
+        if lost_race:
+            horoscopes.update(await HoroscopeService.fetch_many(db, lost_race, date_param, period))
+
+        return horoscopes
+
+    @staticmethod
+    async def _load_responses(
+        signs: List[ZodiacSign],
+        date_param: date,
+        period: HoroscopePeriod
+    ) -> Dict[ZodiacSign, Tuple[bytes, str]]:
+        # Uses its own sessions: the load is shared by every coalesced request.
+        # Existing rows are read from the replica; only missing ones (not
+        # generated yet, or not replicated yet) go to the primary.
+        async with read_session_maker() as db:
+            rows = await HoroscopeService.fetch_many(db, signs, date_param, period)
+        missing = [sign for sign in signs if sign not in rows]
+        if missing:
+            async with async_session_maker() as db:
+                rows.update(await HoroscopeService.get_or_create_many(db, missing, date_param, period))
+                await db.commit()
+
+        loaded = {}
+        for sign, row in rows.items():
+            body = HoroscopeResponse.model_validate(row).model_dump_json().encode("utf-8")
+            entry = (body, f'"{row.id}"')
+            horoscope_cache.set((sign, date_param, period), entry)
+            loaded[sign] = entry
+        return loaded
+
+    @staticmethod
+    async def get_cached_many(
+        signs: Iterable[ZodiacSign],
+        date_param: date,
+        period: HoroscopePeriod = HoroscopePeriod.DAILY
+    ) -> Dict[ZodiacSign, Tuple[bytes, str]]:
+        """
+        Read-through cached horoscopes as (HoroscopeResponse JSON, ETag) pairs.
+
+        Concurrent misses for the same signs/date/period share a single
+        database load (and generation, if the rows do not exist yet).
+        """
+        found = {}
+        missing = []
+        for sign in signs:
+            entry = horoscope_cache.get((sign, date_param, period))
+            if entry is None:
+                missing.append(sign)
+            else:
+                found[sign] = entry
+
+        if missing:
+            loaded = await _loads.do(
+                (tuple(missing), date_param, period),
+                lambda: HoroscopeService._load_responses(missing, date_param, period)
+            )
+            found.update(loaded)
+
+        return found
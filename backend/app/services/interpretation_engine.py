@@ -1,6 +1,10 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+import hashlib
+import json
 import logging
+from .chart_model import CompactChart, POINTS
+from .ephemeris import BODIES
 
 logger = logging.getLogger(__name__)
 
@@ -39,98 +43,157 @@ class InterpretationEngine:
         "Pis": "Вы эмпатичны и мечтательны. Ваша интуиция очень сильна."
     }
 
+    # Russian names used in section titles and prompts
+    POINT_TITLES = {
+        "sun": "Солнце", "moon": "Луна", "mercury": "Меркурий", "venus": "Венера",
+        "mars": "Марс", "jupiter": "Юпитер", "saturn": "Сатурн", "uranus": "Уран",
+        "neptune": "Нептун", "pluto": "Плутон", "north_node": "Северный узел",
+        "ascendant": "Асцендент", "midheaven": "Середина Неба",
+    }
+    ASPECT_TITLES = {
+        "conjunction": "соединение", "sextile": "секстиль", "square": "квадрат",
+        "trine": "трин", "opposition": "оппозиция",
+    }
+    # Major aspects interpreted: name -> (angle, natal orb)
+    ASPECT_ORBS = {
+        "conjunction": (0.0, 8.0), "sextile": (60.0, 4.0), "square": (90.0, 6.0),
+        "trine": (120.0, 6.0), "opposition": (180.0, 8.0),
+    }
+
+    # Bump whenever the prompts change so new charts stop reusing old generations
+    PROMPT_VERSION = "2"
+
     @staticmethod
-    def interpret_natal_chart(
-        chart_data: Dict[str, Any],
-        use_llm: bool = False,
-        user_tier: str = "free"
-    ) -> str:
+    def interpret_natal_chart(chart: CompactChart) -> str:
         """
-        Generate interpretation for a natal chart.
-
-        Args:
-            chart_data: The calculated chart data
-            use_llm: Whether to use LLM for interpretation
-            user_tier: User's subscription tier
+        Generate the template interpretation for a natal chart.
 
-        Returns:
-            Interpretation text
+        Paid tiers additionally get an LLM interpretation, generated in the
+        background (see InterpretationJobService).
         """
-        if use_llm and user_tier in ["basic", "premium"]:
-            return InterpretationEngine._llm_interpretation(chart_data, user_tier)
-        else:
-            return InterpretationEngine._template_interpretation(chart_data)
+        fragments = InterpretationEngine.fragments(InterpretationEngine.chart_features(chart, "free"))
+        texts = {}
+        for fragment in fragments:
+            text = InterpretationEngine._template_fragment(fragment)
+            if text:
+                texts[fragment] = text
+        return InterpretationEngine.compose(fragments, texts) + (
+            "---\n\n"
+            "💎 **Обновитесь до Premium** для получения полных AI-powered интерпретаций с глубокими персональными инсайтами!\n"
+        )
 
     @staticmethod
-    def _template_interpretation(chart_data: Dict[str, Any]) -> str:
-        """Generate template-based interpretation."""
-        planets = chart_data.get("planets", {})
+    def chart_features(chart: CompactChart, user_tier: str) -> Dict[str, Any]:
+        """
+        Everything the interpretation depends on.
 
-        interpretation = "# Ваша натальная карта\n\n"
+        Charts with equal features get the same text, so generation is keyed
+        by feature_hash() of this dict.
+        """
+        # Major aspects from the longitudes (stored aspect lists vary by source)
+        points = [(p, chart.longitude(p)) for p in POINTS if chart.longitude(p) is not None]
+        aspects = []
+        for i, (point1, lon1) in enumerate(points):
+            for point2, lon2 in points[i + 1:]:
+                separation = abs((lon1 - lon2 + 180.0) % 360.0 - 180.0)
+                for aspect, (angle, orb) in InterpretationEngine.ASPECT_ORBS.items():
+                    if abs(separation - angle) <= orb:
+                        aspects.append([point1, point2, aspect])
 
-        # Sun interpretation
-        sun = planets.get("sun", {})
-        sun_sign = sun.get("sign", "")
-        if sun_sign in InterpretationEngine.SUN_IN_SIGNS:
-            interpretation += f"## Солнце в {sun_sign}\n\n"
-            interpretation += InterpretationEngine.SUN_IN_SIGNS[sun_sign] + "\n\n"
-
-        # Moon interpretation
-        moon = planets.get("moon", {})
-        moon_sign = moon.get("sign", "")
-        if moon_sign in InterpretationEngine.MOON_IN_SIGNS:
-            interpretation += f"## Луна в {moon_sign}\n\n"
-            interpretation += InterpretationEngine.MOON_IN_SIGNS[moon_sign] + "\n\n"
-
-        # Ascendant interpretation
-        ascendant = planets.get("ascendant", {})
-        asc_sign = ascendant.get("sign", "")
-        if asc_sign:
-            interpretation += f"## Асцендент в {asc_sign}\n\n"
-            interpretation += "Ваш Асцендент определяет, как вас воспринимают другие и как вы подходите к новым ситуациям.\n\n"
-
-        # Add upgrade CTA for free users
-        interpretation += "---\n\n"
-        interpretation += "💎 **Обновитесь до Premium** для получения полных AI-powered интерпретаций с глубокими персональными инсайтами!\n"
+        return {
+            "planets": {
+                body: [chart.sign(body), chart.house(body), chart.is_retrograde(body)]
+                for body in BODIES if chart.sign(body)
+            },
+            "ascendant": chart.sign("ascendant"),
+            "midheaven": chart.sign("midheaven"),
+            "aspects": aspects,
+            "tier": user_tier,
+            "prompt": InterpretationEngine.PROMPT_VERSION
+        }
 
-        return interpretation
+    @staticmethod
+    def feature_hash(features: Dict[str, Any]) -> str:
+        canonical = json.dumps(features, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
     @staticmethod
-    def _llm_interpretation(chart_data: Dict[str, Any], user_tier: str) -> str:
+    def fragments(features: Dict[str, Any]) -> List[str]:
         """
-        Generate LLM-based interpretation using OpenAI.
+        Fragment keys of an interpretation, in reading order.
 
-        This is a placeholder. In production, you would:
-        1. Format chart_data for GPT-4
-        2. Create a detailed prompt
-        3. Call OpenAI API
-        4. Return the generated interpretation
+        An interpretation is the concatenation of one section per placement
+        (planet in sign and house, angle in sign, aspect between two points).
+        There are only a few thousand distinct placements, so most sections
+        of a new chart were already generated for an earlier one.
         """
-        try:
-            # Placeholder for OpenAI integration
-            # from openai import OpenAI
-            # from ..config import settings
-            #
-            # client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            #
-            # prompt = f"Вы профессиональный астролог. Создайте детальную интерпретацию натальной карты..."
-            #
-            # response = client.chat.completions.create(
-            #     model="gpt-4",
-            #     messages=[{"role": "user", "content": prompt}],
-            #     max_tokens=2000 if user_tier == "premium" else 1500
-            # )
-            #
-            # return response.choices[0].message.content
-
-            # Fallback to template for now
-            logger.warning("LLM interpretation not implemented, using template fallback")
-            return InterpretationEngine._template_interpretation(chart_data)
-
-        except Exception as e:
-            logger.error(f"Error in LLM interpretation: {str(e)}")
-            # Fallback to template interpretation
-            return InterpretationEngine._template_interpretation(chart_data)
+        keys = []
+        for body, (sign, house, retrograde) in features["planets"].items():
+            keys.append(f"planet:{body}:{sign}:{house}" + (":R" if retrograde else ""))
+        for angle in ("ascendant", "midheaven"):
+            if features.get(angle):
+                keys.append(f"angle:{angle}:{features[angle]}")
+        for p1, p2, aspect in features.get("aspects", []):
+            keys.append(f"aspect:{p1}:{p2}:{aspect}")
+        return keys
+
+    @staticmethod
+    def fragment_title(fragment: str) -> str:
+        kind, *parts = fragment.split(":")
+        titles = InterpretationEngine.POINT_TITLES
+        if kind == "aspect":
+            p1, p2, aspect = parts
+            return f"{titles[p1]} — {InterpretationEngine.ASPECT_TITLES[aspect]} — {titles[p2]}"
+        return f"{titles[parts[0]]} в {parts[1]}"
+
+    @staticmethod
+    def compose(fragments: List[str], texts: Dict[str, str]) -> str:
+        """Interpretation from fragment texts; fragments without text are left out."""
+        interpretation = "# Ваша натальная карта\n\n"
+        for fragment in fragments:
+            if fragment in texts:
+                interpretation += f"## {InterpretationEngine.fragment_title(fragment)}\n\n"
+                interpretation += texts[fragment].strip() + "\n\n"
+        return interpretation
+
+    @staticmethod
+    def llm_source(features: Dict[str, Any]) -> str:
+        """Fragment namespace of LLM texts for these features (prompt version and depth)."""
+        return f"llm{InterpretationEngine.PROMPT_VERSION}-{features['tier']}"
+
+    @staticmethod
+    def fragment_messages(fragment: str, user_tier: str) -> List[Dict[str, str]]:
+        """Chat messages for the LLM text of one fragment."""
+        kind, *parts = fragment.split(":")
+        titles = InterpretationEngine.POINT_TITLES
+        if kind == "planet":
+            subject = f"{titles[parts[0]]} в знаке {parts[1]}, дом {parts[2] if parts[2] != '0' else '?'}"
+            if len(parts) > 3:
+                subject += ", ретроградный"
+        elif kind == "angle":
+            subject = f"{titles[parts[0]]} в знаке {parts[1]}"
+        else:
+            subject = f"аспект {InterpretationEngine.ASPECT_TITLES[parts[2]]} {titles[parts[0]]} — {titles[parts[1]]}"
+        depth = "подробно (3-4 абзаца)" if user_tier == "premium" else "кратко (1-2 абзаца)"
+        return [
+            {"role": "system", "content": (
+                "Вы профессиональный астролог. Отвечайте на русском языке в формате Markdown, "
+                "без заголовков: ваш текст станет разделом интерпретации натальной карты."
+            )},
+            {"role": "user", "content": f"Опишите {depth}, что в натальной карте означает: {subject}."}
+        ]
+
+    @staticmethod
+    def _template_fragment(fragment: str) -> Optional[str]:
+        """Template text of a fragment, None if there is no template for it."""
+        kind, point, sign, *_ = fragment.split(":")
+        if kind == "planet" and point == "sun":
+            return InterpretationEngine.SUN_IN_SIGNS.get(sign)
+        if kind == "planet" and point == "moon":
+            return InterpretationEngine.MOON_IN_SIGNS.get(sign)
+        if kind == "angle" and point == "ascendant":
+            return "Ваш Асцендент определяет, как вас воспринимают другие и как вы подходите к новым ситуациям."
+        return None
 
     @staticmethod
     def generate_daily_horoscope(
@@ -0,0 +1,73 @@
+"""
+Store of interpretation fragments (one text per chart placement).
+
+Fragments live in the interpretation_fragments table and an in-process LRU
+in front of it. The placement space is small, so after warm-up nearly every
+section of a new interpretation is a cache hit and only novel placements
+reach the LLM.
+"""
+from typing import Dict, Iterable
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.interpretation import InterpretationFragment
+from ..utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Fragment key -> text
+_fragment_cache = LRUCache(settings.INTERPRETATION_FRAGMENT_CACHE_SIZE, name="interpretation_fragments")
+_stats = {"local_hits": 0, "db_hits": 0, "misses": 0}
+
+
+class InterpretationFragmentService:
+    """Keyed fragment texts: in-process cache, then the database."""
+
+    @staticmethod
+    def key(source: str, fragment: str) -> str:
+        return f"{source}:{fragment}"
+
+    @staticmethod
+    async def get_many(db: AsyncSession, keys: Iterable[str]) -> Dict[str, str]:
+        """Texts of the stored fragments among ``keys`` (one query for the local misses)."""
+        found = {}
+        missing = []
+        for key in keys:
+            text = _fragment_cache.get(key)
+            if text is None:
+                missing.append(key)
+            else:
+                found[key] = text
+        _stats["local_hits"] += len(found)
+
+        if missing:
+            result = await db.execute(
+                select(InterpretationFragment.key, InterpretationFragment.text)
+                .where(InterpretationFragment.key.in_(missing))
+            )
+            for key, text in result.all():
+                _fragment_cache.set(key, text)
+                found[key] = text
+                _stats["db_hits"] += 1
+            _stats["misses"] += len(set(missing) - found.keys())
+        return found
+
+    @staticmethod
+    async def save(db: AsyncSession, key: str, text: str) -> None:
+        """Store a generated fragment; the first text stored for a key wins."""
+        result = await db.execute(
+            pg_insert(InterpretationFragment)
+            .values(key=key, text=text)
+            .on_conflict_do_nothing(index_elements=["key"])
+            .returning(InterpretationFragment.key)
+        )
+        if result.scalar_one_or_none() is not None:
+            _fragment_cache.set(key, text)
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        return {**_stats, "cached": len(_fragment_cache)}
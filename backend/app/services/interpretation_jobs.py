@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+import uuid
+import logging
+
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.interpretation import InterpretationJob, InterpretationStatus
+from ..models.natal_chart import NatalChart
+from .chart_model import CompactChart
+from .interpretation_engine import InterpretationEngine
+
+logger = logging.getLogger(__name__)
+
+
+class InterpretationJobService:
+    """Postgres-backed queue of LLM interpretation jobs, deduplicated by chart features."""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, chart: CompactChart, user_tier: str) -> InterpretationJob:
+        """
+        Job generating the interpretation for ``chart``, creating it if needed.
+
+        Charts with the same features share one job: a finished job is simply
+        reused, a failed one is queued again. Runs in the caller's transaction;
+        workers pick the job up after commit.
+        """
+        features = InterpretationEngine.chart_features(chart, user_tier)
+        feature_hash = InterpretationEngine.feature_hash(features)
+
+        await db.execute(
+            pg_insert(InterpretationJob)
+            .values(id=uuid.uuid4(), feature_hash=feature_hash, features=features,
+                    status=InterpretationStatus.PENDING, attempts=0)
+            .on_conflict_do_nothing(index_elements=["feature_hash"])
+        )
+        job = await InterpretationJobService.get(db, feature_hash)
+
+        if job.status == InterpretationStatus.FAILED:
+            await db.execute(
+                update(InterpretationJob)
+                .where(InterpretationJob.id == job.id, InterpretationJob.status == InterpretationStatus.FAILED)
+                .values(status=InterpretationStatus.PENDING, attempts=0, error=None, run_after=func.now())
+            )
+            job.status = InterpretationStatus.PENDING
+        return job
+
+    @staticmethod
+    async def get(db: AsyncSession, feature_hash: str) -> Optional[InterpretationJob]:
+        result = await db.execute(
+            select(InterpretationJob)
+            .where(InterpretationJob.feature_hash == feature_hash)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def claim(db: AsyncSession) -> Optional[InterpretationJob]:
+        """
+        Take the oldest runnable job and mark it running.
+
+        FOR UPDATE SKIP LOCKED lets any number of workers (in API processes
+        or standalone) poll the same table without handing out a job twice.
+        """
+        next_job = (
+            select(InterpretationJob.id)
+            .where(
+                InterpretationJob.status == InterpretationStatus.PENDING,
+                InterpretationJob.run_after <= func.now()
+            )
+            .order_by(InterpretationJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(InterpretationJob)
+            .where(InterpretationJob.id == next_job)
+            .values(status=InterpretationStatus.RUNNING, attempts=InterpretationJob.attempts + 1, result_text="")
+            .returning(InterpretationJob)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def save_progress(db: AsyncSession, job_id: UUID, text: str) -> None:
+        """Store the text generated so far (read by the SSE stream)."""
+        await db.execute(
+            update(InterpretationJob)
+            .where(InterpretationJob.id == job_id, InterpretationJob.status == InterpretationStatus.RUNNING)
+            .values(result_text=text)
+        )
+
+    @staticmethod
+    async def complete(db: AsyncSession, job: InterpretationJob, text: str) -> None:
+        """Finish the job and hand the text to every chart waiting for it."""
+        await db.execute(
+            update(InterpretationJob)
+            .where(InterpretationJob.id == job.id)
+            .values(status=InterpretationStatus.DONE, result_text=text, error=None)
+        )
+        await db.execute(
+            update(NatalChart)
+            .where(NatalChart.interpretation_hash == job.feature_hash)
+            .values(interpretation_text=text)
+        )
+
+    @staticmethod
+    async def fail(db: AsyncSession, job: InterpretationJob, error: str, max_attempts: int, retry_after: float) -> None:
+        """Queue the job again after ``retry_after`` seconds, or mark it failed after ``max_attempts``."""
+        if job.attempts < max_attempts:
+            values = dict(
+                status=InterpretationStatus.PENDING,
+                error=error,
+                run_after=datetime.now(timezone.utc) + timedelta(seconds=retry_after)
+            )
+        else:
+            # Charts keep their template interpretation
+            values = dict(status=InterpretationStatus.FAILED, error=error, result_text=None)
+        await db.execute(update(InterpretationJob).where(InterpretationJob.id == job.id).values(**values))
+
+    @staticmethod
+    async def release(db: AsyncSession, job: InterpretationJob) -> None:
+        """Put back a job whose generation was interrupted on shutdown; the attempt does not count."""
+        await db.execute(
+            update(InterpretationJob)
+            .where(InterpretationJob.id == job.id, InterpretationJob.status == InterpretationStatus.RUNNING)
+            .values(
+                status=InterpretationStatus.PENDING,
+                attempts=InterpretationJob.attempts - 1,
+                run_after=func.now()
+            )
+        )
+
+    @staticmethod
+    async def requeue_stale(db: AsyncSession, older_than: float) -> int:
+        """Put back jobs whose worker died mid-generation (no progress for ``older_than`` seconds)."""
+        result = await db.execute(
+            update(InterpretationJob)
+            .where(
+                InterpretationJob.status == InterpretationStatus.RUNNING,
+                InterpretationJob.updated_at < func.now() - timedelta(seconds=older_than)
+            )
+            .values(status=InterpretationStatus.PENDING)
+        )
+        return result.rowcount
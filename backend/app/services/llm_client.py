@@ -0,0 +1,121 @@
+"""
+Minimal client for OpenAI-compatible chat completion APIs.
+
+Speaks the HTTP API directly (streaming via server-sent events), so any
+compatible endpoint works, including the local fake server in
+benchmarks/fake_llm.py. Upstream pressure is bounded per process by a
+concurrency cap and a request rate limit.
+"""
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Raised when the upstream API fails; ``retry_after`` is set for rate limiting."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` acquisitions per second, bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+class LLMClient:
+    """Streaming chat completions with per-process concurrency and rate limits."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        model: str,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 60,
+        timeout: float = 120.0
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=max(1, max_concurrency))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+                timeout=httpx.Timeout(self.timeout, connect=10.0)
+            )
+        return self._client
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def stream_chat(self, messages: List[Dict[str, str]], max_tokens: int = 1500) -> AsyncIterator[str]:
+        """Yield content deltas of one chat completion."""
+        async with self._semaphore:
+            await self._bucket.acquire()
+            payload = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "stream": True}
+            try:
+                async with self._http().stream("POST", "/chat/completions", json=payload) as response:
+                    if response.status_code == 429:
+                        retry_after = response.headers.get("retry-after")
+                        raise LLMError("Upstream rate limit", retry_after=float(retry_after) if retry_after else 30.0)
+                    if response.status_code >= 400:
+                        body = (await response.aread()).decode("utf-8", errors="replace")[:200]
+                        raise LLMError(f"Upstream error {response.status_code}: {body}")
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or [{}]
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            yield delta
+            except httpx.HTTPError as e:
+                raise LLMError(f"Upstream request failed: {str(e)}")
+
+
+llm_client = LLMClient(
+    base_url=settings.OPENAI_BASE_URL,
+    api_key=settings.OPENAI_API_KEY,
+    model=settings.LLM_MODEL,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    timeout=settings.LLM_TIMEOUT
+)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+from ..utils.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class HasherSaturatedError(Exception):
+    """Raised when too many password hashing jobs are already queued."""
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without pickling overhead. At most ``max_workers`` hashes run at once and
+    at most ``max_pending`` are queued or running; beyond that new requests
+    are rejected so a login spike cannot build an unbounded backlog.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running."""
+        return self._pending
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            logger.info(f"Password hasher started (workers={self.max_workers}, max_pending={self.max_pending})")
+
+    def shutdown(self, wait: bool = True) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+            logger.info("Password hasher stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and cumulative timings, for metrics."""
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "running": self._running,
+            "queued": self._pending - self._running,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_seconds_total": self._wait_seconds,
+            "run_seconds_total": self._run_seconds,
+        }
+
+    def _release(self, _) -> None:
+        self._pending -= 1
+        self._completed += 1
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HasherSaturatedError(f"Password hasher queue is full ({self._pending} pending jobs)")
+
+        # Started lazily so CLI scripts can use it without the app lifespan
+        self.start()
+        submitted = time.perf_counter()
+
+        def job() -> Any:
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._wait_seconds += started - submitted
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.perf_counter() - started
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, job)
+        # The slot is held until the hash actually finishes, even if the
+        # request is cancelled: a started bcrypt round cannot be interrupted.
+        self._pending += 1
+        future.add_done_callback(self._release)
+        return await asyncio.shield(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS or None,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
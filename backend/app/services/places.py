@@ -0,0 +1,481 @@
+"""
+Offline place index: city search and timezone lookup without network calls.
+
+The index is a numpy .npz file built from a GeoNames cities dump
+(cities500.txt, cities15000.txt, ...) and, optionally, timezone boundary
+polygons (timezone-boundary-builder GeoJSON):
+
+    python -m app.services.places --cities cities15000.txt \
+        --timezones timezones-now.geojson --output data/places.npz
+
+Every name and Latin/Cyrillic alternate name of a place becomes a
+normalized search key. Keys are stored sorted as fixed-width UTF-8, so a
+prefix is a binary search; misspellings fall back to trigram similarity
+over precomputed posting lists. Timezones come from the polygon containing
+the point. GET /places/timezone falls back to the nearest indexed place,
+then the nominal Etc/GMT zone of the longitude, and says so; chart creation
+never uses those approximations.
+
+Both input files are read from local paths; download them first from
+https://download.geonames.org/export/dump/ and
+https://github.com/evansiroky/timezone-boundary-builder/releases.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import json
+import logging
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+from ..config import settings
+from ..schemas.natal_chart import NatalChartCreate
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Longest stored search key / trigram, in UTF-8 bytes
+MAX_KEY_BYTES = 48
+# Minimum trigram similarity of a fuzzy match
+MIN_SIMILARITY = 0.3
+# Nearest places farther than this do not decide the timezone
+MAX_NEAREST_KM = 300.0
+
+EARTH_RADIUS_KM = 6371.0
+
+# GeoNames feature classes / codes kept from the dump (populated places)
+FEATURE_CLASS = "P"
+EXCLUDED_FEATURE_CODES = {"PPLH", "PPLQ", "PPLW"}  # Historical, abandoned, destroyed
+
+
+class PlaceResolutionError(ValueError):
+    """Raised when a chart's birth place cannot be resolved."""
+
+
+class Place(NamedTuple):
+    id: int  # GeoNames id
+    name: str
+    matched_name: str  # The (alternate) name the query matched
+    country_code: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+
+
+def normalize(text: str) -> str:
+    """Search form of a name: case- and accent-insensitive, punctuation collapsed to spaces."""
+    text = unicodedata.normalize("NFKD", text.casefold().replace("ё", "е"))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", text).strip()
+
+
+def _key_bytes(key: str) -> bytes:
+    return key.encode("utf-8")[:MAX_KEY_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+def trigrams(key: str) -> List[str]:
+    """Distinct trigrams of a normalized key, padded like pg_trgm."""
+    padded = f"  {key} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def _searchable(name: str) -> bool:
+    # Latin and Cyrillic names only: other scripts would multiply the index
+    # size without helping the users of this service
+    return any(c.isalpha() for c in name) and all(
+        ord(c) < 0x250 or 0x400 <= ord(c) < 0x530 or not c.isalpha() for c in name
+    )
+
+
+def nominal_timezone(longitude: float) -> str:
+    """Etc/GMT zone of a longitude (POSIX sign: Etc/GMT-3 is UTC+3)."""
+    offset = int(round(longitude / 15.0))
+    return "Etc/GMT" if offset == 0 else f"Etc/GMT{-offset:+d}"
+
+
+class PlaceIndex:
+    """In-memory place index loaded from a file written by build_index()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a place index (version {FORMAT_VERSION})")
+            arrays = {name: data[name] for name in data.files}
+
+        self.ids = arrays["ids"]
+        self.latitudes = arrays["latitudes"]
+        self.longitudes = arrays["longitudes"]
+        self.populations = arrays["populations"]
+        self.countries = arrays["countries"]
+        self.place_zones = arrays["place_zones"]
+        self.zones = [zone.decode("ascii") for zone in arrays["zones"].tolist()]
+        self._names = arrays["names"]
+        self._name_offsets = arrays["name_offsets"]
+        self._keys = arrays["keys"]
+        self._key_places = arrays["key_places"]
+        self._key_labels = arrays["key_labels"]
+        self._key_trigrams = arrays["key_trigrams"]
+        self._trigrams = arrays["trigrams"]
+        self._trigram_offsets = arrays["trigram_offsets"]
+        self._postings = arrays["postings"]
+        self._polygon_zones = arrays["polygon_zones"]
+        self._polygon_bboxes = arrays["polygon_bboxes"]
+        self._polygon_rings = arrays["polygon_rings"]
+        self._ring_offsets = arrays["ring_offsets"]
+        self._coords = arrays["coords"]
+        self._positions = {int(place_id): i for i, place_id in enumerate(self.ids.tolist())}
+        # Unit vectors for nearest-place lookups
+        lat, lon = np.radians(self.latitudes.astype(np.float64)), np.radians(self.longitudes.astype(np.float64))
+        self._xyz = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def has_polygons(self) -> bool:
+        return len(self._polygon_zones) > 0
+
+    def _name(self, label: int) -> str:
+        return self._names[self._name_offsets[label]:self._name_offsets[label + 1]].tobytes().decode("utf-8")
+
+    def _place(self, position: int, label: Optional[int] = None) -> Place:
+        # Label number ``position`` is the place's GeoNames name (see build_index)
+        name = self._name(position)
+        return Place(
+            id=int(self.ids[position]),
+            name=name,
+            matched_name=self._name(label) if label is not None else name,
+            country_code=self.countries[position].decode("ascii"),
+            # float32 storage: 5 decimals (~1 m) are exact
+            latitude=round(float(self.latitudes[position]), 5),
+            longitude=round(float(self.longitudes[position]), 5),
+            timezone=self.zones[self.place_zones[position]],
+            population=int(self.populations[position]),
+        )
+
+    def get(self, place_id: int) -> Optional[Place]:
+        position = self._positions.get(place_id)
+        return self._place(position) if position is not None else None
+
+    def _prefix_matches(self, key: bytes) -> np.ndarray:
+        lo = np.searchsorted(self._keys, key, side="left")
+        hi = np.searchsorted(self._keys, key + b"\xff", side="left")
+        return np.arange(lo, hi)
+
+    def _fuzzy_matches(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        query = [t.encode("utf-8") for t in trigrams(key)]
+        found = np.searchsorted(self._trigrams, query)
+        postings = [
+            self._postings[self._trigram_offsets[i]:self._trigram_offsets[i + 1]]
+            for i, trigram in zip(found, query)
+            if i < len(self._trigrams) and self._trigrams[i] == trigram
+        ]
+        if not postings:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        keys, shared = np.unique(np.concatenate(postings), return_counts=True)
+        similarity = shared / (len(query) + self._key_trigrams[keys] - shared)
+        keep = similarity >= MIN_SIMILARITY
+        return keys[keep], similarity[keep]
+
+    def search(self, query: str, limit: int = 10, country: Optional[str] = None) -> List[Place]:
+        """
+        Places whose name starts with ``query``, most populous first.
+
+        When fewer than ``limit`` places match the prefix, the closest
+        misspellings (trigram similarity) are appended.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        country_code = country.upper().encode("ascii") if country else None
+
+        def ranked(key_ids: np.ndarray, scores: np.ndarray) -> List[Tuple[int, int]]:
+            positions = self._key_places[key_ids]
+            if country_code is not None:
+                keep = self.countries[positions] == country_code
+                key_ids, positions, scores = key_ids[keep], positions[keep], scores[keep]
+            # Best score first, then most populous; a short prefix can match a
+            # large share of the index, so only the best candidates are sorted
+            rank = scores + self.populations[positions] / 1e10
+            if len(rank) > limit * 20:
+                top = np.argpartition(-rank, limit * 20)[:limit * 20]
+                order = top[np.argsort(-rank[top], kind="stable")]
+            else:
+                order = np.argsort(-rank, kind="stable")
+            # Report the place's own name when it matches, else the best alternate
+            labels = self._key_labels[key_ids]
+            own = set(positions[labels == positions].tolist())
+            results, seen = [], set()
+            for i in order:
+                position = int(positions[i])
+                if position not in seen:
+                    seen.add(position)
+                    results.append((position, position if position in own else int(labels[i])))
+                    if len(results) >= limit:
+                        break
+            return results
+
+        prefix = self._prefix_matches(_key_bytes(key))
+        matches = ranked(prefix, np.zeros(len(prefix)))
+        if len(matches) < limit:
+            fuzzy, similarity = self._fuzzy_matches(key)
+            seen = {position for position, _ in matches}
+            for position, label in ranked(fuzzy, similarity):
+                if position not in seen and len(matches) < limit:
+                    matches.append((position, label))
+        return [self._place(position, label) for position, label in matches]
+
+    def polygon_timezone(self, latitude: float, longitude: float) -> Optional[str]:
+        """IANA timezone of the boundary polygon containing a point, None without one."""
+        bboxes = self._polygon_bboxes
+        candidates = np.flatnonzero(
+            (bboxes[:, 0] <= longitude) & (longitude <= bboxes[:, 2])
+            & (bboxes[:, 1] <= latitude) & (latitude <= bboxes[:, 3])
+        )
+        for polygon in candidates:
+            inside = False
+            for ring in range(self._polygon_rings[polygon], self._polygon_rings[polygon + 1]):
+                points = self._coords[self._ring_offsets[ring]:self._ring_offsets[ring + 1]]
+                x0, y0 = points[:-1, 0], points[:-1, 1]
+                x1, y1 = points[1:, 0], points[1:, 1]
+                # Even-odd rule over all rings, so holes need no special case
+                crosses = (y0 > latitude) != (y1 > latitude)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    x_at = x0 + (latitude - y0) * (x1 - x0) / (y1 - y0)
+                inside ^= bool(np.count_nonzero(crosses & (longitude < x_at)) % 2)
+            if inside:
+                return self.zones[self._polygon_zones[polygon]]
+        return None
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Tuple[Place, float]]:
+        """Closest indexed place and its distance in km."""
+        if not len(self):
+            return None
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        point = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+        cosines = self._xyz @ point
+        position = int(np.argmax(cosines))
+        distance = float(np.arccos(np.clip(cosines[position], -1.0, 1.0))) * EARTH_RADIUS_KM
+        return self._place(position), distance
+
+    def timezone_at(self, latitude: float, longitude: float) -> str:
+        """
+        IANA timezone of a point, approximated when no polygon contains it.
+
+        The nearest place's zone can be wrong near a border, and a nominal
+        Etc/GMT zone has no DST or history: use polygon_timezone() where a
+        wrong zone must not pass silently.
+        """
+        zone = self.polygon_timezone(latitude, longitude)
+        if zone is not None:
+            return zone
+        nearest = self.nearest(latitude, longitude)
+        if nearest is not None and nearest[1] <= MAX_NEAREST_KM:
+            return nearest[0].timezone
+        return nominal_timezone(longitude)
+
+
+_index: Optional[PlaceIndex] = None
+_index_loaded = False
+
+
+def get_index() -> Optional[PlaceIndex]:
+    """The index configured by settings.PLACES_INDEX_PATH, loaded once per process."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        _index_loaded = True
+        path = settings.PLACES_INDEX_PATH
+        if path:
+            try:
+                started = time.monotonic()
+                _index = PlaceIndex(path)
+                logger.info(
+                    f"Place index loaded from {path} ({len(_index)} places, "
+                    f"timezone polygons: {'yes' if _index.has_polygons else 'no'}, "
+                    f"{time.monotonic() - started:.1f}s)"
+                )
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not load place index {path}: {str(e)}")
+    return _index
+
+
+def resolve_birth_place(chart: NatalChartCreate) -> NatalChartCreate:
+    """
+    Chart data with coordinates and timezone filled in from the place index.
+
+    ``place_id`` supplies whatever coordinates / timezone the client left
+    out; a missing timezone is otherwise looked up from the coordinates in
+    the timezone polygons. Raises PlaceResolutionError rather than guess a
+    zone (nearest place, Etc/GMT) for points no polygon covers. Never calls
+    external services.
+    """
+    if chart.place_id is None and chart.birth_timezone:
+        return chart
+
+    index = get_index()
+    if index is None:
+        raise PlaceResolutionError(
+            "Place index is not configured: send birth_latitude, birth_longitude and birth_timezone"
+        )
+
+    update = {}
+    if chart.place_id is not None:
+        place = index.get(chart.place_id)
+        if place is None:
+            raise PlaceResolutionError(f"Unknown place_id {chart.place_id}")
+        if chart.birth_latitude is None or chart.birth_longitude is None:
+            update["birth_latitude"] = place.latitude
+            update["birth_longitude"] = place.longitude
+        if not chart.birth_timezone:
+            update["birth_timezone"] = place.timezone
+    if not chart.birth_timezone and "birth_timezone" not in update:
+        zone = index.polygon_timezone(chart.birth_latitude, chart.birth_longitude)
+        if zone is None:
+            raise PlaceResolutionError(
+                f"No timezone boundary covers ({chart.birth_latitude}, {chart.birth_longitude}): "
+                f"send birth_timezone or place_id"
+            )
+        update["birth_timezone"] = zone
+    return chart.model_copy(update=update)
+
+
+def _read_cities(path: str, min_population: int) -> Iterable[List[str]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = line.rstrip("\n").split("\t")
+            if len(row) < 18 or row[6] != FEATURE_CLASS or row[7] in EXCLUDED_FEATURE_CODES:
+                continue
+            if not row[17] or int(row[14] or 0) < min_population:
+                continue
+            yield row
+
+
+def _read_polygons(path: str) -> Iterable[Tuple[str, List[List[List[float]]]]]:
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    for feature in collection["features"]:
+        zone = feature["properties"]["tzid"]
+        geometry = feature["geometry"]
+        polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+        for polygon in polygons:
+            yield zone, polygon
+
+
+def build_index(
+    cities_path: str,
+    output: str,
+    timezones_path: Optional[str] = None,
+    min_population: int = 0
+) -> None:
+    """Parse a GeoNames cities dump (and timezone polygons) and write the index."""
+    ids, latitudes, longitudes, populations, countries, place_zones = [], [], [], [], [], []
+    names: List[bytes] = []
+    keys: Dict[Tuple[bytes, int], int] = {}  # (key, place) -> label
+    zone_ids: Dict[str, int] = {}
+    alternates: List[Tuple[int, str]] = []
+
+    for row in _read_cities(cities_path, min_population):
+        position = len(ids)
+        ids.append(int(row[0]))
+        latitudes.append(float(row[4]))
+        longitudes.append(float(row[5]))
+        populations.append(int(row[14] or 0))
+        countries.append(row[8].encode("ascii"))
+        place_zones.append(zone_ids.setdefault(row[17], len(zone_ids)))
+        # Label number ``position`` is the place's own name
+        names.append(row[1].encode("utf-8"))
+        alternates.append((position, row[1]))
+        for alternate in [row[2], *row[3].split(",")]:
+            if alternate and _searchable(alternate):
+                alternates.append((position, alternate))
+
+    for position, name in alternates:
+        key = _key_bytes(normalize(name))
+        if not key or (key, position) in keys:
+            continue
+        if name == names[position].decode("utf-8"):
+            label = position
+        else:
+            label = len(names)
+            names.append(name.encode("utf-8"))
+        keys[(key, position)] = label
+    logger.info(f"{len(ids)} places, {len(keys)} search keys")
+
+    entries = sorted(keys.items())
+    key_array = np.array([key for (key, _), _ in entries], dtype=f"S{MAX_KEY_BYTES}")
+    postings: Dict[bytes, List[int]] = {}
+    key_trigrams = np.zeros(len(entries), dtype=np.int16)
+    for i, ((key, _), _) in enumerate(entries):
+        grams = trigrams(key.decode("utf-8"))
+        key_trigrams[i] = len(grams)
+        for gram in grams:
+            postings.setdefault(gram.encode("utf-8"), []).append(i)
+    trigram_keys = sorted(postings)
+    trigram_offsets = np.zeros(len(trigram_keys) + 1, dtype=np.int64)
+    trigram_offsets[1:] = np.cumsum([len(postings[t]) for t in trigram_keys])
+
+    polygon_zones, polygon_bboxes, polygon_rings, ring_offsets, coords = [], [], [0], [0], []
+    if timezones_path:
+        for zone, rings in _read_polygons(timezones_path):
+            points = np.concatenate([np.asarray(ring, dtype=np.float32) for ring in rings])
+            polygon_zones.append(zone_ids.setdefault(zone, len(zone_ids)))
+            polygon_bboxes.append([points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()])
+            for ring in rings:
+                coords.append(np.asarray(ring, dtype=np.float32))
+                ring_offsets.append(ring_offsets[-1] + len(ring))
+            polygon_rings.append(len(ring_offsets) - 1)
+        logger.info(f"{len(polygon_zones)} timezone polygons, {ring_offsets[-1]} points")
+
+    name_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    name_offsets[1:] = np.cumsum([len(name) for name in names])
+    np.savez_compressed(
+        output,
+        version=np.int32(FORMAT_VERSION),
+        ids=np.array(ids, dtype=np.int64),
+        latitudes=np.array(latitudes, dtype=np.float32),
+        longitudes=np.array(longitudes, dtype=np.float32),
+        populations=np.array(populations, dtype=np.int64),
+        countries=np.array(countries, dtype="S2"),
+        place_zones=np.array(place_zones, dtype=np.int16),
+        zones=np.array([zone.encode("ascii") for zone in zone_ids], dtype="S"),
+        names=np.frombuffer(b"".join(names), dtype=np.uint8),
+        name_offsets=name_offsets,
+        keys=key_array,
+        key_places=np.array([position for (_, position), _ in entries], dtype=np.int32),
+        key_labels=np.array([label for _, label in entries], dtype=np.int32),
+        key_trigrams=key_trigrams,
+        trigrams=np.array(trigram_keys, dtype="S12"),
+        trigram_offsets=trigram_offsets,
+        postings=np.array([i for t in trigram_keys for i in postings[t]], dtype=np.int32),
+        polygon_zones=np.array(polygon_zones, dtype=np.int16),
+        polygon_bboxes=np.array(polygon_bboxes, dtype=np.float32).reshape(-1, 4),
+        polygon_rings=np.array(polygon_rings, dtype=np.int64),
+        ring_offsets=np.array(ring_offsets, dtype=np.int64),
+        coords=np.concatenate(coords) if coords else np.empty((0, 2), dtype=np.float32),
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the offline place index")
+    parser.add_argument("--cities", required=True, help="GeoNames cities file (e.g. cities15000.txt)")
+    parser.add_argument("--timezones", help="Timezone boundary GeoJSON (timezone-boundary-builder)")
+    parser.add_argument("--min-population", type=int, default=0, help="Skip smaller places")
+    parser.add_argument("--output", required=True, help="Output file (.npz)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    build_index(args.cities, args.output, args.timezones, args.min_population)
+    logger.info(f"Place index written to {args.output} ({time.monotonic() - started:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
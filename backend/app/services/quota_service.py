@@ -0,0 +1,104 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User, SubscriptionTier
+from ..models.natal_chart import NatalChart
+from ..utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Feature -> (owner column of the counted rows, limit per tier). Tiers that
+# are missing from the mapping are unlimited.
+QUOTAS: Dict[str, Any] = {
+    "natal_charts": (NatalChart.user_id, {SubscriptionTier.FREE: 1}),
+}
+
+# (user id, feature) -> usage, capped at the limit. Only lets the early
+# check skip the count for users under the limit; a rejection is always
+# based on a fresh count, and enforcement always counts in the database.
+_usage_cache = TTLCache(maxsize=10000, ttl=60.0, name="quota_usage")
+
+
+class QuotaExceededError(Exception):
+    """Raised when a user has used up a tier-limited feature."""
+
+    def __init__(self, feature: str, limit: int):
+        super().__init__(f"Quota for {feature} exceeded (limit {limit})")
+        self.feature = feature
+        self.limit = limit
+
+
+class QuotaService:
+    """Tier limits on countable per-user resources."""
+
+    @staticmethod
+    def limit(feature: str, tier: SubscriptionTier) -> Optional[int]:
+        """Maximum allowed count for the tier, or None when unlimited."""
+        _, limits = QUOTAS[feature]
+        return limits.get(tier)
+
+    @staticmethod
+    async def usage(db: AsyncSession, user_id: UUID, feature: str, cap: int) -> int:
+        """
+        Number of the user's rows for ``feature``, counted up to ``cap``.
+
+        The LIMIT inside the subquery turns this into an EXISTS-style probe
+        of the owner index: at most ``cap`` index entries are read and no
+        row payloads are loaded.
+        """
+        owner, _ = QUOTAS[feature]
+        result = await db.execute(
+            select(func.count()).select_from(
+                select(owner).where(owner == user_id).limit(cap).subquery()
+            )
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def check(db: AsyncSession, user: User, feature: str) -> None:
+        """
+        Cheap early check, served from a per-user cache when possible.
+
+        Lets requests that are certainly over quota fail before doing any
+        expensive work; use reserve() to enforce the limit. The cache is
+        per process and may miss a delete handled by another worker, so a
+        cached count at the limit is recounted before rejecting.
+        """
+        limit = QuotaService.limit(feature, user.subscription_tier)
+        if limit is None:
+            return
+        key = (user.id, feature)
+        used = _usage_cache.get(key)
+        if used is None or used >= limit:
+            used = await QuotaService.usage(db, user.id, feature, limit)
+            _usage_cache.set(key, used)
+        if used >= limit:
+            raise QuotaExceededError(feature, limit)
+
+    @staticmethod
+    async def reserve(db: AsyncSession, user: User, feature: str) -> None:
+        """
+        Enforce the limit inside the caller's transaction, right before the insert.
+
+        Locks the user row (SELECT ... FOR UPDATE) so concurrent reservations
+        for the same user run one after another; each one counts after the
+        previous transaction has committed its row. The lock is released when
+        the caller commits or rolls back.
+        """
+        limit = QuotaService.limit(feature, user.subscription_tier)
+        if limit is None:
+            return
+        await db.execute(select(User.id).where(User.id == user.id).with_for_update())
+        used = await QuotaService.usage(db, user.id, feature, limit)
+        _usage_cache.set((user.id, feature), used)
+        if used >= limit:
+            raise QuotaExceededError(feature, limit)
+
+    @staticmethod
+    def invalidate(user_id: UUID, feature: str) -> None:
+        """Forget cached usage after the user's rows were added or removed."""
+        _usage_cache.pop((user_id, feature))
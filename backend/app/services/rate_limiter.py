@@ -0,0 +1,293 @@
+"""
+Per-account rate limits and concurrency caps for expensive endpoints.
+
+Each (feature, user) pair has a token bucket (``per_minute`` refill, ``burst``
+capacity) and a cap on requests in flight. State lives in Redis and is
+updated by Lua scripts, so the limits hold across workers and hosts and a
+check-and-consume is one atomic round trip. Without Redis (tests, local runs,
+outages) the same limits are enforced per process.
+
+In-flight slots are leases that expire LEASE_TTL seconds after they were
+last renewed, so a crashed worker cannot hold a slot forever; hold() renews
+a lease for as long as the request runs, however long that is.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from ..config import settings
+from ..models.user import User, SubscriptionTier
+from ..utils.cache import OptionalRedis
+
+logger = logging.getLogger(__name__)
+
+
+class Budget(NamedTuple):
+    burst: int  # Requests allowed back to back
+    per_minute: float  # Sustained rate
+    concurrent: int  # Requests in flight
+
+
+# Feature -> tier -> budget; tiers without an entry are not limited
+RATE_LIMITS: Dict[str, Dict[SubscriptionTier, Budget]] = {
+    "chart_create": {
+        SubscriptionTier.FREE: Budget(burst=3, per_minute=5, concurrent=1),
+        SubscriptionTier.BASIC: Budget(burst=10, per_minute=20, concurrent=2),
+        SubscriptionTier.PREMIUM: Budget(burst=20, per_minute=60, concurrent=4),
+    },
+    "chart_import": {
+        SubscriptionTier.BASIC: Budget(burst=1, per_minute=2, concurrent=1),
+        SubscriptionTier.PREMIUM: Budget(burst=2, per_minute=6, concurrent=1),
+    },
+    "chart_export": {
+        SubscriptionTier.FREE: Budget(burst=2, per_minute=2, concurrent=1),
+        SubscriptionTier.BASIC: Budget(burst=3, per_minute=6, concurrent=1),
+        SubscriptionTier.PREMIUM: Budget(burst=5, per_minute=10, concurrent=2),
+    },
+    "transits": {
+        SubscriptionTier.PREMIUM: Budget(burst=10, per_minute=30, concurrent=2),
+    },
+    "synastry": {
+        SubscriptionTier.BASIC: Budget(burst=10, per_minute=30, concurrent=2),
+        SubscriptionTier.PREMIUM: Budget(burst=20, per_minute=60, concurrent=4),
+    },
+    "matches": {
+        SubscriptionTier.BASIC: Budget(burst=5, per_minute=10, concurrent=1),
+        SubscriptionTier.PREMIUM: Budget(burst=10, per_minute=30, concurrent=2),
+    },
+}
+
+# In-flight slots of crashed workers are reclaimed after this many seconds
+LEASE_TTL = 60.0
+# Running requests renew their slot this often
+LEASE_RENEW_INTERVAL = LEASE_TTL / 3
+
+# KEYS[1] bucket hash; ARGV capacity, refill per second.
+# Returns {allowed, retry_after}; floats as strings (Lua numbers become integers).
+TOKEN_BUCKET_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+# KEYS[1] sorted set of leases scored by expiry; ARGV limit, lease id, ttl.
+# Returns 1 if the lease was taken.
+ACQUIRE_LEASE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[3])) + 1)
+return 1
+"""
+
+# KEYS[1] sorted set of leases; ARGV lease id, ttl. Extends a lease that
+# has not expired yet; returns 1 if it was found.
+RENEW_LEASE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local expires = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+if not expires or expires <= now then
+  return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])) + 1)
+return 1
+"""
+
+
+class RateLimitedError(Exception):
+    """Raised when a request exceeds the account's budget for a feature."""
+
+    def __init__(self, feature: str, retry_after: float, concurrent: bool = False):
+        self.feature = feature
+        self.retry_after = retry_after
+        self.concurrent = concurrent
+        super().__init__(f"Rate limit exceeded for {feature}")
+
+
+# (backend, key, lease id) of an in-flight slot
+Lease = Tuple[str, str, str]
+
+
+class RateLimiter:
+    """Token buckets and in-flight caps in Redis, per process without it."""
+
+    def __init__(self, redis_url: Optional[str], enabled: bool = True):
+        self.enabled = enabled
+        self._redis = OptionalRedis(redis_url, name="rate limiter", retry_interval=10.0)
+        self._scripts = None
+        self._script_client = None
+        # Local fallback state: bucket key -> (tokens, updated), lease key -> lease ids
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._leases: Dict[str, Dict[str, float]] = {}
+        self._allowed = 0
+        self._limited = 0
+
+    def budget(self, feature: str, tier: SubscriptionTier) -> Optional[Budget]:
+        return RATE_LIMITS.get(feature, {}).get(tier)
+
+    def _redis_scripts(self, client):
+        if self._script_client is not client:
+            self._scripts = (
+                client.register_script(TOKEN_BUCKET_SCRIPT),
+                client.register_script(ACQUIRE_LEASE_SCRIPT),
+                client.register_script(RENEW_LEASE_SCRIPT),
+            )
+            self._script_client = client
+        return self._scripts
+
+    def _take_token_local(self, key: str, budget: Budget) -> float:
+        rate = budget.per_minute / 60.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(budget.burst), now))
+        tokens = min(float(budget.burst), tokens + (now - updated) * rate)
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1.0 - tokens) / rate
+
+    def _take_lease_local(self, key: str, lease_id: str, budget: Budget) -> bool:
+        now = time.monotonic()
+        leases = {k: expires for k, expires in self._leases.get(key, {}).items() if expires > now}
+        if len(leases) >= budget.concurrent:
+            self._leases[key] = leases
+            return False
+        leases[lease_id] = now + LEASE_TTL
+        self._leases[key] = leases
+        return True
+
+    async def acquire(self, feature: str, user: User) -> Optional[Lease]:
+        """
+        Consume one request of ``feature`` for ``user`` and take an in-flight slot.
+
+        Returns the lease to pass to release(), or None if the tier is not
+        limited. Raises RateLimitedError when over budget.
+        """
+        budget = self.budget(feature, user.subscription_tier) if self.enabled else None
+        if budget is None:
+            return None
+
+        user_id = str(user.id)
+        bucket_key = f"rl:{feature}:{user_id}"
+        lease_key = f"rl:{feature}:{user_id}:inflight"
+        lease_id = uuid.uuid4().hex
+
+        client = self._redis.client()
+        if client is not None:
+            try:
+                take_token, take_lease, _ = self._redis_scripts(client)
+                allowed, retry_after = await take_token(
+                    keys=[bucket_key], args=[budget.burst, budget.per_minute / 60.0]
+                )
+                if not int(allowed):
+                    self._limited += 1
+                    raise RateLimitedError(feature, float(retry_after))
+                if not int(await take_lease(keys=[lease_key], args=[budget.concurrent, lease_id, LEASE_TTL])):
+                    self._limited += 1
+                    raise RateLimitedError(feature, 1.0, concurrent=True)
+                self._allowed += 1
+                return ("redis", lease_key, lease_id)
+            except RateLimitedError:
+                raise
+            except Exception as e:
+                self._redis.failed(e)
+
+        retry_after = self._take_token_local(bucket_key, budget)
+        if retry_after:
+            self._limited += 1
+            raise RateLimitedError(feature, retry_after)
+        if not self._take_lease_local(lease_key, lease_id, budget):
+            self._limited += 1
+            raise RateLimitedError(feature, 1.0, concurrent=True)
+        self._allowed += 1
+        return ("local", lease_key, lease_id)
+
+    async def release(self, lease: Optional[Lease]) -> None:
+        if lease is None:
+            return
+        backend, key, lease_id = lease
+        if backend == "local":
+            self._leases.get(key, {}).pop(lease_id, None)
+            return
+        client = self._redis.client()
+        if client is not None:
+            try:
+                await client.zrem(key, lease_id)
+            except Exception as e:
+                # The lease expires after LEASE_TTL
+                self._redis.failed(e)
+
+    async def renew(self, lease: Optional[Lease]) -> None:
+        """Push the expiry of an in-flight slot LEASE_TTL seconds ahead."""
+        if lease is None:
+            return
+        backend, key, lease_id = lease
+        if backend == "local":
+            leases = self._leases.get(key, {})
+            if lease_id in leases:
+                leases[lease_id] = time.monotonic() + LEASE_TTL
+            return
+        client = self._redis.client()
+        if client is not None:
+            try:
+                _, _, renew_lease = self._redis_scripts(client)
+                await renew_lease(keys=[key], args=[lease_id, LEASE_TTL])
+            except Exception as e:
+                self._redis.failed(e)
+
+    async def _keep_alive(self, lease: Lease) -> None:
+        while True:
+            await asyncio.sleep(LEASE_RENEW_INTERVAL)
+            await self.renew(lease)
+
+    @asynccontextmanager
+    async def hold(self, lease: Optional[Lease]) -> AsyncIterator[None]:
+        """Keep ``lease`` renewed while the block runs, then release it."""
+        keep_alive = asyncio.create_task(self._keep_alive(lease)) if lease is not None else None
+        try:
+            yield
+        finally:
+            if keep_alive is not None:
+                keep_alive.cancel()
+            await self.release(lease)
+
+    def reset(self) -> None:
+        """Clear the per-process state (tests)."""
+        self._buckets.clear()
+        self._leases.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"allowed": self._allowed, "limited": self._limited}
+
+
+rate_limiter = RateLimiter(
+    settings.REDIS_URL if settings.RATE_LIMIT_REDIS else None,
+    enabled=settings.RATE_LIMIT_ENABLED
+)
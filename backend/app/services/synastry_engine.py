@@ -0,0 +1,179 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .chart_model import CompactChart, POINTS
+
+logger = logging.getLogger(__name__)
+
+# Aspect angle -> (name, orb in degrees, polarity used for scoring)
+SYNASTRY_ASPECTS = (
+    (0.0, "conjunction", 8.0, 1.0),
+    (60.0, "sextile", 4.0, 0.7),
+    (90.0, "square", 6.0, -0.8),
+    (120.0, "trine", 6.0, 1.0),
+    (180.0, "opposition", 8.0, -0.4),
+)
+
+# How much an aspect involving each point matters for compatibility
+POINT_WEIGHTS = {
+    "sun": 3.0,
+    "moon": 3.0,
+    "venus": 2.5,
+    "mars": 2.5,
+    "ascendant": 2.0,
+    "mercury": 1.5,
+    "saturn": 1.5,
+    "jupiter": 1.0,
+    "north_node": 1.0,
+    "midheaven": 1.0,
+    "uranus": 0.5,
+    "neptune": 0.5,
+    "pluto": 0.5,
+}
+
+ELEMENTS = ("fire", "earth", "air", "water")
+MODALITIES = ("cardinal", "fixed", "mutable")
+
+# Points counted in element/modality balance (personal and social planets + ascendant)
+BALANCE_POINTS = ("sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", "ascendant")
+
+# Raw aspect score that maps to ~88/100 (tanh(1) * 50 + 50)
+SCORE_SCALE = 40.0
+# Share of the final score coming from element harmony
+ELEMENT_SHARE = 0.2
+
+# Candidates scored per array pass in batch mode (bounds temporary memory)
+BATCH_CHUNK = 1024
+
+_ANGLES = np.array([a[0] for a in SYNASTRY_ASPECTS])
+_ORBS = np.array([a[2] for a in SYNASTRY_ASPECTS])
+_POLARITY = np.array([a[3] for a in SYNASTRY_ASPECTS])
+_WEIGHTS = np.array([POINT_WEIGHTS[p] for p in POINTS])
+_BALANCE_COLS = np.array([POINTS.index(p) for p in BALANCE_POINTS])
+
+
+def chart_longitudes(chart: CompactChart) -> np.ndarray:
+    """Absolute longitudes of POINTS; NaN for points missing from the chart."""
+    # CompactChart already stores them as a float64 array in POINTS order
+    return np.frombuffer(chart.longitudes, dtype=np.float64)
+
+
+def _balance(longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Element and modality counts, shape (..., 4) and (..., 3)."""
+    lon = longitudes[..., _BALANCE_COLS]
+    valid = ~np.isnan(lon)
+    sign = np.where(valid, np.floor(np.nan_to_num(lon) / 30.0), 0).astype(np.int64) % 12
+
+    elements = np.stack([((sign % 4) == e) & valid for e in range(4)], axis=-1).sum(axis=-2)
+    modalities = np.stack([((sign % 3) == m) & valid for m in range(3)], axis=-1).sum(axis=-2)
+    return elements.astype(np.float64), modalities.astype(np.float64)
+
+
+def _aspect_strengths(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Tightness of every aspect between the points of ``a`` and ``b``.
+
+    ``a`` has shape (n,), ``b`` has shape (M, m). Returns (M, n, m, aspects)
+    with 1.0 for an exact aspect falling to 0.0 at the edge of the orb.
+    """
+    separation = np.abs((a[None, :, None] - b[:, None, :] + 180.0) % 360.0 - 180.0)
+    deviation = np.abs(separation[..., None] - _ANGLES)
+    strength = 1.0 - deviation / _ORBS
+    # NaN (missing point) compares False and drops out here
+    return np.where(strength > 0.0, strength, 0.0)
+
+
+def _scores(a: np.ndarray, b: np.ndarray, strengths: np.ndarray) -> np.ndarray:
+    """Compatibility scores 0-100 for ``a`` against each row of ``b``."""
+    pair_weight = _WEIGHTS[:, None] * _WEIGHTS[None, :]
+    raw = np.einsum("kijs,ij,s->k", strengths, pair_weight, _POLARITY)
+    aspect_score = 50.0 + 50.0 * np.tanh(raw / SCORE_SCALE)
+
+    elements_a, _ = _balance(a)
+    elements_b, _ = _balance(b)
+    norm = np.linalg.norm(elements_a) * np.linalg.norm(elements_b, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.where(norm > 0, elements_b @ elements_a / norm, 0.0)
+
+    return (1.0 - ELEMENT_SHARE) * aspect_score + ELEMENT_SHARE * 100.0 * similarity
+
+
+class SynastryEngine:
+    """Compatibility between natal charts using array-based angular math."""
+
+    @staticmethod
+    def calculate(chart1: CompactChart, chart2: CompactChart) -> Dict[str, Any]:
+        """
+        Full synastry for a pair of charts.
+
+        Returns inter-chart aspects (tightest first), element and modality
+        balance of each chart and a 0-100 compatibility score.
+        """
+        a = chart_longitudes(chart1)
+        b = chart_longitudes(chart2)[None, :]
+        strengths = _aspect_strengths(a, b)
+        score = float(_scores(a, b, strengths)[0])
+
+        inter_aspects = []
+        for i, j, s in zip(*np.nonzero(strengths[0])):
+            angle, name, orb, _ = SYNASTRY_ASPECTS[s]
+            separation = abs((a[i] - b[0, j] + 180.0) % 360.0 - 180.0)
+            inter_aspects.append({
+                "planet1": POINTS[i],
+                "planet2": POINTS[j],
+                "aspect": name,
+                "orb": round(float(abs(separation - angle)), 4),
+                "strength": round(float(strengths[0, i, j, s]), 4)
+            })
+        inter_aspects.sort(key=lambda x: x["orb"])
+
+        def balance(longitudes: np.ndarray) -> Dict[str, Dict[str, int]]:
+            elements, modalities = _balance(longitudes)
+            return {
+                "elements": {name: int(n) for name, n in zip(ELEMENTS, elements)},
+                "modalities": {name: int(n) for name, n in zip(MODALITIES, modalities)}
+            }
+
+        chart1_balance = balance(a)
+        chart2_balance = balance(b[0])
+
+        return {
+            "compatibility_score": round(score),
+            "inter_aspects": inter_aspects,
+            "element_balance": {
+                "chart1": chart1_balance["elements"],
+                "chart2": chart2_balance["elements"]
+            },
+            "modality_balance": {
+                "chart1": chart1_balance["modalities"],
+                "chart2": chart2_balance["modalities"]
+            }
+        }
+
+    @staticmethod
+    def score_many(chart: CompactChart, others: Sequence[CompactChart]) -> np.ndarray:
+        """Compatibility score of ``chart`` against every chart in ``others`` in one pass."""
+        if not others:
+            return np.empty(0)
+        a = chart_longitudes(chart)
+        b = np.stack([chart_longitudes(other) for other in others])
+        return np.concatenate([
+            _scores(a, chunk, _aspect_strengths(a, chunk))
+            for chunk in np.split(b, range(BATCH_CHUNK, len(b), BATCH_CHUNK))
+        ])
+
+    @staticmethod
+    def best_matches(
+        chart: CompactChart,
+        candidates: Sequence[Tuple[Any, CompactChart]],
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Top ``limit`` candidates as (id, chart) pairs, best score first."""
+        scores = SynastryEngine.score_many(chart, [other for _, other in candidates])
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            {"id": candidates[i][0], "compatibility_score": round(float(scores[i]))}
+            for i in order.tolist()
+        ]
@@ -0,0 +1,276 @@
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .ephemeris import EphemerisEngine, julian_days, datetimes_from_julian_days
+from .chart_model import CompactChart, POINTS
+
+logger = logging.getLogger(__name__)
+
+# Aspect angle -> name; 240/270/300 are the same aspects on the other side
+ASPECTS = {
+    0: "conjunction",
+    60: "sextile",
+    90: "square",
+    120: "trine",
+    180: "opposition",
+    240: "trine",
+    270: "square",
+    300: "sextile",
+}
+
+# Transit orbs in degrees, tighter than natal orbs
+TRANSIT_ORBS = {
+    "conjunction": 3.0,
+    "opposition": 3.0,
+    "square": 3.0,
+    "trine": 3.0,
+    "sextile": 2.0,
+}
+
+# The Moon produces dozens of aspects a month, so it is opt-in
+DEFAULT_TRANSITING = (
+    "sun", "mercury", "venus", "mars", "jupiter",
+    "saturn", "uranus", "neptune", "pluto",
+)
+
+NATAL_POINTS = POINTS
+
+# Sampling step in days. Each body must move less than the narrowest orb
+# window (2 x 2 deg) per step so no window is skipped between samples.
+SAMPLE_STEP_DAYS = {"moon": 0.25}
+DEFAULT_STEP_DAYS = 1.0
+
+# Root refinement tolerances
+TOLERANCE_DEGREES = 1e-6
+TOLERANCE_DAYS = 1.0 / 86400.0
+MAX_ITERATIONS = 40
+
+
+def _wrap(angle):
+    """Normalize angle difference(s) to [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+class TransitEngine:
+    """Finds aspects between transiting planets and natal points over a time range."""
+
+    @staticmethod
+    def _natal_longitudes(
+        natal_chart: CompactChart,
+        natal_points: Sequence[str]
+    ) -> Dict[str, float]:
+        longitudes = {name: natal_chart.longitude(name) for name in natal_points}
+        return {name: lon for name, lon in longitudes.items() if lon is not None}
+
+    @staticmethod
+    def _refine(
+        body: str,
+        target: np.ndarray,
+        level: np.ndarray,
+        ta: np.ndarray,
+        tb: np.ndarray,
+        ha: np.ndarray,
+        hb: np.ndarray
+    ) -> np.ndarray:
+        """
+        Find t in [ta, tb] where wrap(lon(t) - target) == level, for many brackets at once.
+
+        ``ha``/``hb`` are the already sampled residuals at the bracket ends.
+        Newton steps use the ephemeris speed as the derivative and fall back to
+        bisection whenever a step leaves the bracket (e.g. near a station).
+        Every iteration is a single batched ephemeris lookup.
+        """
+        ta, tb, ha, hb = ta.copy(), tb.copy(), ha.copy(), hb.copy()
+
+        # Start from the secant estimate
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(hb != ha, ta - ha * (tb - ta) / (hb - ha), 0.5 * (ta + tb))
+        t = np.where(ha == 0.0, ta, np.where(hb == 0.0, tb, t))
+        done = (ha == 0.0) | (hb == 0.0)
+
+        for _ in range(MAX_ITERATIONS):
+            idx = np.flatnonzero(~done)
+            if idx.size == 0:
+                break
+
+            ti = t[idx]
+            batch = EphemerisEngine.compute(ti, bodies=(body,))
+            value = _wrap(batch.longitudes[:, 0] - target[idx]) - level[idx]
+            speed = batch.speeds[:, 0]
+
+            converged = (np.abs(value) < TOLERANCE_DEGREES) | ((tb[idx] - ta[idx]) < TOLERANCE_DAYS)
+            done[idx[converged]] = True
+
+            same_side = (value < 0) == (ha[idx] < 0)
+            ta[idx] = np.where(same_side, ti, ta[idx])
+            ha[idx] = np.where(same_side, value, ha[idx])
+            tb[idx] = np.where(same_side, tb[idx], ti)
+            hb[idx] = np.where(same_side, hb[idx], value)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_next = ti - value / speed
+            outside = ~np.isfinite(t_next) | (t_next <= ta[idx]) | (t_next >= tb[idx])
+            t_next = np.where(outside, 0.5 * (ta[idx] + tb[idx]), t_next)
+            t[idx] = np.where(converged, ti, t_next)
+
+        return t
+
+    @staticmethod
+    def _scan_body(
+        body: str,
+        jd: np.ndarray,
+        longitudes: np.ndarray,
+        natal: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Find orb windows and exact hits of one transiting body against all natal points."""
+        names = list(natal)
+        angles = list(ASPECTS)
+
+        # One column per (natal point, aspect angle) target
+        target_point = np.repeat(np.arange(len(names)), len(angles))
+        target_angle = np.tile(np.array(angles, dtype=np.float64), len(names))
+        targets = (np.array([natal[n] for n in names])[target_point] + target_angle) % 360.0
+        orbs = np.array([TRANSIT_ORBS[ASPECTS[int(a)]] for a in target_angle])
+
+        d = _wrap(longitudes[:, None] - targets[None, :])  # (N, targets)
+        in_orb = np.abs(d) <= orbs[None, :]
+
+        # Exact hits: sign change of d between consecutive samples away from the +-180 wrap
+        crossing = (np.signbit(d[:-1]) != np.signbit(d[1:])) & (np.abs(d[:-1]) < 90.0) & (np.abs(d[1:]) < 90.0)
+
+        n = jd.shape[0]
+        windows = []
+        # Brackets to refine: (column, level, left sample index)
+        brackets: List[Tuple[int, float, int]] = []
+
+        def bracket(k: int, level: float, i: int) -> int:
+            brackets.append((k, level, i))
+            return len(brackets) - 1
+
+        for k in np.flatnonzero(in_orb.any(axis=0)).tolist():
+            orb = float(orbs[k])
+
+            # Contiguous runs of samples inside the orb
+            flags = np.concatenate(([0], in_orb[:, k].astype(np.int8), [0]))
+            starts = np.flatnonzero(np.diff(flags) == 1)
+            ends = np.flatnonzero(np.diff(flags) == -1) - 1
+            hit_indices = np.flatnonzero(crossing[:, k])
+
+            for i0, i1 in zip(starts.tolist(), ends.tolist()):
+                ingress = None
+                if i0 > 0:
+                    ingress = bracket(k, orb if d[i0 - 1, k] > 0 else -orb, i0 - 1)
+
+                egress = None
+                if i1 < n - 1:
+                    egress = bracket(k, orb if d[i1 + 1, k] > 0 else -orb, i1)
+
+                hits = [
+                    # The target is fixed, so a decreasing residual means backward motion
+                    (bracket(k, 0.0, i), bool(d[i, k] > d[i + 1, k]))
+                    for i in hit_indices[(hit_indices >= i0 - 1) & (hit_indices <= i1)].tolist()
+                ]
+                windows.append((k, ingress, egress, hits))
+
+        if not windows:
+            return []
+
+        cols = np.array([b[0] for b in brackets], dtype=np.int64)
+        levels = np.array([b[1] for b in brackets], dtype=np.float64)
+        left = np.array([b[2] for b in brackets], dtype=np.int64)
+        times = TransitEngine._refine(
+            body, targets[cols], levels, jd[left], jd[left + 1],
+            d[left, cols] - levels, d[left + 1, cols] - levels
+        ) if brackets else np.empty(0)
+        iso = datetimes_from_julian_days(times).astype(str) if brackets else []
+
+        events = []
+        for k, ingress, egress, hits in windows:
+            angle = int(target_angle[k])
+            events.append({
+                "transiting": body,
+                "natal": names[int(target_point[k])],
+                "aspect": ASPECTS[angle],
+                "angle": angle if angle <= 180 else 360 - angle,
+                "orb": float(orbs[k]),
+                "ingress": None if ingress is None else str(iso[ingress]),
+                "egress": None if egress is None else str(iso[egress]),
+                "exact": [{"time": str(iso[b]), "retrograde": retrograde} for b, retrograde in hits],
+            })
+
+        return events
+
+    @staticmethod
+    def find_transits(
+        natal_chart: CompactChart,
+        start: datetime,
+        end: datetime,
+        transiting: Sequence[str] = DEFAULT_TRANSITING,
+        natal_points: Sequence[str] = NATAL_POINTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Scan [start, end] for aspects between transiting bodies and natal points.
+
+        Each returned transit covers one pass through the orb: ingress/egress
+        times (None if the pass is already active at ``start`` or still active
+        at ``end``) and every exact hit inside it, so a retrograde loop shows
+        up as one window with several hits. Naive datetimes are UTC.
+        """
+        natal = TransitEngine._natal_longitudes(natal_chart, natal_points)
+        if not natal or end <= start:
+            return []
+
+        jd0, jd1 = julian_days([start, end]).tolist()
+
+        # Group bodies by sampling step so each group is one batch call
+        groups: Dict[float, List[str]] = {}
+        for body in transiting:
+            groups.setdefault(SAMPLE_STEP_DAYS.get(body, DEFAULT_STEP_DAYS), []).append(body)
+
+        events = []
+        for step, bodies in groups.items():
+            jd = np.append(np.arange(jd0, jd1, step), jd1)
+            batch = EphemerisEngine.compute(jd, bodies=bodies)
+            for col, body in enumerate(bodies):
+                events.extend(TransitEngine._scan_body(body, jd, batch.longitudes[:, col], natal))
+
+        # ISO strings sort chronologically; windows open at ``start`` come first
+        events.sort(key=lambda e: (e["ingress"] or "", e["transiting"], e["natal"]))
+        return events
+
+    @staticmethod
+    def active_transits(
+        natal_chart: CompactChart,
+        moment: datetime,
+        transiting: Sequence[str] = DEFAULT_TRANSITING,
+        natal_points: Sequence[str] = NATAL_POINTS
+    ) -> List[Dict[str, Any]]:
+        """Aspects within orb at a single moment, tightest first."""
+        natal = TransitEngine._natal_longitudes(natal_chart, natal_points)
+        if not natal:
+            return []
+
+        batch = EphemerisEngine.compute(julian_days([moment]), bodies=transiting)
+        active = []
+        for col, body in enumerate(batch.bodies):
+            lon = batch.longitudes[0, col]
+            speed = batch.speeds[0, col]
+            for name, natal_lon in natal.items():
+                for angle, aspect in ASPECTS.items():
+                    diff = float(_wrap(lon - (natal_lon + angle)))
+                    if abs(diff) <= TRANSIT_ORBS[aspect]:
+                        active.append({
+                            "transiting": body,
+                            "natal": name,
+                            "aspect": aspect,
+                            "orb": round(abs(diff), 4),
+                            "applying": bool(diff * speed < 0),
+                            "retrograde": bool(speed < 0),
+                        })
+
+        active.sort(key=lambda a: a["orb"])
+        return active
+
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import logging
+import time
+import weakref
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+_MISSING = object()
+
+# name -> cache, for metrics
+named_caches: "weakref.WeakValueDictionary[str, LRUCache]" = weakref.WeakValueDictionary()
+
+
+class LRUCache:
+    """
+    Bounded in-process mapping that evicts the least recently used entry.
+
+    Caches given a ``name`` are listed in ``named_caches`` and their hit and
+    miss counters are exported as metrics.
+    """
+
+    def __init__(self, maxsize: int = 1024, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if name:
+            named_caches[name] = self
+
+    def _get(self, key: Hashable) -> Any:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return _MISSING
+        return self._data[key]
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        value = self._get(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, name: Optional[str] = None):
+        super().__init__(maxsize, name)
+        self.ttl = ttl
+
+    def _get(self, key: Hashable) -> Any:
+        entry = super()._get(key)
+        if entry is _MISSING:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.pop(key)
+            return _MISSING
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        super().set(key, (expires_at, value))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._get(key) is not _MISSING
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller starts ``fn()`` as a task; callers arriving while it runs
+    await the same task. The task is shielded, so a cancelled caller (client
+    disconnect) does not cancel the work the others are waiting for.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class OptionalRedis:
+    """
+    Lazily connected Redis client for best-effort cache tiers.
+
+    After a connection error, client() returns None for ``retry_interval``
+    seconds so callers fall back to their in-process tier instead of paying
+    a connection timeout on every request.
+    """
+
+    def __init__(self, url: Optional[str], name: str = "cache", retry_interval: float = 30.0):
+        self.url = url if REDIS_AVAILABLE else None
+        self.name = name
+        self.retry_interval = retry_interval
+        self._client = None
+        self._down_until = 0.0
+
+    def client(self):
+        if not self.url or time.monotonic() < self._down_until:
+            return None
+        if self._client is None:
+            self._client = aioredis.from_url(self.url)
+        return self._client
+
+    def failed(self, e: Exception) -> None:
+        logger.warning(f"Redis unavailable for {self.name}: {str(e)}")
+        self._down_until = time.monotonic() + self.retry_interval
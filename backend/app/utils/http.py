@@ -0,0 +1,87 @@
+from typing import Any, Dict, Optional
+import gzip
+import json
+import logging
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Default response class of the app: orjson renders large dicts (transits,
+# synastry) several times faster than the json module
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+def json_bytes(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON of plain data (dicts, lists, datetimes, UUIDs, numpy numbers).
+
+    With orjson this skips jsonable_encoder, which dominates the encoding
+    time of large dicts such as transit results.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(body: bytes, status_code: int = status.HTTP_200_OK, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Response with an already encoded JSON body.
+
+    Returning a Response skips FastAPI's validation and encoding of the
+    response_model; the endpoint is responsible for the body matching it.
+    """
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def not_modified(request: Request, etag: str, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """304 response if the client already has this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, **(headers or {})}
+            )
+    return None
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """Body in every supported Content-Encoding ("identity", "gzip", "br"), compressed at maximum level."""
+    variants = {
+        "identity": body,
+        # mtime=0 keeps the output identical across renders
+        "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+    }
+    if BROTLI_AVAILABLE:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def choose_encoding(request: Request, available) -> str:
+    """Best encoding the client accepts: br, then gzip, else identity."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if name and not any(p.replace(" ", "") in ("q=0", "q=0.0") for p in params):
+            accepted.add(name.lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
@@ -0,0 +1,236 @@
+"""
+Prometheus metrics.
+
+Per request: latency by route and status, and the number and total time of
+database statements issued while serving it. Chart computations report
+time per stage (also from executor worker processes, see
+call_collecting_stages). Cache, connection pool, executor, hasher and rate
+limiter counters are read from their stats() at scrape time.
+
+Each worker process has its own registry; scrape workers individually or
+run a single worker per container.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy import event
+
+try:
+    from prometheus_client import Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = settings.METRICS_ENABLED and PROMETHEUS_AVAILABLE
+
+# Sub-second buckets: chart stages and most statements take milliseconds
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if METRICS_ENABLED:
+    REQUEST_SECONDS = Histogram(
+        "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+    )
+    REQUEST_DB_QUERIES = Histogram(
+        "http_request_db_queries", "Database statements per HTTP request", ["route"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+    )
+    REQUEST_DB_SECONDS = Histogram(
+        "http_request_db_seconds", "Database time per HTTP request", ["route"], buckets=FAST_BUCKETS
+    )
+    DB_QUERY_SECONDS = Histogram(
+        "db_query_duration_seconds", "Database statement latency", ["operation"], buckets=FAST_BUCKETS
+    )
+    CHART_STAGE_SECONDS = Histogram(
+        "chart_stage_duration_seconds", "Chart computation time by stage", ["stage"], buckets=FAST_BUCKETS
+    )
+    CHART_JOB_SECONDS = Histogram(
+        "chart_job_duration_seconds", "Chart executor job latency, queueing included", ["job"], buckets=FAST_BUCKETS
+    )
+
+# [statements, seconds] of the request being served
+_request_db: ContextVar[Optional[List[float]]] = ContextVar("request_db", default=None)
+
+# Stage timings buffered inside an executor job, returned to the parent process
+_stage_buffer: Optional[List[Tuple[str, float]]] = None
+
+SQL_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def record_stage(name: str, seconds: float) -> None:
+    if _stage_buffer is not None:
+        _stage_buffer.append((name, seconds))
+    elif METRICS_ENABLED:
+        CHART_STAGE_SECONDS.labels(stage=name).observe(seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as chart computation stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def call_collecting_stages(fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Tuple[Any, List[Tuple[str, float]]]:
+    """
+    Run ``fn`` in an executor worker, returning its result and stage timings.
+
+    Metrics recorded in a worker process would never be scraped, so the
+    parent records the returned timings with record_stage().
+    """
+    global _stage_buffer
+    _stage_buffer = []
+    try:
+        return fn(*args, **kwargs), _stage_buffer
+    finally:
+        _stage_buffer = None
+
+
+def observe_chart_job(job: str, seconds: float) -> None:
+    if METRICS_ENABLED:
+        CHART_JOB_SECONDS.labels(job=job).observe(seconds)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement on ``engine`` and count it against the current request."""
+    if not METRICS_ENABLED:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        operation = statement.lstrip()[:6].upper()
+        DB_QUERY_SECONDS.labels(operation=operation if operation in SQL_OPERATIONS else "OTHER").observe(elapsed)
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and database use per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            # Route template (/api/v1/charts/{chart_id}), set by the router on match
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route).observe(db[0])
+            REQUEST_DB_SECONDS.labels(route).observe(db[1])
+
+
+class ServiceCollector:
+    """Exports the stats() of caches and worker pools at scrape time."""
+
+    def describe(self):
+        # Keeps the registry from calling collect() at registration (import time)
+        return []
+
+    def collect(self):
+        # Imported here: these modules import this one
+        from ..services.astro_calculator import chart_cache
+        from ..services.chart_executor import chart_executor
+        from ..services.password_hasher import password_hasher
+        from ..services.rate_limiter import rate_limiter
+        from ..services.interpretation_fragments import InterpretationFragmentService
+        from .cache import named_caches
+        from ..database import pool_stats
+
+        lookups = CounterMetricFamily("cache_lookups", "In-process cache lookups", labels=["cache", "result"])
+        entries = GaugeMetricFamily("cache_entries", "In-process cache size", labels=["cache"])
+        for name, cache in list(named_caches.items()):
+            lookups.add_metric([name, "hit"], cache.hits)
+            lookups.add_metric([name, "miss"], cache.misses)
+            entries.add_metric([name], len(cache))
+        chart = chart_cache.stats()
+        lookups.add_metric(["chart", "hit"], chart["local_hits"])
+        lookups.add_metric(["chart", "redis_hit"], chart["redis_hits"])
+        lookups.add_metric(["chart", "miss"], chart["misses"])
+        entries.add_metric(["chart"], chart["local_size"])
+        fragments = InterpretationFragmentService.stats()
+        lookups.add_metric(["interpretation_fragments", "db_hit"], fragments["db_hits"])
+        yield lookups
+        yield entries
+
+        executor = GaugeMetricFamily("chart_executor_jobs", "Chart executor jobs", labels=["state"])
+        executor.add_metric(["pending"], chart_executor.pending)
+        executor.add_metric(["max_pending"], chart_executor.max_pending)
+        yield executor
+
+        hasher = password_hasher.stats()
+        hasher_jobs = GaugeMetricFamily("password_hasher_jobs", "Password hashing jobs", labels=["state"])
+        for state in ("pending", "running", "queued"):
+            hasher_jobs.add_metric([state], hasher[state])
+        yield hasher_jobs
+        hasher_done = CounterMetricFamily("password_hasher_completed", "Password hashing jobs finished", labels=["result"])
+        hasher_done.add_metric(["completed"], hasher["completed"])
+        hasher_done.add_metric(["rejected"], hasher["rejected"])
+        yield hasher_done
+        hasher_seconds = CounterMetricFamily("password_hasher_seconds", "Password hashing time", labels=["phase"])
+        hasher_seconds.add_metric(["wait"], hasher["wait_seconds_total"])
+        hasher_seconds.add_metric(["run"], hasher["run_seconds_total"])
+        yield hasher_seconds
+
+        connections = GaugeMetricFamily("db_pool_connections", "Database pool connections", labels=["engine", "state"])
+        for engine_name, pool in pool_stats().items():
+            for state in ("size", "checked_out", "idle", "overflow", "max_overflow"):
+                connections.add_metric([engine_name, state], pool[state])
+        yield connections
+
+        limiter = rate_limiter.stats()
+        decisions = CounterMetricFamily("rate_limit_decisions", "Rate limiter decisions", labels=["decision"])
+        decisions.add_metric(["allowed"], limiter["allowed"])
+        decisions.add_metric(["limited"], limiter["limited"])
+        yield decisions
+
+
+if METRICS_ENABLED:
+    REGISTRY.register(ServiceCollector())
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    """Exposition body and content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,14 +1,23 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
+from uuid import UUID
+import asyncio
+import json
+import logging
+import math
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
 from ..config import settings
 from ..database import get_db
-from ..models.user import User
+from ..models.user import User, SubscriptionTier
+from .cache import TTLCache, OptionalRedis
+
+logger = logging.getLogger(__name__)
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +25,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # HTTP Bearer token
 security = HTTPBearer()
 
+# Authenticated user principals: user id -> column snapshot
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL, name="user")
+_user_cache_redis = OptionalRedis(
+    settings.REDIS_URL if settings.USER_CACHE_REDIS else None, name="user cache"
+)
+USER_CACHE_PREFIX = "user:"
+
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
@@ -59,11 +75,130 @@ def decode_token(token: str) -> dict:
         )
 
 
+def _user_snapshot(user: User) -> Dict[str, Any]:
+    """JSON-compatible copy of the user's columns, without credentials."""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "full_name": user.full_name,
+        "subscription_tier": user.subscription_tier.value,
+        "subscription_end_date": user.subscription_end_date.isoformat() if user.subscription_end_date else None,
+        "stripe_customer_id": user.stripe_customer_id,
+        "is_active": user.is_active,
+        "is_verified": user.is_verified,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+def _user_from_snapshot(snapshot: Dict[str, Any]) -> User:
+    """
+    Rebuild a detached User (not bound to any session) from a snapshot.
+
+    hashed_password is left unloaded; code that needs it reads the user
+    from the database.
+    """
+    user = User(
+        id=UUID(snapshot["id"]),
+        email=snapshot["email"],
+        full_name=snapshot["full_name"],
+        subscription_tier=SubscriptionTier(snapshot["subscription_tier"]),
+        subscription_end_date=(
+            datetime.fromisoformat(snapshot["subscription_end_date"])
+            if snapshot["subscription_end_date"] else None
+        ),
+        stripe_customer_id=snapshot["stripe_customer_id"],
+        is_active=snapshot["is_active"],
+        is_verified=snapshot["is_verified"],
+        created_at=datetime.fromisoformat(snapshot["created_at"]) if snapshot["created_at"] else None,
+        updated_at=datetime.fromisoformat(snapshot["updated_at"]) if snapshot["updated_at"] else None,
+    )
+    # Behave like a loaded-then-detached row: merging it issues UPDATEs, never INSERTs
+    make_transient_to_detached(user)
+    return user
+
+
+async def _get_cached_user(user_id: str) -> Optional[User]:
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        client = _user_cache_redis.client()
+        if client is not None:
+            try:
+                raw = await client.get(USER_CACHE_PREFIX + user_id)
+            except Exception as e:
+                _user_cache_redis.failed(e)
+                raw = None
+            if raw is not None:
+                snapshot = json.loads(raw)
+                user_cache.set(user_id, snapshot)
+    return _user_from_snapshot(snapshot) if snapshot is not None else None
+
+
+async def _cache_user(user: User) -> None:
+    snapshot = _user_snapshot(user)
+    user_cache.set(snapshot["id"], snapshot)
+
+    client = _user_cache_redis.client()
+    if client is not None:
+        try:
+            await client.set(USER_CACHE_PREFIX + snapshot["id"], json.dumps(snapshot), ex=settings.USER_CACHE_TTL)
+        except Exception as e:
+            _user_cache_redis.failed(e)
+
+
+async def _delete_redis_user(user_id: str) -> None:
+    client = _user_cache_redis.client()
+    if client is not None:
+        try:
+            await client.delete(USER_CACHE_PREFIX + user_id)
+        except Exception as e:
+            _user_cache_redis.failed(e)
+
+
+def invalidate_cached_user(user_id) -> None:
+    """
+    Drop a user from the principal cache.
+
+    Called automatically when a User row is updated or deleted through the
+    ORM; call it explicitly after bulk UPDATE statements on users.
+    """
+    user_id = str(user_id)
+    user_cache.pop(user_id)
+    if _user_cache_redis.url:
+        try:
+            asyncio.get_running_loop().create_task(_delete_redis_user(user_id))
+        except RuntimeError:
+            # No event loop (CLI scripts); the Redis entry expires on its own
+            pass
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    invalidate_cached_user(target.id)
+    # A concurrent request may re-cache the old row before this transaction
+    # commits, so invalidate once more after commit.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_cached_user(user_id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
-    """Get the current authenticated user."""
+    """
+    Get the current authenticated user.
+
+    Users are served from a short-TTL principal cache, so a valid token for a
+    recently seen user needs no database query.
+    """
     token = credentials.credentials
     payload = decode_token(token)
 
@@ -74,8 +209,12 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _get_cached_user(user_id)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await _cache_user(user)
 
     if user is None:
         raise HTTPException(
@@ -116,3 +255,42 @@ async def require_paid(current_user: User = Depends(get_current_user)) -> User:
         )
 
     return current_user
+
+
+async def acquire_rate_limit(feature: str, user: User):
+    """
+    Take a request of ``feature`` from the user's budget, or raise 429.
+
+    Returns the lease to hold with rate_limiter.hold() while the work runs;
+    for endpoints whose work outlives the dependencies (streaming).
+    """
+    from ..services.rate_limiter import rate_limiter, RateLimitedError
+
+    try:
+        return await rate_limiter.acquire(feature, user)
+    except RateLimitedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                "Too many concurrent requests. Wait for the previous ones to finish."
+                if e.concurrent else "Rate limit exceeded. Try again later."
+            ),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+
+
+def rate_limit(feature: str):
+    """
+    Dependency enforcing the per-tier budget of ``feature`` (see services/rate_limiter.py).
+
+    Use next to require_paid/require_premium; the slot taken for the request
+    is held while the request runs and released when the response is done.
+    """
+    from ..services.rate_limiter import rate_limiter
+
+    async def dependency(current_user: User = Depends(get_current_user)):
+        lease = await acquire_rate_limit(feature, current_user)
+        async with rate_limiter.hold(lease):
+            yield current_user
+
+    return dependency
@@ -0,0 +1,152 @@
+"""
+Pre-generates horoscopes ahead of demand.
+
+Runs in-process (started from the FastAPI lifespan) or as a one-off CLI for
+backfilling:
+
+    python -m app.workers.horoscope_pregenerator --start 2025-01-01 --end 2025-03-31
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+import argparse
+import asyncio
+import logging
+
+from ..config import settings
+from ..database import async_session_maker
+from ..models.horoscope import ZodiacSign, HoroscopePeriod
+from ..services.horoscope_service import HoroscopeService, GENERATED_PERIODS
+
+logger = logging.getLogger(__name__)
+
+
+def _targets(start: date, end: date, periods: Iterable[HoroscopePeriod]) -> List[Tuple[date, HoroscopePeriod]]:
+    """Distinct (storage date, period) pairs needed to cover [start, end]."""
+    seen: Set[Tuple[date, HoroscopePeriod]] = set()
+    targets = []
+    for period in periods:
+        day = start
+        while day <= end:
+            target = (HoroscopeService.period_start(day, period), period)
+            if target not in seen:
+                seen.add(target)
+                targets.append(target)
+            day += timedelta(days=1)
+    return targets
+
+
+async def _generate_one(date_param: date, period: HoroscopePeriod, retries: int) -> int:
+    """Generate all signs for one date/period, retrying on errors. Returns rows created."""
+    for attempt in range(1, retries + 1):
+        try:
+            async with async_session_maker() as db:
+                existing = await HoroscopeService.fetch_many(db, ZodiacSign, date_param, period)
+                missing = [sign for sign in ZodiacSign if sign not in existing]
+                if not missing:
+                    return 0
+                inserted = await HoroscopeService.insert_many(
+                    db, [HoroscopeService.build_row(sign, date_param, period) for sign in missing]
+                )
+                await db.commit()
+                return len(inserted)
+        except Exception as e:
+            if attempt == retries:
+                logger.error(f"Failed to pre-generate {period.value} horoscopes for {date_param}: {str(e)}")
+                raise
+            delay = 2 ** attempt
+            logger.warning(
+                f"Pre-generating {period.value} horoscopes for {date_param} failed "
+                f"(attempt {attempt}/{retries}), retrying in {delay}s: {str(e)}"
+            )
+            await asyncio.sleep(delay)
+    return 0
+
+
+async def pregenerate(
+    start: date,
+    end: date,
+    periods: Sequence[HoroscopePeriod] = GENERATED_PERIODS,
+    retries: int = 3
+) -> int:
+    """
+    Make sure horoscopes exist for every sign, period and date in [start, end].
+
+    Idempotent: existing rows are left alone and concurrent runs (several
+    workers, or the CLI next to the server) cannot create duplicates.
+    Returns the number of rows created.
+    """
+    created = 0
+    for date_param, period in _targets(start, end, periods):
+        created += await _generate_one(date_param, period, retries)
+    if created:
+        logger.info(f"Pre-generated {created} horoscopes for {start}..{end}")
+    return created
+
+
+class HoroscopeScheduler:
+    """Periodically pre-generates horoscopes for the next few days."""
+
+    def __init__(self, days_ahead: int = 7, interval: float = 3600.0, retries: int = 3):
+        self.days_ahead = days_ahead
+        self.interval = interval
+        self.retries = retries
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            today = date.today()
+            try:
+                await pregenerate(today, today + timedelta(days=self.days_ahead), retries=self.retries)
+            except Exception as e:
+                # Keep the loop alive; the next tick retries whatever is missing
+                logger.error(f"Horoscope pre-generation run failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="horoscope-scheduler")
+            logger.info(f"Horoscope scheduler started ({self.days_ahead} days ahead, every {self.interval:g}s)")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+horoscope_scheduler = HoroscopeScheduler(
+    days_ahead=settings.HOROSCOPE_PREGENERATE_DAYS,
+    interval=settings.HOROSCOPE_PREGENERATE_INTERVAL,
+    retries=settings.HOROSCOPE_PREGENERATE_RETRIES
+)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate or backfill horoscopes")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="First date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last date, inclusive (YYYY-MM-DD)")
+    parser.add_argument(
+        "--periods", nargs="+", choices=[p.value for p in GENERATED_PERIODS],
+        default=[p.value for p in GENERATED_PERIODS], help="Periods to generate"
+    )
+    parser.add_argument("--retries", type=int, default=settings.HOROSCOPE_PREGENERATE_RETRIES)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    end = args.end or args.start + timedelta(days=settings.HOROSCOPE_PREGENERATE_DAYS)
+    if end < args.start:
+        parser.error("--end must not be before --start")
+
+    started = datetime.utcnow()
+    created = asyncio.run(pregenerate(
+        args.start, end, [HoroscopePeriod(p) for p in args.periods], retries=args.retries
+    ))
+    logger.info(f"Done: {created} horoscopes created in {(datetime.utcnow() - started).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
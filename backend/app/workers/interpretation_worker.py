@@ -0,0 +1,210 @@
+"""
+Generates LLM interpretations queued in interpretation_jobs.
+
+Runs in-process (started from the FastAPI lifespan) or standalone, next to
+or instead of the API workers:
+
+    python -m app.workers.interpretation_worker --concurrency 8
+"""
+from typing import List, Optional, Sequence
+import argparse
+import asyncio
+import logging
+import time
+
+from ..config import settings
+from ..database import async_session_maker
+from ..models.interpretation import InterpretationJob
+from ..services.interpretation_engine import InterpretationEngine
+from ..services.interpretation_jobs import InterpretationJobService
+from ..services.interpretation_fragments import InterpretationFragmentService
+from ..services.llm_client import llm_client, LLMError
+
+logger = logging.getLogger(__name__)
+
+# A running job without progress for this long is assumed orphaned
+STALE_AFTER = settings.LLM_TIMEOUT * 2
+
+
+class InterpretationWorker:
+    """Pool of consumer tasks draining the interpretation job queue."""
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        poll_interval: float = 2.0,
+        progress_interval: float = 0.5,
+        max_attempts: int = 3
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake idle consumers after a job was committed (saves a poll interval)."""
+        self._wake.set()
+
+    async def _generate(self, job: InterpretationJob) -> str:
+        """
+        Compose the interpretation from fragments, generating only the missing ones.
+
+        Missing fragments are generated in reading order, so the progress text
+        (everything up to the fragment being streamed) only ever grows.
+        """
+        features = job.features
+        fragments = InterpretationEngine.fragments(features)
+        source = InterpretationEngine.llm_source(features)
+        async with async_session_maker() as db:
+            stored = await InterpretationFragmentService.get_many(
+                db, [InterpretationFragmentService.key(source, f) for f in fragments]
+            )
+        texts = {
+            f: stored[InterpretationFragmentService.key(source, f)]
+            for f in fragments if InterpretationFragmentService.key(source, f) in stored
+        }
+        max_tokens = 600 if features.get("tier") == "premium" else 300
+        logger.info(f"Interpretation job {job.id}: {len(texts)}/{len(fragments)} fragments cached")
+
+        flushed_at = time.monotonic()
+        for i, fragment in enumerate(fragments):
+            if fragment in texts:
+                continue
+            parts = []
+            messages = InterpretationEngine.fragment_messages(fragment, features.get("tier"))
+            async for delta in llm_client.stream_chat(messages, max_tokens):
+                parts.append(delta)
+                if time.monotonic() - flushed_at >= self.progress_interval:
+                    flushed_at = time.monotonic()
+                    progress = InterpretationEngine.compose(fragments[:i + 1], {**texts, fragment: "".join(parts)})
+                    async with async_session_maker() as db:
+                        await InterpretationJobService.save_progress(db, job.id, progress)
+                        await db.commit()
+
+            text = "".join(parts)
+            if not text.strip():
+                raise LLMError(f"Empty completion for {fragment}")
+            async with async_session_maker() as db:
+                await InterpretationFragmentService.save(db, InterpretationFragmentService.key(source, fragment), text)
+                await db.commit()
+            texts[fragment] = text
+
+        return InterpretationEngine.compose(fragments, texts)
+
+    async def _release(self, job: InterpretationJob) -> None:
+        try:
+            async with async_session_maker() as db:
+                await InterpretationJobService.release(db, job)
+                await db.commit()
+            logger.info(f"Interpretation job {job.id} interrupted, requeued")
+        except Exception as e:
+            logger.error(f"Could not requeue interpretation job {job.id}: {str(e)}")
+
+    async def run_one(self) -> bool:
+        """Claim and process one job. Returns False if the queue was empty."""
+        async with async_session_maker() as db:
+            job = await InterpretationJobService.claim(db)
+            await db.commit()
+        if job is None:
+            return False
+
+        try:
+            text = await self._generate(job)
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back now instead of waiting for a reaper
+            await asyncio.shield(self._release(job))
+            raise
+        except Exception as e:
+            retry_after = getattr(e, "retry_after", None) or 2 ** job.attempts * 5
+            logger.warning(f"Interpretation job {job.id} failed (attempt {job.attempts}): {str(e)}")
+            async with async_session_maker() as db:
+                await InterpretationJobService.fail(db, job, str(e), self.max_attempts, retry_after)
+                await db.commit()
+            return True
+
+        async with async_session_maker() as db:
+            await InterpretationJobService.complete(db, job, text)
+            await db.commit()
+        logger.info(f"Interpretation job {job.id} done ({len(text)} chars)")
+        return True
+
+    async def _consume(self) -> None:
+        while True:
+            try:
+                if await self.run_one():
+                    continue
+            except Exception as e:
+                # Database hiccup: keep the consumer alive and retry after a pause
+                logger.error(f"Interpretation worker error: {str(e)}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reaper(self) -> None:
+        while True:
+            try:
+                async with async_session_maker() as db:
+                    requeued = await InterpretationJobService.requeue_stale(db, STALE_AFTER)
+                    await db.commit()
+                if requeued:
+                    logger.warning(f"Requeued {requeued} stale interpretation jobs")
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Interpretation reaper error: {str(e)}")
+            await asyncio.sleep(STALE_AFTER)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._consume(), name=f"interpretation-worker-{i}")
+                for i in range(self.concurrency)
+            ]
+            self._tasks.append(asyncio.create_task(self._reaper(), name="interpretation-reaper"))
+            logger.info(f"Interpretation worker started ({self.concurrency} consumers)")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        # Consumers requeue their interrupted jobs; the reaper covers crashes
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await llm_client.close()
+
+
+interpretation_worker = InterpretationWorker(
+    concurrency=settings.LLM_MAX_CONCURRENCY,
+    poll_interval=settings.INTERPRETATION_POLL_INTERVAL,
+    progress_interval=settings.INTERPRETATION_STREAM_INTERVAL,
+    max_attempts=settings.INTERPRETATION_MAX_ATTEMPTS
+)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the LLM interpretation worker")
+    parser.add_argument("--concurrency", type=int, default=settings.LLM_MAX_CONCURRENCY, help="Consumer tasks")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run() -> None:
+        worker = InterpretationWorker(
+            concurrency=args.concurrency,
+            poll_interval=settings.INTERPRETATION_POLL_INTERVAL,
+            progress_interval=settings.INTERPRETATION_STREAM_INTERVAL,
+            max_attempts=settings.INTERPRETATION_MAX_ATTEMPTS
+        )
+        worker.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await worker.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
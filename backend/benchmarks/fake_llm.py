@@ -0,0 +1,92 @@
+"""
+Fake OpenAI-compatible chat completion server for local runs and load tests.
+
+Streams a canned Russian interpretation token by token with a configurable
+delay, so the interpretation worker can be exercised without an API key:
+
+    python -m benchmarks.fake_llm --port 8010 --token-delay 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8010/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+
+``--fail-rate`` answers a share of requests with 429 to exercise retries.
+"""
+from typing import Optional, Sequence
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_TEXT = (
+    "Ваша натальная карта показывает сильное сочетание стихий. Солнце задаёт "
+    "основной вектор личности, Луна отражает эмоциональные потребности, а "
+    "асцендент описывает то, как вас воспринимают окружающие. Напряжённые "
+    "аспекты указывают на зоны роста, гармоничные — на природные таланты. "
+)
+
+app = FastAPI(title="Fake LLM")
+app.state.token_delay = 0.02
+app.state.fail_rate = 0.0
+app.state.requests = 0
+
+
+def _tokens(max_tokens: int) -> list:
+    words = (CANNED_TEXT * 8).split(" ")
+    return [word + " " for word in words[:max_tokens]]
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    app.state.requests += 1
+    if random.random() < app.state.fail_rate:
+        return JSONResponse({"error": {"message": "Rate limit reached"}}, status_code=429, headers={"Retry-After": "1"})
+
+    tokens = _tokens(int(body.get("max_tokens") or 256))
+    completion_id = f"chatcmpl-fake-{app.state.requests}"
+    model = body.get("model", "fake")
+
+    if not body.get("stream"):
+        await asyncio.sleep(app.state.token_delay * len(tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+        }
+
+    async def events():
+        for token in tokens:
+            await asyncio.sleep(app.state.token_delay)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed tokens")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args(argv)
+
+    app.state.token_delay = args.token_delay
+    app.state.fail_rate = args.fail_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
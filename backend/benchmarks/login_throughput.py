@@ -0,0 +1,78 @@
+"""
+Login throughput of one worker: bcrypt inline on the event loop vs the hasher pool.
+
+Simulates ``--logins`` concurrent logins (password verification plus a small
+awaitable standing in for the user query) and measures logins per second and
+how long the event loop was blocked (max heartbeat lag), which is what every
+other request on the worker waits for.
+
+    python -m benchmarks.login_throughput --logins 200 --workers 4
+"""
+from typing import Awaitable, Callable, Optional, Sequence
+import argparse
+import asyncio
+import time
+
+from app.services.password_hasher import PasswordHasher
+from app.utils.security import get_password_hash, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+
+async def _heartbeat(interval: float, lags: list) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _measure(verify: Callable[[str, str], Awaitable[bool]], hashed: str, logins: int) -> None:
+    async def login() -> None:
+        await asyncio.sleep(0.002)  # DB lookup
+        assert await verify(PASSWORD, hashed)
+
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(0.01, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    heartbeat.cancel()
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] if lags else elapsed
+    print(
+        f"  {logins / elapsed:8.1f} logins/s   total {elapsed:6.2f}s   "
+        f"loop lag max {max(lags, default=elapsed) * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms"
+    )
+
+
+async def _inline_verify(plain: str, hashed: str) -> bool:
+    return verify_password(plain, hashed)
+
+
+async def main_async(logins: int, workers: int) -> None:
+    hashed = get_password_hash(PASSWORD)
+
+    print(f"Inline bcrypt ({logins} concurrent logins):")
+    await _measure(_inline_verify, hashed, logins)
+
+    hasher = PasswordHasher(max_workers=workers, max_pending=logins)
+    print(f"Hasher pool, {hasher.max_workers} threads ({logins} concurrent logins):")
+    await _measure(hasher.verify, hashed, logins)
+    stats = hasher.stats()
+    print(f"  mean queue wait {stats['wait_seconds_total'] / stats['completed'] * 1000:.1f} ms")
+    hasher.shutdown()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent logins")
+    parser.add_argument("--workers", type=int, default=0, help="Hasher threads (0 = default)")
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args.logins, args.workers))
+
+
+if __name__ == "__main__":
+    main()
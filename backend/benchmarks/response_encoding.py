@@ -0,0 +1,149 @@
+"""
+Response encoding time per endpoint: FastAPI's default path vs the fast path.
+
+The default path is what FastAPI does with a returned model or dict:
+validate against the response_model, convert to JSON-compatible data and
+render with the json module. The fast path is what the endpoints do now:
+pre-encoded horoscope bytes, cached chart_data JSON spliced into the
+model_dump_json() of the row, and orjson without jsonable_encoder for
+plain dicts. Both bodies are
+decoded and compared before timing.
+
+    python -m benchmarks.response_encoding --iterations 2000
+"""
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional, Sequence
+import argparse
+import json
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.endpoints.charts import _chart_body, chart_json_cache
+from app.schemas.horoscope import HoroscopeResponse
+from app.schemas.natal_chart import NatalChartResponse
+from app.services.astro_calculator import AstroCalculatorService
+from app.services.chart_model import stored_chart
+from app.utils.http import json_bytes, ORJSON_AVAILABLE
+
+SIGNS = ["aries", "taurus", "gemini", "cancer", "leo", "virgo",
+         "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces"]
+
+_fields = {}
+
+
+def _chart_row() -> SimpleNamespace:
+    chart = AstroCalculatorService.generate_natal_chart(
+        date(1990, 5, 1), "12:30", 55.75, 37.61, "Moscow", "Europe/Moscow"
+    )
+    return SimpleNamespace(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), name="Моя карта",
+        birth_date=datetime(1990, 5, 1), birth_time="12:30", birth_timezone="Europe/Moscow",
+        birth_latitude=55.75, birth_longitude=37.61, birth_city="Москва", birth_country="Россия",
+        chart_packed=chart.pack(), chart_data=None,
+        interpretation_text="Солнце в Тельце. " * 150, svg_chart=None, is_primary=True,
+        created_at=datetime.now(timezone.utc), updated_at=None
+    )
+
+
+def _horoscope_rows() -> List[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            sign=sign, date=datetime(2026, 1, 1), period="daily",
+            content_text="Сегодня звезды благоволят новым начинаниям. " * 12,
+            mood="спокойное", keywords=["работа", "любовь", "здоровье"],
+            lucky_color="синий", lucky_number="7"
+        )
+        for sign in SIGNS
+    ]
+
+
+def _run(coro: Any) -> Any:
+    # serialize_response never suspends for async endpoints; drive it
+    # directly so event loop overhead is not timed
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("serialize_response suspended")
+
+
+def _default(response_model: Any, content: Any) -> bytes:
+    """Body FastAPI builds for ``content`` returned from an endpoint with ``response_model``."""
+    if response_model is None:
+        return JSONResponse(jsonable_encoder(content)).body
+    field = _fields.get(response_model)
+    if field is None:
+        field = _fields[response_model] = create_response_field(name="response", type_=response_model)
+    return JSONResponse(_run(serialize_response(field=field, response_content=content))).body
+
+
+def _time(fn: Callable[[], bytes], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def _report(name: str, default: Callable[[], bytes], fast: Callable[[], bytes], iterations: int) -> None:
+    assert json.loads(default()) == json.loads(fast()), f"{name}: bodies differ"
+    slow, quick = _time(default, iterations), _time(fast, iterations)
+    print(
+        f"  {name:<24} default {slow * 1e6:9.1f} us   fast {quick * 1e6:9.1f} us   "
+        f"x{slow / quick:5.1f}   {len(fast()):7d} bytes"
+    )
+
+
+def main_benchmark(iterations: int) -> None:
+    row = _chart_row()
+    compact = stored_chart(row.chart_packed, None)
+
+    def chart_default() -> bytes:
+        response = NatalChartResponse.model_validate(row)
+        response.chart_data = compact.to_dict()
+        return _default(NatalChartResponse, response)
+
+    def chart_cold() -> bytes:
+        chart_json_cache.clear()
+        return _chart_body(row)
+
+    horoscopes = _horoscope_rows()
+    cached = [HoroscopeResponse.model_validate(h).model_dump_json().encode("utf-8") for h in horoscopes]
+    models = [HoroscopeResponse.model_validate(h) for h in horoscopes]
+
+    natal = compact
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    transits = AstroCalculatorService.calculate_transits(natal, start, start + timedelta(days=365))
+
+    print(f"Response encoding, {iterations} iterations (orjson {'on' if ORJSON_AVAILABLE else 'off'}):")
+    _report("GET /charts/{id} cold", chart_default, chart_cold, iterations)
+    _report("GET /charts/{id} warm", chart_default, lambda: _chart_body(row), iterations)
+    _report("GET /horoscopes/daily", lambda: _default(HoroscopeResponse, models[0]), lambda: cached[0], iterations)
+    _report(
+        "GET /horoscopes/all-signs",
+        lambda: _default(None, models),
+        lambda: b"[" + b",".join(cached) + b"]",
+        iterations
+    )
+    _report(
+        "POST /charts/{id}/transits",
+        lambda: _default(None, transits),
+        lambda: json_bytes(transits),
+        max(1, iterations // 20)
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000, help="Encodings per endpoint")
+    args = parser.parse_args(argv)
+    main_benchmark(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
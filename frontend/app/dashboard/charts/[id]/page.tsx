@@ -50,7 +50,7 @@ interface NatalChart {
   birth_timezone: string;
   chart_data: ChartData;
   interpretation_text: string;
-  svg_chart: string;
+  svg_chart: string | null;
   is_primary: boolean;
   created_at: string;
 }
@@ -92,6 +92,7 @@ export default function ChartDetailPage() {
   const chartId = params?.id as string;
   const { token, isAuthenticated, isLoading: authLoading } = useAuth();
   const [chart, setChart] = useState<NatalChart | null>(null);
+  const [chartSvg, setChartSvg] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState<'planets' | 'houses' | 'aspects' | 'interpretation'>('planets');
@@ -108,6 +109,23 @@ export default function ChartDetailPage() {
     }
   }, [token, chartId]);
 
+  const fetchChartSvg = async () => {
+    try {
+      const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+      const response = await fetch(`${apiUrl}/api/v1/charts/${chartId}/svg`, {
+        headers: {
+          'Authorization': `Bearer ${token}`
+        }
+      });
+
+      if (response.ok) {
+        setChartSvg(await response.text());
+      }
+    } catch (err) {
+      // The wheel is optional, the rest of the page works without it
+    }
+  };
+
   const fetchChart = async () => {
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
@@ -123,6 +141,7 @@ export default function ChartDetailPage() {
 
       const data = await response.json();
       setChart(data);
+      fetchChartSvg();
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Произошла ошибка');
     } finally {
@@ -380,14 +399,17 @@ export default function ChartDetailPage() {
                 </CardContent>
               </Card>
 
-              {/* SVG Chart Placeholder */}
-              {chart.svg_chart && chart.svg_chart !== '<svg><!-- Chart SVG placeholder --></svg>' && (
+              {/* SVG Chart Wheel */}
+              {chartSvg && (
                 <Card className="mt-6">
                   <CardHeader>
                     <CardTitle>Визуализация карты</CardTitle>
                   </CardHeader>
                   <CardContent>
-                    <div dangerouslySetInnerHTML={{ __html: chart.svg_chart }} />
+                    <div
+                      className="[&>svg]:w-full [&>svg]:h-auto"
+                      dangerouslySetInnerHTML={{ __html: chartSvg }}
+                    />
                   </CardContent>
                 </Card>
               )}